@@ -3,8 +3,7 @@ console.log('YouTube Transcript Extractor loaded');
 
 // Function to get current video ID from URL
 function getVideoId() {
-  const urlParams = new URLSearchParams(window.location.search);
-  return urlParams.get('v');
+  return extractVideoId(window.location.href);
 }
 
 // Function to create sidebar
@@ -220,19 +219,20 @@ function removeLoadingMessage() {
 async function fetchTranscript(videoUrl) {
   try {
     // Extract video ID for chat functionality
-    const videoId = extractVideoId(videoUrl);
+    let videoId = extractVideoId(videoUrl);
     
-    const response = await fetch('http://localhost:8080/transcript', {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({ url: videoUrl })
-    });
+    // GET so the browser keeps cached transcripts and revalidates them with
+    // If-None-Match; no language is sent unless the user picks one, so every
+    // viewer gets the server's default languages from the same cache rows
+    const params = new URLSearchParams({ url: videoUrl });
+    const response = await fetch(`http://localhost:8080/transcript?${params}`, { cache: 'no-cache' });
     
     const data = await response.json();
     
     if (data.success) {
+      // The server's canonical ID is the one its chat and status endpoints use
+      videoId = data.video_id || videoId;
+
       // Step 1: Display transcript immediately (whether cached or fresh)
       displayTranscript(data);
       
@@ -263,11 +263,13 @@ async function fetchTranscript(videoUrl) {
   }
 }
 
-// Utility function to extract video ID from YouTube URL
+// Utility function to extract video ID from YouTube URL (watch, Shorts, live,
+// embed and youtu.be links); the server resolves the same shapes in video_id.py
 function extractVideoId(url) {
   const patterns = [
-    /(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)/,
-    /youtube\.com\/watch\?.*v=([^&\n?#]+)/
+    /[?&]v=([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])/,
+    /youtube(?:-nocookie)?\.com\/(?:embed|shorts|live|v|e)\/([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])/,
+    /youtu\.be\/([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])/
   ];
   
   for (const pattern of patterns) {
@@ -1,19 +1,30 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import re
 import requests
-import subprocess
-import tempfile
 import os
 import asyncio
+import math
 import time
 import traceback
 import threading
-from pathlib import Path
+import atexit
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from openai import AsyncOpenAI
 
+from vtt_parser import dedupe_rolling_cues, looks_rolling
+from transcript import Transcript
+from ytdlp_extractor import YtDlpExtractor, YTDLP_AVAILABLE, language_available, language_preference, match_language
+from transcript_extractor import TranscriptExtractor, create_backends, fetch_video_title
+from video_id import canonical_url, resolve_video_id
+from extraction_pool import ExtractionPool, ExtractionQueueFull, ExtractionTimeout
+from single_flight import SingleFlight
+from memory_cache import MemoryCache
+from write_behind import WriteBehindQueue
+from transcript_response import CachedTranscriptResponse, choose_encoding, etag_matches
+from negative_cache import REASONS, NoTranscript, classify_failure
+
 # Load environment variables
 load_dotenv()
 
@@ -45,171 +56,85 @@ except Exception as e:
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Chrome extension
 
-def extract_video_id(url):
-    """Extract video ID from YouTube URL"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)',
-        r'youtube\.com\/watch\?.*v=([^&\n?#]+)'
-    ]
+# Pooled connections for the remaining direct HTTP lookups
+http_session = requests.Session()
+HTTP_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+# Bounded pool for cache-miss extractions, with one warm yt-dlp instance per worker
+extraction_pool = ExtractionPool()
+ytdlp_extractor = YtDlpExtractor(instances=extraction_pool.workers) if YTDLP_AVAILABLE else None
+
+# Fast youtube-transcript-api raced against yt-dlp (see TRANSCRIPT_BACKENDS / TRANSCRIPT_MODE)
+transcript_extractor = TranscriptExtractor(create_backends(
+    transcript_api={"session": http_session, "timeout": HTTP_TIMEOUT},
+    ytdlp={"extractor": ytdlp_extractor}
+))
+
+# Concurrent cache misses for the same video share one extraction
+transcript_flight = SingleFlight()
+
+# Recently read cache rows per video, so hot videos skip the Supabase round trip
+transcript_memory_cache = MemoryCache()
+
+# Availability of videos whose RAG chunks are complete, so cache hits for hot
+# videos don't check Supabase either; incomplete videos are always re-checked
+rag_ready_cache = MemoryCache(max_bytes=1024 * 1024)
 
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+# Cache stores and RAG availability checks for fresh extractions run after the
+# response; whatever is still queued is written before the process exits
+cache_writer = WriteBehindQueue()
+atexit.register(cache_writer.close, 30)
 
-    # If no pattern matches, assume it's already a video ID
-    return url
+# Cues per page from GET /transcript/<video_id>, and the most a client may ask for
+TRANSCRIPT_PAGE_SIZE = int(os.getenv("TRANSCRIPT_PAGE_SIZE", "200"))
+TRANSCRIPT_MAX_PAGE_SIZE = int(os.getenv("TRANSCRIPT_MAX_PAGE_SIZE", "1000"))
 
 def get_video_title(video_id):
-    """Get video title from YouTube"""
-    try:
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-
-        # Extract title from the page HTML
-        title_match = re.search(r'"title":"([^"]+)"', response.text)
-        if title_match:
-            title = title_match.group(1)
-            # Decode unicode escape sequences
-            title = title.encode().decode('unicode-escape')
-            return title
-
-        # Fallback pattern
-        title_match = re.search(r'<title>([^<]+)</title>', response.text)
-        if title_match:
-            title = title_match.group(1)
-            # Remove " - YouTube" suffix if present
-            title = re.sub(r' - YouTube$', '', title)
-            return title
-
-        return "Unknown Title"
-    except Exception as e:
-        print(f"Could not fetch video title: {e}")
-        return "Unknown Title"
+    """Get video title from the YouTube watch page, when extraction metadata has none"""
+    return fetch_video_title(video_id, http_session, timeout=HTTP_TIMEOUT)
 
-def get_transcript_with_ytdlp(video_url, video_id):
-    """Get transcript using yt-dlp"""
-    # Create a temporary directory for downloads
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            # Change to temp directory
-            original_cwd = os.getcwd()
-            os.chdir(temp_dir)
-
-            # Download subtitles using yt-dlp
-            cmd = [
-                'yt-dlp',
-                '--write-auto-subs',
-                '--sub-langs', 'en',
-                '--sub-format', 'vtt',
-                '--skip-download',
-                video_url
-            ]
-
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
-
-            # Find the downloaded subtitle file
-            current_dir = Path('.')
-            subtitle_files = []
-
-            # Look for files containing the video ID
-            all_files = list(current_dir.glob("*.vtt"))
-            for file in all_files:
-                if video_id in file.name and '.en.' in file.name:
-                    subtitle_files.append(file)
-
-            # If no English files found, look for any subtitle files with the video ID
-            if not subtitle_files:
-                for file in all_files:
-                    if video_id in file.name:
-                        subtitle_files.append(file)
-
-            if not subtitle_files:
-                raise Exception("No subtitle files found")
-
-            # Read and parse the VTT file
-            subtitle_file = subtitle_files[0]
-            with open(subtitle_file, 'r', encoding='utf-8') as f:
-                vtt_content = f.read()
-
-            # Parse VTT content into structured format
-            transcript_data = parse_vtt_content(vtt_content)
-
-            return transcript_data
+def requested_languages(data):
+    """Language preference from a request body: "languages" list or "language" code(s)
 
-        finally:
-            # Change back to original directory
-            os.chdir(original_cwd)
-
-def parse_vtt_content(vtt_content):
-    """Parse VTT content into structured transcript data"""
-    lines = vtt_content.split('\n')
-    transcript_data = []
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-
-        # Look for timestamp lines (format: "00:00:00.000 --> 00:00:03.000")
-        if '-->' in line:
-            # Parse timestamp
-            parts = line.split(' --> ')
-            if len(parts) == 2:
-                start_time_str = parts[0].strip()
-                end_time_str = parts[1].strip()
-
-                # Convert to seconds
-                start_seconds = time_str_to_seconds(start_time_str)
-                end_seconds = time_str_to_seconds(end_time_str)
-
-                # Get the text (next non-empty line)
-                text_lines = []
-                i += 1
-                while i < len(lines) and lines[i].strip():
-                    text_lines.append(lines[i].strip())
-                    i += 1
-
-                if text_lines:
-                    text = ' '.join(text_lines)
-                    # Remove VTT formatting tags
-                    text = re.sub(r'<[^>]+>', '', text)
-
-                    transcript_data.append({
-                        "start": start_time_str,
-                        "end": end_time_str,
-                        "text": text,
-                        "start_seconds": start_seconds,
-                        "end_seconds": end_seconds
-                    })
+    Returns:
+        Requested codes followed by the fallback languages
+    """
+    requested = data.get('languages') or data.get('language') or []
+    if isinstance(requested, str):
+        requested = requested.split(',')
+    return language_preference(code for code in requested if isinstance(code, str))
 
-        i += 1
+def download_transcript(job, video_url, video_id, languages):
+    """Extraction pool job: get transcripts and metadata from the racing backends"""
+    return transcript_extractor.extract(
+        video_url, video_id, cancelled=job.cancelled, output_dir=job.output_dir, languages=languages,
+        spawn=job.spawn
+    )
 
-    return transcript_data
+def extract_transcript(video_url, video_id, languages):
+    """Get transcripts for every available language and video metadata on the extraction pool
 
-def time_str_to_seconds(time_str):
-    """Convert time string (HH:MM:SS.mmm) to seconds, handling VTT alignment attributes"""
-    try:
-        # Clean VTT alignment attributes (e.g., "00:00:02.240 align:start position:0%")
-        clean_time = time_str.split(' ')[0]  # Take only the time part before any spaces
-        
-        parts = clean_time.split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds_parts = parts[2].split('.')
-        seconds = int(seconds_parts[0])
-        milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-
-        total_seconds = hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
-        return total_seconds
-    except Exception as e:
-        print(f"⚠️ Error parsing time string '{time_str}': {e}")
-        return 0
+    Returns:
+        Dict with tracks (language -> transcript, kind, name), the most preferred
+        language and its transcript, and metadata with title, duration, chapters
+        and caption languages
+    """
+    result = extraction_pool.run(download_transcript, video_url, video_id, languages)
+    print(f"🏁 Transcript for video {video_id} from {result['backend']} backend ({', '.join(result['tracks'])})")
+    return result
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "message": "Flask server is running"})
+    return jsonify({
+        "status": "healthy",
+        "message": "Flask server is running",
+        "extraction": extraction_pool.stats(),
+        "transcript_backends": transcript_extractor.stats(),
+        "transcript_memory_cache": transcript_memory_cache.stats(),
+        "rag_ready_cache": rag_ready_cache.stats(),
+        "cache_writer": cache_writer.stats()
+    })
 
 @app.route('/admin/clear-cache/<video_id>', methods=['DELETE'])
 def clear_cache(video_id):
@@ -217,14 +142,31 @@ def clear_cache(video_id):
     try:
         if not rag_integration:
             return jsonify({"error": "RAG integration not available"}), 503
+
+        video_id = resolve_video_id(video_id)
+        if not video_id:
+            return jsonify({"error": "Invalid video ID"}), 400
             
-        # Clear from cache table
+        # Drop queued cache stores and ingest checks first, so they don't
+        # recreate the rows and chunks deleted below
+        cache_writer.cancel(("transcript_rows", video_id), timeout=30)
+        cache_writer.cancel(("rag_ingest", video_id), timeout=30)
+
+        # Clear from cache table and this node's memory
+        transcript_memory_cache.invalidate(video_id)
+        rag_ready_cache.invalidate(video_id)
         cache_result = rag_integration.deps.supabase.from_('youtube_transcripts_cache') \
             .delete().eq('video_id', video_id).execute()
         
-        # Clear any existing chunks
+        # Clear any remembered extraction failure
+        rag_integration.deps.supabase.from_('youtube_transcript_failures') \
+            .delete().eq('video_id', video_id).execute()
+        
+        # Clear any existing chunks and the language they were indexed in
         chunks_result = rag_integration.deps.supabase.from_('youtube_transcript_pages') \
             .delete().eq('video_id', video_id).execute()
+        rag_integration.deps.supabase.from_('youtube_transcript_ingests') \
+            .delete().eq('video_id', video_id).execute()
         
         cache_count = len(cache_result.data) if cache_result.data else 0
         chunks_count = len(chunks_result.data) if chunks_result.data else 0
@@ -247,21 +189,209 @@ def clear_cache(video_id):
             "video_id": video_id
         }), 500
 
+@app.route('/admin/repair/<video_id>', methods=['POST'])
+def repair_video(video_id):
+    """Admin endpoint to fill missing RAG chunks and remove orphaned ones for a video"""
+    try:
+        if not rag_integration:
+            return jsonify({"error": "RAG integration not available"}), 503
 
-def check_transcript_cache(video_id):
-    """Check if transcript exists in cache table."""
+        video_id = resolve_video_id(video_id)
+        if not video_id:
+            return jsonify({"error": "Invalid video ID"}), 400
+
+        cached_transcript = check_transcript_cache(video_id)
+        if not cached_transcript:
+            return jsonify({
+                "success": False,
+                "error": "Transcript not cached. Please extract transcript first.",
+                "video_id": video_id
+            }), 404
+
+        # Repair against the language the video was indexed in
+        availability = asyncio.run(rag_integration.check_video_availability(video_id))
+        if availability.get("error"):
+            raise RuntimeError(f"RAG availability check failed: {availability['error']}")
+        cached_transcript = indexed_transcript(video_id, availability, cached_transcript)
+
+        # Blocks until the missing chunks are embedded and written
+        summary = asyncio.run(rag_integration.resume_ingest(
+            video_id=video_id,
+            video_url=cached_transcript["url"],
+            video_title=cached_transcript["title"],
+            transcript_data=cached_transcript["transcript"],
+            language_code=cached_transcript["language_code"],
+            repair=True
+        ))
+
+        print(f"🔧 Repaired video {video_id}: {summary.get('chunks_stored', 0)} chunks stored, {summary.get('orphans_deleted', 0)} orphans deleted")
+
+        return jsonify({
+            "success": summary.get("complete", False),
+            "video_id": video_id,
+            "chunks_expected": summary.get("chunks_expected", 0),
+            "chunks_existing": summary.get("chunks_existing", 0),
+            "chunks_stored": summary.get("chunks_stored", 0),
+            "orphans_deleted": summary.get("orphans_deleted", 0),
+            "batches_failed": summary.get("batches_failed", 0),
+            "error": summary.get("error")
+        })
+
+    except Exception as e:
+        print(f"❌ Error repairing video {video_id}: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "video_id": video_id
+        }), 500
+
+@app.route('/admin/migrate-cache', methods=['POST'])
+def migrate_cache():
+    """Admin endpoint to de-duplicate rolling auto-captions in all cached transcripts.
+
+    Pass ?reindex=true to also delete the RAG chunks of migrated videos so they
+    are re-ingested from the cleaned transcript.
+    """
     try:
         if not rag_integration:
+            return jsonify({"error": "RAG integration not available"}), 503
+
+        reindex = request.args.get('reindex', 'false').lower() == 'true'
+        page_size = 50
+        scanned = 0
+        migrated = []
+        offset = 0
+
+        while True:
+            result = rag_integration.deps.supabase.from_('youtube_transcripts_cache') \
+                .select('video_id, url, title, language, language_code, transcript_data') \
+                .order('video_id') \
+                .order('language_code') \
+                .range(offset, offset + page_size - 1) \
+                .execute()
+            rows = result.data or []
+
+            for row in rows:
+                scanned += 1
+                if not looks_rolling(row["transcript_data"]):
+                    continue
+
+                transcript_data = dedupe_rolling_cues(row["transcript_data"])
+                store_transcript_cache(
+                    row["video_id"], row["url"], row["title"], transcript_data,
+                    language_code=row["language_code"], language=row["language"]
+                )
+                migrated.append(row["video_id"])
+
+                if reindex:
+                    rag_integration.deps.supabase.from_('youtube_transcript_pages') \
+                        .delete().eq('video_id', row["video_id"]).execute()
+
+            if len(rows) < page_size:
+                break
+            offset += page_size
+
+        print(f"🔧 Migrated {len(migrated)}/{scanned} cached transcripts")
+
+        return jsonify({
+            "success": True,
+            "scanned": scanned,
+            "migrated": len(migrated),
+            "video_ids": migrated,
+            "reindexed": reindex
+        })
+
+    except Exception as e:
+        print(f"❌ Error migrating transcript cache: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+def select_cached_language(rows, languages):
+    """Pick the cached row that answers a request for languages, in order of preference.
+
+    A language that isn't cached is skipped only when the stored caption
+    list shows the video has no track for it; otherwise the video needs an
+    extraction for that language and None is returned.
+    """
+    by_code = {row["language_code"]: row for row in rows}
+    caption_languages = next(
+        ((row.get("metadata") or {}).get("caption_languages") for row in rows
+         if (row.get("metadata") or {}).get("caption_languages")),
+        None
+    )
+
+    for language in languages:
+        code = match_language(by_code, language)
+        if code is not None:
+            return by_code[code]
+        if caption_languages is None or language_available(caption_languages, language):
             return None
-            
-        result = rag_integration.deps.supabase.from_('youtube_transcripts_cache') \
-            .select('*') \
-            .eq('video_id', video_id) \
-            .execute()
-        
-        if result.data and len(result.data) > 0:
-            cached = result.data[0]
-            print(f"✅ Found cached transcript for video {video_id}")
+    return None
+
+def cache_row(row):
+    """A cache row as kept in memory: compact transcript plus its serialized response"""
+    row = dict(row, transcript_data=Transcript.from_entries(row["transcript_data"]))
+    row["response"] = CachedTranscriptResponse(row)
+    return row
+
+def cached_row_size(row):
+    """Approximate memory held by a cache row, for the byte-bounded memory cache"""
+    return row["transcript_data"].nbytes + len(str(row.get("metadata") or "")) + 512
+
+def load_transcript_rows(video_id):
+    """Cache rows for a video, from memory when read recently, otherwise from Supabase.
+
+    Rows come back with transcript_data as a Transcript.
+    """
+    rows = transcript_memory_cache.get(video_id)
+    if rows is not None:
+        return rows
+
+    result = rag_integration.deps.supabase.from_('youtube_transcripts_cache') \
+        .select('*') \
+        .eq('video_id', video_id) \
+        .execute()
+
+    rows = []
+    for row in result.data or []:
+        # Transcripts cached before rolling-caption de-duplication are migrated on read
+        transcript_data = row["transcript_data"]
+        if looks_rolling(transcript_data):
+            transcript_data = dedupe_rolling_cues(transcript_data)
+            print(f"🔧 De-duplicated cached transcript for video {video_id}: {len(row['transcript_data'])} -> {len(transcript_data)} entries")
+            store_transcript_cache(
+                video_id, row["url"], row["title"], transcript_data,
+                language_code=row["language_code"], language=row["language"]
+            )
+        rows.append(cache_row(dict(row, transcript_data=transcript_data)))
+
+    # Videos with no rows aren't remembered; their extraction is about to store some
+    if rows:
+        transcript_memory_cache.put(video_id, rows, size=sum(cached_row_size(row) for row in rows))
+    return rows
+
+def check_transcript_cache(video_id, languages=None):
+    """Check if transcript exists in cache table.
+
+    Args:
+        languages: Languages in order of preference; by default the fallback
+            languages are preferred and any cached language is accepted
+    """
+    try:
+        if not rag_integration:
+            return None
+
+        rows = load_transcript_rows(video_id)
+        if languages is None:
+            cached = select_cached_language(rows, language_preference()) or (rows[0] if rows else None)
+        else:
+            cached = select_cached_language(rows, languages)
+
+        if cached:
+            print(f"✅ Found cached {cached['language_code']} transcript for video {video_id}")
+
             return {
                 "video_id": cached["video_id"],
                 "title": cached["title"],
@@ -269,6 +399,8 @@ def check_transcript_cache(video_id):
                 "language": cached.get("language", "English"),
                 "language_code": cached.get("language_code", "en"),
                 "transcript": cached["transcript_data"],
+                "metadata": cached.get("metadata") or {},
+                "response": cached.get("response") or CachedTranscriptResponse(cached),
                 "cached": True
             }
         return None
@@ -276,51 +408,315 @@ def check_transcript_cache(video_id):
         print(f"⚠️ Error checking transcript cache: {e}")
         return None
 
-def store_transcript_cache(video_id, video_url, video_title, transcript_data):
-    """Store transcript in cache table."""
+def store_transcript_rows(rows, invalidate=True):
+    """Upsert transcript cache rows, one per (video_id, language_code).
+
+    Args:
+        invalidate: Drop the video's rows from memory so the next read picks
+            up the stored ones; False when memory already holds these rows
+    """
     try:
         if not rag_integration:
             return False
-            
-        data = {
-            "video_id": video_id,
-            "url": video_url,
-            "title": video_title,
-            "language": "English",
-            "language_code": "en",
-            "transcript_data": transcript_data
-        }
-        
+
         # Use upsert to handle duplicates gracefully
         rag_integration.deps.supabase.from_('youtube_transcripts_cache') \
-            .upsert(data) \
+            .upsert(rows, on_conflict='video_id,language_code') \
             .execute()
-        
-        print(f"✅ Stored transcript in cache for video {video_id}")
+
+        for row in rows:
+            if invalidate:
+                transcript_memory_cache.invalidate(row["video_id"])
+            print(f"✅ Stored {row['language_code']} transcript in cache for video {row['video_id']}")
         return True
     except Exception as e:
         print(f"⚠️ Error storing transcript cache: {e}")
         return False
 
-@app.route('/transcript', methods=['POST'])
+def remember_transcript_rows(video_id, rows):
+    """Serve freshly extracted rows from memory while their cache store is queued.
+
+    Rows for other languages already in memory are kept.
+
+    Returns:
+        The fresh rows as kept in memory, by language code
+    """
+    fresh = {row["language_code"]: cache_row(row) for row in rows}
+    known = [row for row in transcript_memory_cache.get(video_id) or [] if row["language_code"] not in fresh]
+    merged = known + list(fresh.values())
+    transcript_memory_cache.put(video_id, merged, size=sum(cached_row_size(row) for row in merged))
+    return fresh
+
+def store_transcript_cache(video_id, video_url, video_title, transcript_data, metadata=None,
+                           language_code="en", language="English"):
+    """Store one language's transcript in cache table, with extraction metadata when given."""
+    data = {
+        "video_id": video_id,
+        "url": video_url,
+        "title": video_title,
+        "language": language,
+        "language_code": language_code,
+        "transcript_data": transcript_data.to_list() if isinstance(transcript_data, Transcript) else transcript_data
+    }
+    # Left out when not given so re-stores keep the existing metadata
+    if metadata is not None:
+        data["metadata"] = metadata
+
+    return store_transcript_rows([data])
+
+def check_failure_cache(video_id, languages):
+    """Check whether a recent extraction for this video failed for a lasting reason.
+
+    A no_subtitles failure only covers the languages that were looked for.
+    """
+    try:
+        if not rag_integration:
+            return None
+
+        result = rag_integration.deps.supabase.from_('youtube_transcript_failures') \
+            .select('reason, detail, languages, expires_at') \
+            .eq('video_id', video_id) \
+            .gt('expires_at', datetime.now(timezone.utc).isoformat()) \
+            .execute()
+
+        if not result.data:
+            return None
+
+        failure = result.data[0]
+        tried = set((failure.get("languages") or "").split(","))
+        if failure["reason"] == "no_subtitles" and not set(languages) <= tried:
+            return None
+        return failure
+    except Exception as e:
+        print(f"⚠️ Error checking transcript failure cache: {e}")
+        return None
+
+def store_failure_cache(video_id, reason, detail, languages):
+    """Remember a failed extraction until its reason's TTL runs out.
+
+    Returns:
+        The expiry time as an ISO string, or None if it wasn't stored
+    """
+    try:
+        if not rag_integration:
+            return None
+
+        expires_at = (datetime.now(timezone.utc) + timedelta(seconds=REASONS[reason]["ttl"])).isoformat()
+        rag_integration.deps.supabase.from_('youtube_transcript_failures') \
+            .upsert({
+                "video_id": video_id,
+                "reason": reason,
+                "detail": detail[:1000],
+                "languages": ",".join(languages),
+                "expires_at": expires_at
+            }) \
+            .execute()
+
+        print(f"✅ Stored {reason} failure for video {video_id} until {expires_at}")
+        return expires_at
+    except Exception as e:
+        print(f"⚠️ Error storing transcript failure cache: {e}")
+        return None
+
+def extract_and_cache_transcript(youtube_url, video_id, languages):
+    """Extract transcripts and store each language in the cache.
+
+    Returns:
+        Dict with title, url, language, language_code, transcript and metadata
+        for the most preferred available language, and the extraction time
+    """
+    start_time = time.time()
+
+    # Title, duration and chapters come back from the same yt-dlp call;
+    # youtube-transcript-api results carry no title
+    try:
+        result = extract_transcript(youtube_url, video_id, languages)
+    except (ExtractionQueueFull, ExtractionTimeout):
+        raise
+    except Exception as e:
+        # Lasting failures are remembered; transient ones are retried next time
+        reason = classify_failure(e)
+        if not reason:
+            raise
+        expires_at = store_failure_cache(video_id, reason, str(e), languages)
+        raise NoTranscript(reason, expires_at) from e
+    metadata = result["metadata"]
+    video_title = metadata.get("title") or get_video_title(video_id)
+
+    extraction_time = time.time() - start_time
+    print(f"✅ Transcript extracted in {extraction_time:.2f} seconds")
+
+    # Store every fetched language for future requests: in memory now, in
+    # Supabase after the response has gone out
+    rows = [
+        {
+            "video_id": video_id,
+            "url": youtube_url,
+            "title": video_title,
+            "language": track["name"],
+            "language_code": language_code,
+            "transcript_data": track["transcript"],
+            "metadata": metadata
+        }
+        for language_code, track in result["tracks"].items()
+    ]
+    fresh = remember_transcript_rows(video_id, rows)
+    # Memory already holds these rows and their pre-serialized responses
+    cache_writer.submit(
+        ("transcript_rows", video_id, tuple(sorted(result["tracks"]))), store_transcript_rows, rows, invalidate=False
+    )
+
+    language_code = result["language"]
+    return {
+        "title": video_title,
+        "url": youtube_url,
+        "language": result["tracks"][language_code]["name"],
+        "language_code": language_code,
+        "transcript": fresh[language_code]["transcript_data"],
+        "metadata": metadata,
+        "response": fresh[language_code]["response"],
+        "extraction_time": extraction_time
+    }
+
+def check_rag_availability(video_id):
+    """RAG availability for a video, from memory once its chunks are known to be complete"""
+    availability = rag_ready_cache.get(video_id)
+    if availability is not None:
+        return availability
+
+    availability = asyncio.run(rag_integration.check_video_availability(video_id))
+    if availability.get("available") and availability.get("complete"):
+        rag_ready_cache.put(video_id, availability, size=256)
+    return availability
+
+def indexed_transcript(video_id, availability, cached_transcript):
+    """The cached transcript to ingest a video from.
+
+    RAG chunks are stored per video, so a video already indexed in one
+    language is resumed from that language's transcript. Another language is
+    only used when the indexed one is no longer cached, and then replaces it.
+    """
+    language_code = availability.get("language_code")
+    if not language_code or language_code == cached_transcript["language_code"]:
+        return cached_transcript
+
+    indexed = check_transcript_cache(video_id, [language_code])
+    if indexed and indexed["language_code"] == language_code:
+        return indexed
+    print(f"⚠️ Video {video_id} was indexed in {language_code}, which is no longer cached; re-indexing in {cached_transcript['language_code']}")
+    return cached_transcript
+
+def ingest_if_missing(video_id, youtube_url, video_title, transcript_data, language_code):
+    """Write-behind job: start a background RAG ingest unless the video's chunks exist.
+
+    Raises if the availability check fails, so the job is retried.
+    """
+    # Check if chunks already exist (quick check); the check reports its own
+    # failures as unavailable, which would start a duplicate full ingest
+    availability = check_rag_availability(video_id)
+    if availability.get("error"):
+        raise RuntimeError(f"RAG availability check failed for video {video_id}: {availability['error']}")
+    if availability.get("available", False):
+        print(f"✅ RAG chunks already exist for video {video_id}")
+        return True
+
+    source = indexed_transcript(video_id, availability, {
+        "url": youtube_url,
+        "title": video_title,
+        "language_code": language_code,
+        "transcript": transcript_data
+    })
+
+    # Start background processing (don't wait for completion)
+    print(f"🔄 Starting background RAG ingest for video {video_id}")
+
+    def background_rag_ingest():
+        try:
+            print(f"🔄 Background thread started for fresh video {video_id}")
+            print(f"   Thread ID: {threading.current_thread().ident}")
+            print(f"   Transcript entries: {len(source['transcript'])}")
+
+            result = asyncio.run(rag_integration.ingest_transcript(
+                video_id=video_id,
+                video_url=source["url"],
+                video_title=source["title"],
+                transcript_data=source["transcript"],
+                language_code=source["language_code"]
+            ))
+            print(f"{'✅' if result else '⚠️'} Background RAG ingest {'succeeded' if result else 'failed'} for video {video_id}")
+            if not result:
+                print(f"   RAG ingest returned False - check detailed logs above")
+        except Exception as e:
+            print(f"❌ Background RAG ingest error for video {video_id}: {e}")
+            print(f"   Full traceback: {traceback.format_exc()}")
+        finally:
+            print(f"🔚 Background thread completed for fresh video {video_id}")
+
+    # Start background thread
+    thread = threading.Thread(target=background_rag_ingest, daemon=True)
+    thread.start()
+    print(f"🚀 RAG processing started in background for video {video_id}")
+    return True
+
+def send_cached_transcript(video_id, cached_response, rag_stored):
+    """Respond with a cached transcript's pre-serialized body.
+
+    GET requests whose If-None-Match matches the ETag get a 304; otherwise the
+    body is sent in the best encoding the client accepts, compressed once and
+    reused for later hits.
+    """
+    before = cached_response.nbytes
+    body_parts = cached_response.body_parts(rag_stored)
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'), sum(len(part) for part in body_parts))
+
+    # Each encoding is its own representation with its own ETag; clients keep
+    # the body and revalidate it on every view
+    etag = cached_response.etag(rag_stored, encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if request.method in ('GET', 'HEAD') and etag_matches(request.headers.get('If-None-Match'), etag):
+        print(f"♻️ Transcript for video {video_id} not modified")
+        return Response(status=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        body_parts = [cached_response.body(rag_stored, encoding)]
+
+    # Serialized and compressed bodies count against the memory cache
+    grown = cached_response.nbytes - before
+    if grown:
+        transcript_memory_cache.grow(video_id, grown)
+
+    # A list of parts is sent as is, without joining them into one body
+    return Response(body_parts, mimetype='application/json', headers=headers)
+
+@app.route('/transcript', methods=['GET', 'POST'])
 def get_transcript():
-    """Get transcript for a YouTube video with smart caching and instant returns"""
+    """Get transcript for a YouTube video with smart caching and instant returns
+
+    GET takes url and language as query parameters and supports conditional
+    requests, so browsers revalidate cached transcripts with If-None-Match.
+    """
+    video_id = None
     try:
-        data = request.get_json()
+        data = request.args.to_dict() if request.method == 'GET' else (request.get_json() or {})
         youtube_url = data.get('url')
 
         if not youtube_url:
             return jsonify({"error": "YouTube URL is required"}), 400
 
-        # Extract video ID
-        video_id = extract_video_id(youtube_url)
+        # Every link shape (Shorts, youtu.be, m., tracking parameters) maps
+        # to the same video ID and cache rows
+        video_id = resolve_video_id(youtube_url)
         if not video_id:
             return jsonify({"error": "Could not extract video ID from URL"}), 400
+        youtube_url = canonical_url(video_id)
 
-        print(f"📋 Processing transcript request for video {video_id}")
+        languages = requested_languages(data)
+        print(f"📋 Processing transcript request for video {video_id} ({', '.join(languages)})")
 
         # Step 1: Check cache first (instant return if exists)
-        cached_transcript = check_transcript_cache(video_id)
+        cached_transcript = check_transcript_cache(video_id, languages)
         if cached_transcript:
             print(f"🚀 Returning cached transcript for video {video_id} (instant response)")
             
@@ -328,12 +724,18 @@ def get_transcript():
             rag_stored = False
             if rag_integration:
                 try:
-                    availability = asyncio.run(rag_integration.check_video_availability(video_id))
-                    rag_stored = availability.get("available", False)
+                    # A running ingest means the chunks aren't complete yet; complete
+                    # videos are answered from memory without asking Supabase
+                    in_progress = rag_integration.ingest_in_progress(video_id)
+                    if not in_progress:
+                        availability = check_rag_availability(video_id)
+                        rag_stored = availability.get("available", False)
                     
                     # If RAG chunks don't exist, trigger background ingestion
-                    if not rag_stored:
-                        print(f"🔄 Cached transcript found but RAG chunks missing for video {video_id}")
+                    if in_progress:
+                        print(f"⏳ RAG ingestion already running for video {video_id}")
+                    elif not rag_stored:
+                        print(f"🔄 Cached transcript found but RAG chunks missing or incomplete for video {video_id}")
                         print(f"   Starting background RAG ingestion (non-blocking)")
                         
                         
@@ -341,13 +743,17 @@ def get_transcript():
                             try:
                                 print(f"🔄 Background thread started for cached video {video_id}")
                                 print(f"   Thread ID: {threading.current_thread().ident}")
-                                print(f"   Transcript entries: {len(cached_transcript['transcript'])}")
+                                
+                                # Resume in the language the video was indexed in, if any
+                                source = indexed_transcript(video_id, availability, cached_transcript)
+                                print(f"   Transcript entries: {len(source['transcript'])}")
                                 
                                 result = asyncio.run(rag_integration.ingest_transcript(
                                     video_id=video_id,
-                                    video_url=cached_transcript["url"],
-                                    video_title=cached_transcript["title"],
-                                    transcript_data=cached_transcript["transcript"]
+                                    video_url=source["url"],
+                                    video_title=source["title"],
+                                    transcript_data=source["transcript"],
+                                    language_code=source["language_code"]
                                 ))
                                 print(f"{'✅' if result else '⚠️'} Background RAG ingest {'succeeded' if result else 'failed'} for cached video {video_id}")
                                 if not result:
@@ -366,94 +772,73 @@ def get_transcript():
                 except:
                     rag_stored = False
             
-            response = {
-                "success": True,
-                "video_id": video_id,
-                "title": cached_transcript["title"],
-                "url": cached_transcript["url"],
-                "language": cached_transcript["language"],
-                "language_code": cached_transcript["language_code"],
-                "transcript": cached_transcript["transcript"],
-                "rag_stored": rag_stored,
-                "cached": True,
-                "extraction_time": 0  # Instant from cache
-            }
-            return jsonify(response)
+            return send_cached_transcript(video_id, cached_transcript["response"], rag_stored)
 
-        # Step 2: Extract transcript with yt-dlp (30-40 seconds)
-        print(f"🔄 No cache found, extracting transcript for video {video_id}")
-        start_time = time.time()
-        
-        video_title = get_video_title(video_id)
-        transcript_data = get_transcript_with_ytdlp(youtube_url, video_id)
-        
-        extraction_time = time.time() - start_time
-        print(f"✅ Transcript extracted in {extraction_time:.2f} seconds")
+        # Fail fast for videos whose last extraction failed for a lasting reason
+        failure = check_failure_cache(video_id, languages)
+        if failure:
+            print(f"⛔ Video {video_id} is in the failure cache ({failure['reason']}) until {failure['expires_at']}")
+            raise NoTranscript(failure["reason"], failure["expires_at"], cached=True)
 
-        # Step 3: Store in cache immediately (for future requests)
-        store_transcript_cache(video_id, youtube_url, video_title, transcript_data)
+        # Step 2: Extract transcript (up to 30-40 seconds with yt-dlp) and store it in
+        # the cache, once per video and language preference no matter how many
+        # requests are waiting
+        print(f"🔄 No cache found, extracting transcript for video {video_id}")
+        extracted, shared = transcript_flight.do(
+            (video_id, languages), extract_and_cache_transcript, youtube_url, video_id, languages
+        )
+        video_title = extracted["title"]
+        transcript_data = extracted["transcript"]
+        language_code = extracted["language_code"]
+        if shared:
+            print(f"🔗 Shared in-flight extraction for video {video_id}")
 
-        # Step 4: Start RAG ingest in background (non-blocking)
+        # Step 3: Check for RAG chunks and start ingest in the background once
+        # the response is out; the request that ran the extraction queues it,
+        # the ones that shared it don't
         rag_stored = False
-        if rag_integration:
-            try:
-                # Check if chunks already exist (quick check)
-                availability = asyncio.run(rag_integration.check_video_availability(video_id))
-                rag_stored = availability.get("available", False)
-                
-                if not rag_stored:
-                    # Start background processing (don't wait for completion)
-                    print(f"🔄 Starting background RAG ingest for video {video_id}")
-                    
-                    def background_rag_ingest():
-                        try:
-                            print(f"🔄 Background thread started for fresh video {video_id}")
-                            print(f"   Thread ID: {threading.current_thread().ident}")
-                            print(f"   Transcript entries: {len(transcript_data)}")
-                            
-                            result = asyncio.run(rag_integration.ingest_transcript(
-                                video_id=video_id,
-                                video_url=youtube_url,
-                                video_title=video_title,
-                                transcript_data=transcript_data
-                            ))
-                            print(f"{'✅' if result else '⚠️'} Background RAG ingest {'succeeded' if result else 'failed'} for video {video_id}")
-                            if not result:
-                                print(f"   RAG ingest returned False - check detailed logs above")
-                        except Exception as e:
-                            print(f"❌ Background RAG ingest error for video {video_id}: {e}")
-                            print(f"   Full traceback: {traceback.format_exc()}")
-                        finally:
-                            print(f"🔚 Background thread completed for fresh video {video_id}")
-                    
-                    # Start background thread
-                    thread = threading.Thread(target=background_rag_ingest, daemon=True)
-                    thread.start()
-                    print(f"🚀 RAG processing started in background for video {video_id}")
-                else:
-                    print(f"✅ RAG chunks already exist for video {video_id}")
-                    
-            except Exception as e:
-                print(f"❌ RAG availability check error for video {video_id}: {e}")
-                rag_stored = False
-        else:
+        if rag_integration and not shared:
+            cache_writer.submit(
+                ("rag_ingest", video_id), ingest_if_missing, video_id, youtube_url, video_title, transcript_data, language_code
+            )
+        elif not rag_integration:
             print(f"⚠️ RAG integration not available for video {video_id}")
 
-        # Step 5: Return structured response immediately (transcript always succeeds)
-        response = {
-            "success": True,
+        # Step 4: Return structured response immediately (transcript always succeeds).
+        # The body is serialized once, shared with requests that joined the
+        # extraction and reused by later cache hits
+        fresh_response = extracted["response"]
+        before = fresh_response.nbytes
+        body_parts = fresh_response.body_parts(
+            rag_stored, cached=False, extraction_time=extracted["extraction_time"]
+        )
+        transcript_memory_cache.grow(video_id, fresh_response.nbytes - before)
+
+        return Response(body_parts, mimetype='application/json')
+
+    except NoTranscript as e:
+        return jsonify({
+            "success": False,
+            "error": e.message,
+            "error_code": e.reason,
             "video_id": video_id,
-            "title": video_title,
-            "url": youtube_url,
-            "language": "English",
-            "language_code": "en",
-            "transcript": transcript_data,
-            "rag_stored": rag_stored,
-            "cached": False,
-            "extraction_time": extraction_time
-        }
+            "retry_after": e.retry_after(),
+            "cached": e.cached
+        }), e.status
 
-        return jsonify(response)
+    except ExtractionQueueFull as e:
+        print(f"⚠️ Rejected transcript request: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Server busy extracting other videos, please retry shortly"
+        }), 503, {"Retry-After": "30"}
+
+    except ExtractionTimeout as e:
+        print(f"❌ {e}")
+        return jsonify({
+            "success": False,
+            "error": "Transcript extraction timed out"
+        }), 504
 
     except Exception as e:
         error_message = str(e)
@@ -464,10 +849,70 @@ def get_transcript():
             "error": error_message
         }), 500
 
+@app.route('/transcript/<video_id>', methods=['GET'])
+def get_transcript_range(video_id):
+    """Page through the cues of a cached transcript, optionally within a time range
+
+    Query parameters:
+        from, to: Range in seconds; cues overlapping [from, to) are returned
+        cursor: next_cursor from the previous page
+        limit: Cues per page
+        language: Preferred language code(s), as for POST /transcript
+    """
+    try:
+        video_id = resolve_video_id(video_id)
+        if not video_id:
+            return jsonify({"error": "Invalid video ID"}), 400
+
+        try:
+            start = float(request.args['from']) if request.args.get('from') else None
+            end = float(request.args['to']) if request.args.get('to') else None
+            offset = int(request.args.get('cursor') or 0)
+            limit = min(int(request.args.get('limit') or TRANSCRIPT_PAGE_SIZE), TRANSCRIPT_MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"error": "from, to, cursor and limit must be numbers"}), 400
+        bounds = [value for value in (start, end) if value is not None]
+        if limit < 1 or offset < 0 or not all(map(math.isfinite, bounds)) or (len(bounds) == 2 and end < start):
+            return jsonify({"error": "Invalid range or page size"}), 400
+
+        cached_transcript = check_transcript_cache(video_id, requested_languages(request.args))
+        if not cached_transcript:
+            return jsonify({
+                "success": False,
+                "error": "Transcript not cached. Please extract transcript first.",
+                "video_id": video_id
+            }), 404
+
+        # Binary search over the start times, then a view of one page
+        page, next_offset, total = cached_transcript["transcript"].page(start, end, offset, limit)
+
+        return jsonify({
+            "success": True,
+            "video_id": video_id,
+            "title": cached_transcript["title"],
+            "language": cached_transcript["language"],
+            "language_code": cached_transcript["language_code"],
+            "from": start,
+            "to": end,
+            "total": total,
+            "transcript": page.to_list(),
+            "next_cursor": None if next_offset is None else str(next_offset)
+        })
+
+    except Exception as e:
+        print(f"❌ Error getting transcript range for video {video_id}: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
 @app.route('/chat/status/<video_id>', methods=['GET'])
 def get_chat_status(video_id):
     """Check if chat is available for a specific video (RAG processing complete)"""
     try:
+        video_id = resolve_video_id(video_id)
+        if not video_id:
+            return jsonify({"error": "Invalid video ID"}), 400
         print(f"📊 Checking chat status for video {video_id}")
         
         if not rag_integration:
@@ -478,9 +923,10 @@ def get_chat_status(video_id):
                 "video_id": video_id
             }), 503
 
-        # Check if video has processed chunks
+        # Check if video has all of its chunks processed
         try:
-            availability = asyncio.run(rag_integration.check_video_availability(video_id))
+            cached_transcript = check_transcript_cache(video_id)
+            availability = check_rag_availability(video_id)
             
             if availability["available"]:
                 status_response = {
@@ -492,13 +938,13 @@ def get_chat_status(video_id):
                 }
                 print(f"✅ Chat ready for video {video_id} ({availability['chunk_count']} chunks)")
             else:
-                # Check if transcript is cached (processing may be in progress)
-                cached_transcript = check_transcript_cache(video_id)
+                # A cached transcript means processing is in progress or partly done
                 if cached_transcript:
                     status_response = {
                         "available": False,
                         "status": "processing",
-                        "chunk_count": 0,
+                        "chunk_count": availability.get("chunk_count", 0),
+                        "chunks_expected": availability.get("chunks_expected"),
                         "message": "Transcript available, RAG processing in progress. Check back in 2-3 minutes.",
                         "video_id": video_id,
                         "retry_after": 120  # Suggest retry in 2 minutes
@@ -541,7 +987,7 @@ async def chat_with_video():
     try:
         data = request.get_json()
         chat_input = data.get('chatInput')
-        video_id = data.get('video_id')
+        video_id = resolve_video_id(data.get('video_id'))
         session_id = data.get('sessionId', video_id)  # Use video_id as default session
 
         if not chat_input:
@@ -601,8 +1047,11 @@ if __name__ == '__main__':
     print("Server will be available at http://localhost:8080")
     print("Endpoints:")
     print("  - Health check: GET http://localhost:8080/health")
-    print("  - Get transcript: POST http://localhost:8080/transcript")
+    print("  - Get transcript: POST http://localhost:8080/transcript (or GET ?url=... with ETags)")
+    print("  - Transcript range: GET http://localhost:8080/transcript/<video_id>?from=&to=&cursor=")
     print("  - Chat status: GET http://localhost:8080/chat/status/<video_id>")
     print("  - Chat with video: POST http://localhost:8080/chat")
+    print("  - Repair RAG chunks: POST http://localhost:8080/admin/repair/<video_id>")
+    print("  - Migrate cached transcripts: POST http://localhost:8080/admin/migrate-cache?reindex=true")
     print("Direct RAG architecture - no external dependencies")
     app.run(debug=True, host='0.0.0.0', port=8080)
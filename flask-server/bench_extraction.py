@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: yt-dlp command vs in-process extraction with warm YoutubeDL instances.
+
+Each video is extracted with both paths. The subprocess path starts a new
+interpreter and writes .vtt files to a temp directory every time. The
+in-process path reuses one YoutubeDL, so only its first extraction pays for
+imports and player JS. Needs network access to YouTube.
+
+Usage:
+    python bench_extraction.py                       # a few short public videos
+    python bench_extraction.py URL [URL ...] --repeat 3
+"""
+
+import argparse
+import statistics
+import time
+
+from ytdlp_extractor import YtDlpExtractor, download_subtitles_cli
+from vtt_parser import parse_vtt_content
+
+DEFAULT_URLS = [
+    "https://www.youtube.com/watch?v=jNQXAC9IVRw",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=9bZkp7q19f0",
+]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    try:
+        result = fn(*args)
+        return time.perf_counter() - started, result, None
+    except Exception as e:
+        return time.perf_counter() - started, None, e
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", default=DEFAULT_URLS)
+    parser.add_argument("--repeat", type=int, default=2, help="Extractions per video and path")
+    args = parser.parse_args()
+
+    extractor = YtDlpExtractor(instances=1)
+    timings = {"subprocess": [], "in-process": []}
+
+    header = f"{'video':<14} {'run':>3} {'subprocess s':>13} {'in-process s':>13} {'entries':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for url in args.urls:
+        video_id = url.rsplit("=", 1)[-1]
+        for run in range(args.repeat):
+            cli_time, _, cli_error = timed(download_subtitles_cli, url, video_id)
+            warm_time, result, warm_error = timed(extractor.extract, url)
+
+            if cli_error or warm_error:
+                print(f"{video_id:<14} {run:>3} failed: {cli_error or warm_error}")
+                continue
+
+            timings["subprocess"].append(cli_time)
+            timings["in-process"].append(warm_time)
+            entries = len(parse_vtt_content(result["vtt"]))
+            print(f"{video_id:<14} {run:>3} {cli_time:>13.2f} {warm_time:>13.2f} {entries:>8}")
+
+    print()
+    for path, values in timings.items():
+        if values:
+            print(f"{path:<11} median {statistics.median(values):.2f}s  mean {statistics.mean(values):.2f}s  over {len(values)} runs")
+
+
+if __name__ == "__main__":
+    main()
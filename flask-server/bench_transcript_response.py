@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: jsonify vs pre-serialized /transcript responses for a cache hit.
+
+Serves a synthetic transcript through a minimal Flask app with Flask's test
+client, once with the jsonify path /transcript used for cache hits (the whole
+response dict re-serialized per request) and once with
+CachedTranscriptResponse (fields serialized once, per-request fields
+spliced in, gzip built once). Reports requests/second for each.
+
+Usage:
+    python bench_transcript_response.py                 # 3h auto-captions
+    python bench_transcript_response.py --hours 1 --requests 500
+"""
+
+import argparse
+import time
+
+from flask import Flask, Response, jsonify
+
+from bench_vtt_parser import synthetic_vtt
+from transcript import Transcript
+from transcript_response import ORJSON_AVAILABLE, CachedTranscriptResponse
+from vtt_parser import parse_vtt_content
+
+
+def make_app(row):
+    app = Flask(__name__)
+    cached_response = CachedTranscriptResponse(dict(row, transcript_data=Transcript(row["transcript_data"])))
+
+    @app.route('/jsonify')
+    def legacy():
+        return jsonify({
+            "success": True,
+            "video_id": row["video_id"],
+            "title": row["title"],
+            "url": row["url"],
+            "language": row["language"],
+            "language_code": row["language_code"],
+            "transcript": row["transcript_data"],
+            "metadata": row["metadata"],
+            "rag_stored": True,
+            "cached": True,
+            "extraction_time": 0
+        })
+
+    @app.route('/preserialized')
+    def preserialized():
+        return Response(cached_response.body_parts(True), mimetype='application/json')
+
+    @app.route('/preserialized-gzip')
+    def preserialized_gzip():
+        return Response(cached_response.body(True, "gzip"), mimetype='application/json',
+                        headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per path")
+    args = parser.parse_args()
+
+    transcript = parse_vtt_content(synthetic_vtt(args.hours, rolling=False))
+    row = {
+        "video_id": "dQw4w9WgXcQ",
+        "title": "Synthetic transcript",
+        "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "language": "English",
+        "language_code": "en",
+        "transcript_data": transcript,
+        "metadata": {"duration": args.hours * 3600}
+    }
+    client = make_app(row).test_client()
+
+    print(f"{len(transcript)} cues, encoder: {'orjson' if ORJSON_AVAILABLE else 'json'}")
+    header = f"{'path':<20} {'req/s':>9} {'ms/req':>8} {'body KB':>9}"
+    print(header)
+    print("-" * len(header))
+
+    bodies = {}
+    for path in ("/jsonify", "/preserialized", "/preserialized-gzip"):
+        client.get(path)  # warm up; builds the pre-serialized body once
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            response = client.get(path)
+        elapsed = time.perf_counter() - started
+
+        bodies[path] = response.get_json() if path != "/preserialized-gzip" else None
+        print(f"{path:<20} {args.requests / elapsed:>9.0f} {elapsed / args.requests * 1000:>8.2f} {len(response.data) / 1024:>9.0f}")
+
+    assert bodies["/jsonify"] == bodies["/preserialized"], "pre-serialized body differs from jsonify"
+    print("\nBodies identical after parsing.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark: split-and-rescan VTT parser vs the streaming VttReader.
+
+Parses synthetic 1, 5 and 12 hour caption files in both YouTube formats
+(manual captions and rolling auto-captions) with the parser used before
+VttReader and with parse_vtt_content, reporting time and peak memory for
+each and checking that both produce identical transcripts.
+
+Usage:
+    python bench_vtt_parser.py                  # 1h, 5h and 12h
+    python bench_vtt_parser.py --hours 2 --repeat 5
+"""
+
+import argparse
+import io
+import random
+import re
+import statistics
+import time
+import tracemalloc
+
+from vtt_parser import dedupe_rolling_cues, parse_vtt_content, seconds_to_time_str, time_str_to_seconds
+
+WORDS = "so the idea here is that we can take this and really just make it work for you".split()
+
+_ROLLING_MARKUP = re.compile(r'<\d{2}:\d{2}:\d{2}\.\d{3}>|<c[.>]')
+
+
+def legacy_parse_vtt_content(vtt_content, dedupe=True):
+    """parse_vtt_content as it was before VttReader, kept for comparison."""
+    lines = vtt_content.split('\n')
+    transcript_data = []
+
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if '-->' in line:
+            parts = line.split(' --> ')
+            if len(parts) == 2:
+                start_time_str = parts[0].strip().split(' ')[0]
+                end_time_str = parts[1].strip().split(' ')[0]
+
+                start_seconds = time_str_to_seconds(start_time_str)
+                end_seconds = time_str_to_seconds(end_time_str)
+
+                text_lines = []
+                i += 1
+                while i < len(lines) and lines[i].rstrip('\r'):
+                    if lines[i].strip():
+                        text_lines.append(lines[i].strip())
+                    i += 1
+
+                if text_lines:
+                    text = ' '.join(text_lines)
+                    text = re.sub(r'<[^>]+>', '', text)
+
+                    transcript_data.append({
+                        "start": start_time_str,
+                        "end": end_time_str,
+                        "text": text,
+                        "start_seconds": start_seconds,
+                        "end_seconds": end_seconds
+                    })
+        i += 1
+
+    if dedupe and _ROLLING_MARKUP.search(vtt_content):
+        return dedupe_rolling_cues(transcript_data)
+
+    return transcript_data
+
+
+def synthetic_vtt(hours: float, rolling: bool, seed: int = 7) -> str:
+    """Generate a VTT file shaped like yt-dlp's manual or rolling auto-captions."""
+    rng = random.Random(seed)
+    out = ["WEBVTT\nKind: captions\nLanguage: en\n"]
+    t = 0.0
+    previous = " "
+
+    while t < hours * 3600:
+        duration = rng.uniform(1.2, 2.8)
+        words = [rng.choice(WORDS) for _ in range(rng.randint(3, 7))]
+        start, end = seconds_to_time_str(t), seconds_to_time_str(t + duration)
+
+        if rolling:
+            # Typed cue with inline word timings, then a 10 ms hold cue
+            step = duration / len(words)
+            typed = words[0] + ''.join(
+                f"<{seconds_to_time_str(t + step * n)}><c> {word}</c>" for n, word in enumerate(words[1:], 1)
+            )
+            hold = seconds_to_time_str(t + duration + 0.01)
+            out.append(f"{start} --> {end} align:start position:0%\n{previous}\n{typed}\n")
+            previous = ' '.join(words)
+            out.append(f"{end} --> {hold} align:start position:0%\n{previous}\n \n")
+            t += 0.01
+        else:
+            out.append(f"{start} --> {end}\n{' '.join(words)}\n")
+
+        t += duration
+
+    return '\n'.join(out)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 5, 12])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per file and parser")
+    args = parser.parse_args()
+
+    header = f"{'file':<12} {'MB':>6} {'cues':>7} {'legacy s':>9} {'stream s':>9} {'legacy MB':>10} {'stream MB':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for hours in args.hours:
+        for rolling in (False, True):
+            content = synthetic_vtt(hours, rolling)
+            name = f"{hours:g}h {'rolling' if rolling else 'manual'}"
+
+            legacy_times, stream_times = [], []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                expected = legacy_parse_vtt_content(content)
+                legacy_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                actual = parse_vtt_content(content)
+                stream_times.append(time.perf_counter() - started)
+
+            assert actual == expected, f"{name}: streaming output differs from the legacy parser"
+
+            # Peak memory is measured separately since tracemalloc slows both parsers
+            _, legacy_peak, _ = measure(legacy_parse_vtt_content, content)
+            _, stream_peak, _ = measure(parse_vtt_content, io.StringIO(content))
+
+            print(
+                f"{name:<12} {len(content) / 1e6:>6.1f} {len(actual):>7} "
+                f"{statistics.median(legacy_times):>9.3f} {statistics.median(stream_times):>9.3f} "
+                f"{legacy_peak / 1e6:>10.1f} {stream_peak / 1e6:>10.1f}"
+            )
+
+    print("\nAll outputs identical.")
+
+
+if __name__ == "__main__":
+    main()
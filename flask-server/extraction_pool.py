@@ -0,0 +1,226 @@
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+from ytdlp_extractor import ExtractionCancelled
+
+# Cache misses extracted in parallel on one node
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+
+# Jobs allowed to wait for a worker before new requests are turned away
+EXTRACTION_QUEUE_SIZE = int(os.getenv("EXTRACTION_QUEUE_SIZE", "8"))
+
+# Hard limit in seconds on one extraction, including time spent queued
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "120"))
+
+
+class ExtractionQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class ExtractionTimeout(Exception):
+    """Raised when an extraction doesn't finish within the hard timeout."""
+
+
+class ExtractionJob:
+    """One extraction running in the pool.
+
+    Jobs get their own output directory, so concurrent extractions never see
+    each other's files, and a cancellation event that the extraction function
+    checks to stop early.
+    """
+
+    def __init__(self, job_id: int, pool: Optional["ExtractionPool"] = None):
+        self.id = job_id
+        self.output_dir: Optional[str] = None
+        self.cancelled = threading.Event()
+        self.future: Optional[Future] = None
+        self.pool = pool
+        self.legs = 0
+        self.finished = False
+
+    def spawn(self, target: Callable[..., Any], *args, name: Optional[str] = None) -> threading.Thread:
+        """Run target(*args) on a thread counted against the pool's worker budget.
+
+        For work a job fans out to, like racing backends. A thread still
+        running after its job has finished keeps its worker slot until it
+        exits, so abandoned work that can't be interrupted doesn't let the
+        pool start more extractions than it has workers.
+        """
+        if self.pool is None:
+            thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+            thread.start()
+            return thread
+        return self.pool._spawn(self, target, args, name)
+
+    def cancel(self):
+        """Drop the job if still queued, otherwise ask the running extraction to stop."""
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class ExtractionPool:
+    """Bounded worker pool for transcript extraction.
+
+    At most `workers` extractions run at once and at most `max_queue` more wait
+    for a worker; anything beyond that is rejected with ExtractionQueueFull
+    instead of piling up behind 30-40 s extractions. Callers that time out
+    cancel their job, which kills a yt-dlp subprocess or abandons an in-process
+    extraction before the caption download. Threads a job spawns that outlive
+    it (lingering) hold a worker slot until they exit.
+    """
+
+    def __init__(
+        self,
+        workers: int = EXTRACTION_WORKERS,
+        max_queue: int = EXTRACTION_QUEUE_SIZE,
+        timeout: float = EXTRACTION_TIMEOUT
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract")
+        self._ids = itertools.count(1)
+        self._lock = threading.Condition()
+
+        self.queued = 0
+        self.running = 0
+        self.lingering = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    def _spawn(self, job: ExtractionJob, target: Callable[..., Any], args, name: Optional[str]) -> threading.Thread:
+        def run():
+            try:
+                target(*args)
+            finally:
+                with self._lock:
+                    job.legs -= 1
+                    if job.finished:
+                        self.lingering -= 1
+                        self._lock.notify_all()
+
+        with self._lock:
+            job.legs += 1
+        thread = threading.Thread(target=run, name=name or f"extract-{job.id}-leg", daemon=True)
+        thread.start()
+        return thread
+
+    def _run_job(self, job: ExtractionJob, fn: Callable[..., Any], args, kwargs) -> Any:
+        with self._lock:
+            # Wait for the slots lingering threads of finished jobs still hold
+            while self.running + self.lingering >= self.workers and not job.cancelled.is_set():
+                self._lock.wait(0.5)
+            self.queued -= 1
+            self.running += 1
+
+        try:
+            if job.cancelled.is_set():
+                raise ExtractionCancelled(f"Extraction job {job.id} cancelled before it started")
+
+            job.output_dir = tempfile.mkdtemp(prefix=f"extract-{job.id}-")
+            try:
+                result = fn(job, *args, **kwargs)
+            finally:
+                # A cancelled subprocess may still be writing here as it exits
+                shutil.rmtree(job.output_dir, ignore_errors=True)
+
+            with self._lock:
+                self.completed += 1
+            return result
+
+        except ExtractionCancelled:
+            with self._lock:
+                self.cancelled += 1
+            raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+                job.finished = True
+                self.lingering += job.legs
+                self._lock.notify_all()
+
+    def _on_done(self, future: Future):
+        # Jobs cancelled while queued never reach _run_job
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+                self.cancelled += 1
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> ExtractionJob:
+        """Queue fn(job, *args, **kwargs) on the pool.
+
+        Raises:
+            ExtractionQueueFull: If all workers are busy and the queue is full
+        """
+        with self._lock:
+            waiting = self.running + self.lingering + self.queued - self.workers
+            if waiting >= self.max_queue:
+                self.rejected += 1
+                raise ExtractionQueueFull(
+                    f"Extraction queue full ({self.running} running, {self.lingering} lingering, {self.queued} queued)"
+                )
+            self.queued += 1
+
+        job = ExtractionJob(next(self._ids), self)
+        job.future = self._executor.submit(self._run_job, job, fn, args, kwargs)
+        job.future.add_done_callback(self._on_done)
+        return job
+
+    def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run fn(job, *args, **kwargs) on the pool and wait for its result.
+
+        Args:
+            fn: Extraction function; receives the ExtractionJob as its first argument
+            timeout: Seconds to wait, defaulting to the pool's hard timeout
+
+        Raises:
+            ExtractionQueueFull: If the job can't be queued
+            ExtractionTimeout: If the job doesn't finish in time; it is cancelled
+        """
+        timeout = self.timeout if timeout is None else timeout
+        job = self.submit(fn, *args, **kwargs)
+        started = time.monotonic()
+
+        try:
+            return job.future.result(timeout=timeout)
+        except FutureTimeout:
+            job.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise ExtractionTimeout(
+                f"Extraction job {job.id} timed out after {time.monotonic() - started:.0f}s"
+            ) from None
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy and job counters."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "lingering": self.lingering,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Memory held by cached transcripts on one node
+TRANSCRIPT_MEMORY_CACHE_BYTES = int(os.getenv("TRANSCRIPT_MEMORY_CACHE_BYTES", str(128 * 1024 * 1024)))
+
+# Seconds a cached transcript is served before it is read from Supabase again
+TRANSCRIPT_MEMORY_CACHE_TTL = float(os.getenv("TRANSCRIPT_MEMORY_CACHE_TTL", "600"))
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache bounded in bytes, with a TTL.
+
+    Each entry's size is given by the caller (or measured with sizeof). When a
+    put takes the total past max_bytes, least recently used entries are
+    evicted until it fits; an entry larger than the whole cache isn't stored.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = TRANSCRIPT_MEMORY_CACHE_BYTES,
+        ttl: float = TRANSCRIPT_MEMORY_CACHE_TTL,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size, expires)
+        self._lock = threading.Lock()
+
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, _, expires = entry
+            if self._clock() >= expires:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> bool:
+        """Store value, evicting least recently used entries to make room.
+
+        Returns:
+            False if the value is too large to cache at all
+        """
+        if size is None:
+            size = self.sizeof(value) if self.sizeof else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return False
+
+            while self._entries and self.total_bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+            self._entries[key] = (value, size, self._clock() + self.ttl)
+            self.total_bytes += size
+            return True
+
+    def grow(self, key: Hashable, nbytes: int):
+        """Account for memory an entry's value gained after it was stored.
+
+        Other entries are evicted if the cache is now over max_bytes.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            value, size, expires = entry
+            self._entries[key] = (value, size + nbytes, expires)
+            self.total_bytes += nbytes
+
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    self._entries.move_to_end(key)
+                    continue
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and self._clock() < entry[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of occupancy and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -0,0 +1,117 @@
+import re
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from ytdlp_extractor import SubtitlesNotFound
+
+# Reason code -> how long the failure is remembered (seconds), the HTTP
+# status /transcript answers with, and the message shown to the user
+REASONS: Dict[str, Dict] = {
+    "no_subtitles": {
+        # New uploads get auto-captions a while after publishing
+        "ttl": 6 * 3600,
+        "status": 404,
+        "message": "This video has no subtitles in the requested languages"
+    },
+    "private": {
+        "ttl": 3600,
+        "status": 403,
+        "message": "This video is private"
+    },
+    "age_restricted": {
+        "ttl": 24 * 3600,
+        "status": 403,
+        "message": "This video is age-restricted and needs a signed-in account"
+    },
+    "members_only": {
+        "ttl": 24 * 3600,
+        "status": 403,
+        "message": "This video is only available to channel members"
+    },
+    "unavailable": {
+        "ttl": 24 * 3600,
+        "status": 404,
+        "message": "This video is unavailable or has been removed"
+    },
+    "upcoming": {
+        "ttl": 600,
+        "status": 409,
+        "message": "This video is an upcoming live stream or premiere"
+    }
+}
+
+
+class NoTranscript(Exception):
+    """Raised when a video is known to have no extractable transcript.
+
+    Carries the reason code, the matching HTTP status and user message, and
+    when the video may be tried again.
+    """
+
+    def __init__(self, reason: str, expires_at: Optional[str] = None, cached: bool = False):
+        self.reason = reason
+        self.status = REASONS[reason]["status"]
+        self.message = REASONS[reason]["message"]
+        self.expires_at = expires_at
+        self.cached = cached
+        super().__init__(self.message)
+
+    def retry_after(self) -> int:
+        """Seconds until the failure expires, or the reason's full TTL if unknown."""
+        try:
+            expires_at = datetime.fromisoformat(self.expires_at.replace("Z", "+00:00"))
+        except (AttributeError, ValueError):
+            return REASONS[self.reason]["ttl"]
+        return max(0, int((expires_at - datetime.now(timezone.utc)).total_seconds()))
+
+
+# Checked in order; video-state reasons come before no_subtitles because a
+# private or removed video also has no subtitles to find
+_PATTERNS = [
+    ("private", re.compile(r"private video|video is private", re.I)),
+    ("age_restricted", re.compile(r"confirm your age|age[- ]restricted|inappropriate for some users|AgeRestricted", re.I)),
+    ("members_only", re.compile(r"members[- ]only|join this channel", re.I)),
+    ("upcoming", re.compile(r"live event will begin|premieres in|is upcoming", re.I)),
+    ("unavailable", re.compile(r"video unavailable|has been removed|no longer available|VideoUnavailable|InvalidVideoId", re.I)),
+    ("no_subtitles", re.compile(r"no subtitle|subtitles are disabled|TranscriptsDisabled|NoTranscriptFound|empty transcript", re.I))
+]
+_ORDER = [reason for reason, _ in _PATTERNS]
+
+
+def _causes(error: BaseException) -> Iterable[BaseException]:
+    """Yield the exception and the exceptions it was raised from."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__
+
+
+def classify_failure(error: BaseException) -> Optional[str]:
+    """Map an extraction failure to a reason code, or None if it may be transient.
+
+    Timeouts, rate limits and network errors return None so they are retried
+    on the next request instead of being cached. When several backends
+    failed, a reason is only returned if every one of them failed for a
+    lasting reason; one transient or unrecognised failure makes the whole
+    failure transient.
+    """
+    for current in _causes(error):
+        backend_errors = getattr(current, "errors", None)
+        if isinstance(backend_errors, dict) and backend_errors:
+            reasons = [classify_failure(e) for e in backend_errors.values()]
+            if None in reasons:
+                return None
+            return min(reasons, key=_ORDER.index)
+
+    errors = list(_causes(error))
+    # The yt-dlp command's reason is in its stderr, not the exception message
+    descriptions = [f"{type(e).__name__}: {e} {getattr(e, 'stderr', None) or ''}" for e in errors]
+
+    for reason, pattern in _PATTERNS:
+        if any(pattern.search(text) for text in descriptions):
+            return reason
+
+    if any(isinstance(e, SubtitlesNotFound) for e in errors):
+        return "no_subtitles"
+    return None
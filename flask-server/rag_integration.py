@@ -5,12 +5,14 @@ from typing import Optional, Dict, Any, List
 import traceback
 from datetime import datetime
 
+from single_flight import SingleFlight
+
 # Add rag-agent to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'rag-agent'))
 
 try:
     from rag_agent import youtube_ai_assistant, PydanticAIDeps
-    from ingest_youtube import process_and_store_transcript
+    from ingest_youtube import chunker_id, resume_transcript_ingest
     RAG_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ RAG components not available: {e}")
@@ -27,6 +29,8 @@ class RAGIntegration:
             supabase=supabase_client,
             openai_client=openai_client
         )
+        # One ingest per video at a time; concurrent callers share its summary
+        self._ingests = SingleFlight()
         print("✅ RAG Integration initialized")
     
     async def ingest_transcript(
@@ -34,59 +38,120 @@ class RAGIntegration:
         video_id: str, 
         video_url: str, 
         video_title: str, 
-        transcript_data: List[Dict]
+        transcript_data: List[Dict],
+        language_code: str = "en",
+        repair: bool = False
     ) -> bool:
         """
-        Safely ingest transcript data into RAG system with duplicate detection.
+        Safely ingest transcript data into RAG system, embedding only missing chunks.
+        
+        Args:
+            video_id: YouTube video ID
+            video_url: Full YouTube URL
+            video_title: Video title
+            transcript_data: Parsed VTT transcript data
+            language_code: Caption language of transcript_data
+            repair: Also re-embed rows stored without an embedding
+            
+        Returns:
+            bool: True if every expected chunk is now stored (new or existing),
+                False if the ingest failed or left gaps
+        """
+        summary = await self.resume_ingest(video_id, video_url, video_title, transcript_data, language_code, repair=repair)
+        return bool(summary.get("complete", False))
+
+    async def resume_ingest(
+        self,
+        video_id: str,
+        video_url: str,
+        video_title: str,
+        transcript_data: List[Dict],
+        language_code: str = "en",
+        repair: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Compare the expected chunk set with what is stored and fill the gaps.
+        
+        If an ingest or repair is already running for the video, waits for it
+        and returns its summary instead of embedding the video a second time.
+        A repair never settles for a plain ingest's summary: it waits for that
+        ingest to finish and then runs its own pass.
         
         Args:
             video_id: YouTube video ID
             video_url: Full YouTube URL
             video_title: Video title
             transcript_data: Parsed VTT transcript data
+            language_code: Caption language of transcript_data
+            repair: Also re-embed rows stored without an embedding
             
         Returns:
-            bool: True if RAG data is available (new or existing), False if failed
+            Dict: Ingest summary with expected, existing, missing and stored chunk counts
         """
+        while True:
+            summary, shared = await self._ingests.do_async(
+                video_id, self._resume_ingest, video_id, video_url, video_title, transcript_data, language_code, repair
+            )
+            if not shared:
+                return summary
+            if summary.get("repair") or not repair:
+                print(f"🔗 Joined RAG {'repair' if summary.get('repair') else 'ingest'} already running for video {video_id}")
+                return summary
+            print(f"⏳ Plain RAG ingest finished for video {video_id}, starting repair")
+
+    def ingest_in_progress(self, video_id: str) -> bool:
+        """Whether an ingest or repair is currently running for video_id."""
+        return self._ingests.in_flight(video_id)
+
+    async def _resume_ingest(
+        self,
+        video_id: str,
+        video_url: str,
+        video_title: str,
+        transcript_data: List[Dict],
+        language_code: str,
+        repair: bool
+    ) -> Dict[str, Any]:
         try:
-            print(f"🔄 Starting RAG ingest for video {video_id}")
+            print(f"🔄 Starting RAG {'repair' if repair else 'ingest'} for video {video_id}")
             print(f"   Title: {video_title}")
-            print(f"   Transcript entries: {len(transcript_data)}")
-            
-            # Check if chunks already exist (duplicate detection)
-            existing_chunks = self.deps.supabase.from_('youtube_transcript_pages') \
-                .select('chunk_number', count='exact') \
-                .eq('video_id', video_id) \
-                .execute()
-            
-            if existing_chunks.count and existing_chunks.count > 0:
-                print(f"✅ Video {video_id} already processed with {existing_chunks.count} chunks")
-                print(f"   Skipping chunking and embedding generation (cost savings)")
-                return True  # RAG data is available for chat
-            
-            print(f"🆕 No existing chunks found, processing video {video_id}")
+            print(f"   Transcript entries: {len(transcript_data)} ({language_code})")
             
-            # Call the ingest function from rag-agent (only if no chunks exist)
-            result = await process_and_store_transcript(
+            summary = await resume_transcript_ingest(
                 video_id=video_id,
                 video_url=video_url,
                 video_title=video_title,
-                transcript_data=transcript_data
+                transcript_data=transcript_data,
+                language_code=language_code,
+                repair=repair
             )
+            summary["repair"] = repair
             
-            if result:
+            if not summary["chunks_missing"]:
+                print(f"✅ Video {video_id} already processed with {summary['chunks_existing']} chunks")
+                print(f"   Skipping chunking and embedding generation (cost savings)")
+            elif summary["complete"]:
                 print(f"✅ RAG ingest completed successfully for video {video_id}")
-                print(f"   Stored {len(result)} new chunks in database")
-                return True
+                print(f"   Stored {summary['chunks_stored']} missing chunks ({summary['chunks_existing']} already existed)")
+                print(f"   Embedding cache: {summary['cache_hits']} hits, {summary['cache_misses']} misses")
+                print(f"   Normalization saved {summary['tokens_saved']} of {summary['tokens_before']} tokens")
             else:
-                print(f"⚠️ RAG ingest returned no results for video {video_id}")
-                return False
+                print(f"⚠️ RAG ingest incomplete for video {video_id}")
+                print(f"   Stored {summary['chunks_stored']}/{summary['chunks_missing']} missing chunks, {summary['batches_failed']} batches failed")
+                print("   Re-run ingest to fill the remaining gaps")
+            
+            return summary
                 
         except Exception as e:
             print(f"❌ RAG ingest failed for video {video_id}")
             print(f"   Error: {str(e)}")
             print(f"   Traceback: {traceback.format_exc()}")
-            return False
+            return {
+                "video_id": video_id,
+                "complete": False,
+                "repair": repair,
+                "error": str(e)
+            }
     
     async def chat_with_video(self, video_id: str, chat_input: str) -> Dict[str, Any]:
         """
@@ -145,24 +210,47 @@ class RAGIntegration:
         """
         Check if a video's transcript data is available in the RAG system.
         
+        The video only counts as available once every chunk recorded for it at
+        ingest time (by the current chunker, in the language it was indexed in)
+        is stored, so a partly indexed video is reported as incomplete and gets
+        resumed. Videos without an ingest record for the current chunker are
+        incomplete.
+        
         Args:
             video_id: YouTube video ID to check
             
         Returns:
-            Dict with availability status and metadata
+            Dict with availability status, stored and expected chunk counts and
+            the indexed language_code; error is set if the check itself failed
         """
         try:
-            # Query database for video chunks
-            result = self.deps.supabase.from_('youtube_transcript_pages') \
-                .select('chunk_number', count='exact') \
+            # Language and expected chunk count recorded when the video was ingested
+            record = self.deps.supabase.from_('youtube_transcript_ingests') \
+                .select('language_code, chunker, chunks_expected') \
                 .eq('video_id', video_id) \
                 .execute()
+            record = record.data[0] if record.data else None
+            
+            # Query database for video chunks
+            query = self.deps.supabase.from_('youtube_transcript_pages') \
+                .select('chunk_number', count='exact') \
+                .eq('video_id', video_id)
+            
+            expected = None
+            if record and record["chunker"] == chunker_id():
+                expected = record["chunks_expected"]
+                query = query.eq('metadata->>chunker', record["chunker"]).lt('chunk_number', expected)
             
+            result = query.execute()
             chunk_count = result.count if result.count else 0
+            complete = expected is not None and chunk_count >= expected
             
             return {
-                "available": chunk_count > 0,
+                "available": chunk_count > 0 and complete,
                 "chunk_count": chunk_count,
+                "chunks_expected": expected,
+                "complete": complete,
+                "language_code": record["language_code"] if record else None,
                 "video_id": video_id
             }
             
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """A call in flight; followers wait on event and read its outcome."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait and receive the same result, or the same
+    exception. Nothing is cached: once the leader finishes, the next call for
+    the key runs again. Works across threads, including coroutines running in
+    separate event loops under asyncio.run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key: Hashable, call: _Call, result: Any = None, error: BaseException = None):
+        call.result = result
+        call.error = error
+        with self._lock:
+            del self._calls[key]
+        call.event.set()
+
+    @staticmethod
+    def _outcome(call: _Call) -> Any:
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for key is currently running."""
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """Run fn(*args, **kwargs) unless a call for key is already running.
+
+        Returns:
+            Tuple of (result, shared); shared is True for callers that waited
+            on another caller's execution
+        """
+        call, leader = self._join(key)
+        if not leader:
+            call.event.wait()
+            return self._outcome(call), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result=result)
+        return result, False
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Tuple[Any, bool]:
+        """Async variant of do(); fn is a coroutine function.
+
+        Followers wait in the default executor, so a leader running in another
+        thread's event loop doesn't block theirs.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            await asyncio.get_running_loop().run_in_executor(None, call.event.wait)
+            return self._outcome(call), True
+
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result=result)
+        return result, False
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+import pytest
+
+from extraction_pool import ExtractionPool, ExtractionQueueFull, ExtractionTimeout
+from ytdlp_extractor import ExtractionCancelled
+
+
+def write_file(job, name, text):
+    path = os.path.join(job.output_dir, name)
+    with open(path, "w") as f:
+        f.write(text)
+    time.sleep(0.05)
+    with open(path) as f:
+        return job.output_dir, f.read()
+
+
+def wait_for_cancel(job, started):
+    started.set()
+    if not job.cancelled.wait(5):
+        return "finished"
+    raise ExtractionCancelled(f"job {job.id} cancelled")
+
+
+class TestExtractionPool:
+    """Test cases for the bounded extraction pool."""
+
+    def test_jobs_get_separate_output_dirs(self):
+        pool = ExtractionPool(workers=4, max_queue=4)
+        results = []
+
+        def work(i):
+            results.append(pool.run(write_file, "abc.en.vtt", f"video {i}"))
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(text for _, text in results) == [f"video {i}" for i in range(4)]
+        assert len({output_dir for output_dir, _ in results}) == 4
+        # Output directories are removed when the job ends
+        assert not any(os.path.exists(output_dir) for output_dir, _ in results)
+        assert pool.stats()["completed"] == 4
+        pool.shutdown()
+
+    def test_rejects_when_queue_full(self):
+        pool = ExtractionPool(workers=1, max_queue=1)
+        started = threading.Event()
+        running = pool.submit(wait_for_cancel, started)
+        started.wait(5)
+        queued = pool.submit(lambda job: "queued")
+
+        assert pool.stats()["queue_depth"] == 1
+        with pytest.raises(ExtractionQueueFull):
+            pool.submit(lambda job: "rejected")
+        assert pool.stats()["rejected"] == 1
+
+        running.cancel()
+        assert queued.future.result(5) == "queued"
+        pool.shutdown()
+
+    def test_timeout_cancels_running_job(self):
+        pool = ExtractionPool(workers=1, max_queue=0)
+        started = threading.Event()
+
+        with pytest.raises(ExtractionTimeout):
+            pool.run(wait_for_cancel, started, timeout=0.1)
+
+        pool.shutdown()
+        stats = pool.stats()
+        assert stats["timed_out"] == 1
+        assert stats["cancelled"] == 1
+        assert stats["running"] == 0
+
+    def test_cancel_queued_job(self):
+        pool = ExtractionPool(workers=1, max_queue=2)
+        started = threading.Event()
+        running = pool.submit(wait_for_cancel, started)
+        started.wait(5)
+        queued = pool.submit(lambda job: "never")
+
+        queued.cancel()
+        assert pool.stats()["queue_depth"] == 0
+
+        running.cancel()
+        pool.shutdown()
+        assert pool.stats()["cancelled"] == 2
+
+    def test_failures_are_counted_and_raised(self):
+        pool = ExtractionPool(workers=1)
+
+        def fail(job):
+            raise ValueError("no captions")
+
+        with pytest.raises(ValueError):
+            pool.run(fail)
+        assert pool.stats()["failed"] == 1
+        pool.shutdown()
+
+    def test_lingering_threads_hold_worker_slots(self):
+        pool = ExtractionPool(workers=1, max_queue=1)
+        release = threading.Event()
+
+        def fan_out(job):
+            job.spawn(release.wait, 5)
+            return "won"
+
+        assert pool.run(fan_out) == "won"
+        assert pool.stats()["lingering"] == 1
+
+        # The leg still holds the only worker, so the next job waits for it
+        started = threading.Event()
+        job = pool.submit(lambda job: started.set())
+        assert not started.wait(0.2)
+        with pytest.raises(ExtractionQueueFull):
+            pool.submit(lambda job: None)
+
+        release.set()
+        assert started.wait(2)
+        job.future.result(timeout=2)
+        assert pool.stats()["lingering"] == 0
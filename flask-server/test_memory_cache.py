@@ -0,0 +1,107 @@
+import threading
+
+from memory_cache import MemoryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryCache:
+    """Test cases for the byte-bounded LRU/TTL cache."""
+
+    def test_hit_and_miss(self):
+        cache = MemoryCache(max_bytes=100, ttl=60)
+
+        assert cache.get("abc") is None
+        cache.put("abc", "rows", size=10)
+
+        assert cache.get("abc") == "rows"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, 10)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = MemoryCache(max_bytes=100, ttl=60)
+        cache.put("a", 1, size=40)
+        cache.put("b", 2, size=40)
+        cache.get("a")
+
+        cache.put("c", 3, size=40)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert cache.stats()["evictions"] == 1
+        assert cache.total_bytes == 80
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = MemoryCache(max_bytes=100, ttl=60)
+        cache.put("a", 1, size=40)
+
+        assert not cache.put("huge", 2, size=101)
+
+        assert "huge" not in cache
+        assert cache.get("a") == 1
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = MemoryCache(max_bytes=100, ttl=10, clock=clock)
+        cache.put("abc", "rows", size=10)
+
+        clock.now = 10
+        assert cache.get("abc") is None
+
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["bytes"] == 0
+
+    def test_replacing_an_entry_updates_its_size(self):
+        cache = MemoryCache(max_bytes=100, ttl=60)
+        cache.put("abc", "old", size=30)
+        cache.put("abc", "new", size=50)
+
+        assert cache.get("abc") == "new"
+        assert cache.total_bytes == 50
+
+    def test_invalidate_and_clear(self):
+        cache = MemoryCache(max_bytes=100, ttl=60, sizeof=len)
+        cache.put("a", "xxxx")
+        cache.put("b", "yy")
+
+        assert cache.invalidate("a")
+        assert not cache.invalidate("a")
+        assert cache.total_bytes == 2
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.total_bytes == 0
+
+    def test_concurrent_access_keeps_byte_count(self):
+        cache = MemoryCache(max_bytes=1000, ttl=60)
+
+        def work(n):
+            for i in range(200):
+                cache.put((n, i % 20), i, size=7)
+                cache.get((n, (i + 1) % 20))
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cache.total_bytes == 7 * len(cache) <= 1000
+
+    def test_grow_accounts_for_added_bytes_and_evicts_others(self):
+        cache = MemoryCache(max_bytes=100, ttl=60)
+        cache.put("a", 1, size=40)
+        cache.put("b", 2, size=40)
+
+        cache.grow("b", 30)
+
+        assert "a" not in cache
+        assert cache.get("b") == 2
+        assert cache.total_bytes == 70
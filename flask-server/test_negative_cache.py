@@ -0,0 +1,82 @@
+import socket
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+from negative_cache import REASONS, NoTranscript, classify_failure
+from transcript_extractor import TranscriptUnavailable
+from ytdlp_extractor import SubtitlesNotFound
+
+
+class TestClassifyFailure:
+    """Test cases for mapping extraction failures to reason codes."""
+
+    def test_no_subtitles(self):
+        assert classify_failure(SubtitlesNotFound("No en captions for url")) == "no_subtitles"
+
+    def test_ytdlp_messages(self):
+        assert classify_failure(Exception("ERROR: [youtube] abc: Private video. Sign in if you've been granted access")) == "private"
+        assert classify_failure(Exception("ERROR: [youtube] abc: Sign in to confirm your age")) == "age_restricted"
+        assert classify_failure(Exception("ERROR: [youtube] abc: Video unavailable")) == "unavailable"
+        assert classify_failure(Exception("ERROR: [youtube] abc: This live event will begin in 3 hours.")) == "upcoming"
+        assert classify_failure(Exception("Join this channel to get access to members-only content")) == "members_only"
+
+    def test_command_stderr(self):
+        error = subprocess.CalledProcessError(1, ["yt-dlp"], "", "ERROR: [youtube] abc: Private video")
+        assert classify_failure(error) == "private"
+
+    def test_transient_failures_are_not_cached(self):
+        assert classify_failure(TimeoutError("timed out")) is None
+        assert classify_failure(Exception("HTTP Error 429: Too Many Requests")) is None
+
+    def test_backend_errors(self):
+        error = TranscriptUnavailable("No transcript backend succeeded for abc", {
+            "transcript_api": SubtitlesNotFound("transcript_api returned an empty transcript"),
+            "ytdlp": SubtitlesNotFound("No en captions")
+        })
+        assert classify_failure(error) == "no_subtitles"
+
+    def test_one_transient_backend_makes_the_failure_transient(self):
+        error = TranscriptUnavailable("No transcript backend succeeded for abc", {
+            "transcript_api": SubtitlesNotFound("No en captions"),
+            "ytdlp": socket.timeout("timed out")
+        })
+        assert classify_failure(error) is None
+
+        error = TranscriptUnavailable("No transcript backend succeeded for abc", {
+            "transcript_api": Exception("YouTube is blocking requests from your IP"),
+            "ytdlp": Exception("ERROR: [youtube] abc: Private video")
+        })
+        assert classify_failure(error) is None
+
+    def test_video_state_beats_no_subtitles(self):
+        error = TranscriptUnavailable("No transcript backend succeeded for abc", {
+            "transcript_api": SubtitlesNotFound("transcript_api returned an empty transcript"),
+            "ytdlp": Exception("ERROR: [youtube] abc: Private video")
+        })
+        assert classify_failure(error) == "private"
+
+    def test_cause_chain(self):
+        try:
+            try:
+                raise Exception("Video unavailable")
+            except Exception as e:
+                raise RuntimeError("extraction failed") from e
+        except RuntimeError as e:
+            assert classify_failure(e) == "unavailable"
+
+
+class TestNoTranscript:
+    """Test cases for the typed error returned by /transcript."""
+
+    def test_fields_from_reason(self):
+        error = NoTranscript("private")
+
+        assert error.status == 403
+        assert error.message == REASONS["private"]["message"]
+        assert error.retry_after() == REASONS["private"]["ttl"]
+
+    def test_retry_after_counts_down_to_expiry(self):
+        expires_at = (datetime.now(timezone.utc) + timedelta(minutes=10)).isoformat()
+
+        assert 590 <= NoTranscript("no_subtitles", expires_at, cached=True).retry_after() <= 600
+        assert NoTranscript("no_subtitles", "2000-01-01T00:00:00+00:00").retry_after() == 0
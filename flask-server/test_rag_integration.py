@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+from rag_integration import RAGIntegration
+from single_flight import SingleFlight
+
+
+def make_integration(run):
+    """RAGIntegration without the agent dependencies, running ingests with run(repair)."""
+    integration = RAGIntegration.__new__(RAGIntegration)
+    integration._ingests = SingleFlight()
+
+    async def resume(video_id, video_url, video_title, transcript_data, language_code, repair):
+        return await asyncio.get_running_loop().run_in_executor(None, run, repair)
+
+    integration._resume_ingest = resume
+    return integration
+
+
+class TestResumeIngest:
+    """Test cases for coalescing ingests and repairs per video."""
+
+    def ingest(self, integration, repair):
+        return asyncio.run(integration.resume_ingest("abc", "url", "Title", [], "en", repair=repair))
+
+    def test_repair_runs_after_plain_ingest_instead_of_sharing_it(self):
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def run(repair):
+            runs.append(repair)
+            if not repair:
+                started.set()
+                release.wait(5)
+            return {"repair": repair, "complete": True}
+
+        integration = make_integration(run)
+        plain = threading.Thread(target=self.ingest, args=(integration, False))
+        plain.start()
+        assert started.wait(2)
+
+        threading.Timer(0.05, release.set).start()
+        summary = self.ingest(integration, True)
+        plain.join(2)
+
+        assert runs == [False, True]
+        assert summary["repair"] is True
+
+    def test_plain_ingest_joins_running_repair(self):
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def run(repair):
+            runs.append(repair)
+            started.set()
+            release.wait(5)
+            return {"repair": repair, "complete": True}
+
+        integration = make_integration(run)
+        repair = threading.Thread(target=self.ingest, args=(integration, True))
+        repair.start()
+        assert started.wait(2)
+
+        threading.Timer(0.05, release.set).start()
+        summary = self.ingest(integration, False)
+        repair.join(2)
+
+        assert runs == [True]
+        assert summary["repair"] is True
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def run_concurrently(count, target):
+    results = []
+    errors = []
+
+    def work():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class TestSingleFlight:
+    """Test cases for coalescing concurrent calls per key."""
+
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def extract():
+            calls.append(1)
+            release.wait(5)
+            return "transcript"
+
+        def call():
+            return flight.do("abc", extract)
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        results, errors = run_concurrently(8, call)
+
+        assert not errors
+        assert len(calls) == 1
+        assert [result for result, _ in results] == ["transcript"] * 8
+        assert sorted(shared for _, shared in results) == [False] + [True] * 7
+        assert not flight.in_flight("abc")
+
+    def test_followers_receive_leader_exception(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ValueError("no captions")
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        results, errors = run_concurrently(4, lambda: flight.do("abc", fail))
+
+        assert results == []
+        assert len(errors) == 4
+        assert all(isinstance(e, ValueError) for e in errors)
+
+    def test_sequential_calls_run_again(self):
+        flight = SingleFlight()
+        calls = []
+
+        for _ in range(3):
+            flight.do("abc", calls.append, 1)
+
+        assert len(calls) == 3
+
+    def test_different_keys_run_independently(self):
+        flight = SingleFlight()
+
+        assert flight.do("abc", lambda: "a") == ("a", False)
+        assert flight.do("xyz", lambda: "x") == ("x", False)
+
+    def test_async_callers_in_separate_event_loops(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def ingest():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return {"chunks_stored": 3}
+
+        results, errors = run_concurrently(4, lambda: asyncio.run(flight.do_async("abc", ingest)))
+
+        assert not errors
+        assert len(calls) == 1
+        assert all(summary == {"chunks_stored": 3} for summary, _ in results)
+
+    def test_in_flight(self):
+        flight = SingleFlight()
+        seen = []
+
+        flight.do("abc", lambda: seen.append(flight.in_flight("abc")))
+
+        assert seen == [True]
+        assert not flight.in_flight("abc")
+
+    def test_leader_exception_propagates(self):
+        flight = SingleFlight()
+
+        with pytest.raises(KeyError):
+            flight.do("abc", lambda: {}["missing"])
+        assert not flight.in_flight("abc")
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from transcript import Transcript
+from vtt_parser import parse_vtt_content, seconds_to_time_str
+
+
+def cues(count, length=2.0):
+    return [
+        {
+            "start": seconds_to_time_str(n * length),
+            "end": seconds_to_time_str((n + 1) * length),
+            "text": f"cue {n} ünïcode",
+            "start_seconds": n * length,
+            "end_seconds": (n + 1) * length
+        }
+        for n in range(count)
+    ]
+
+
+class TestTranscript:
+    """Test cases for the columnar transcript store."""
+
+    def test_behaves_like_the_list_of_dicts(self):
+        entries = cues(5)
+        transcript = Transcript(entries)
+
+        assert len(transcript) == 5
+        assert transcript == entries
+        assert transcript[0] == entries[0]
+        assert transcript[-1] == entries[-1]
+        assert list(transcript) == entries
+        assert json.loads(json.dumps(transcript.to_list())) == entries
+        with pytest.raises(IndexError):
+            transcript[5]
+
+    def test_keeps_timestamps_that_do_not_round_trip(self):
+        entries = parse_vtt_content("WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nhi\n\n00:00:02.5 --> 00:00:03.000\nthere\n")
+
+        transcript = Transcript(entries)
+
+        assert transcript == entries
+        assert transcript[1]["start"] == "00:00:02.5"
+
+    def test_slices_are_views(self):
+        transcript = Transcript(cues(10))
+
+        view = transcript[2:5]
+
+        assert view == cues(10)[2:5]
+        assert view._text is transcript._text
+        assert view[1:] == cues(10)[3:5]
+        assert transcript[::3] == cues(10)[::3]
+        assert transcript.text(3) == "cue 3 ünïcode"
+
+    @pytest.mark.parametrize("start, end, expected", [
+        (None, None, list(range(10))),
+        (3.0, 7.0, [1, 2, 3]),
+        (4.0, 6.0, [2]),
+        (None, 4.0, [0, 1]),
+        (17.5, None, [8, 9]),
+        (25.0, 30.0, []),
+    ])
+    def test_between(self, start, end, expected):
+        transcript = Transcript(cues(10))
+
+        result = transcript.between(start, end)
+
+        assert [cue["text"].split()[1] for cue in result] == [str(n) for n in expected]
+
+    def test_between_unsorted_falls_back_to_scan(self):
+        entries = cues(4)
+        transcript = Transcript([entries[2], entries[0], entries[3], entries[1]])
+
+        assert transcript.between(2.0, 6.0) == [entries[2], entries[1]]
+
+    def test_page_walks_a_range_with_offsets(self):
+        transcript = Transcript(cues(10))
+        texts = []
+        offset = 0
+
+        while offset is not None:
+            page, offset, total = transcript.page(3.0, 15.0, offset=offset, limit=2)
+            texts += [cue["text"].split()[1] for cue in page]
+            assert total == 7
+
+        assert texts == ["1", "2", "3", "4", "5", "6", "7"]
+
+    def test_page_past_the_end_is_empty(self):
+        page, next_offset, total = Transcript(cues(10)).page(offset=50, limit=5)
+
+        assert len(page) == 0
+        assert next_offset is None
+        assert total == 10
+
+    def test_index_at(self):
+        transcript = Transcript(cues(10))
+
+        assert transcript.index_at(0.0) == 0
+        assert transcript.index_at(5.5) == 2
+        assert transcript.index_at(-1.0) == -1
+        assert transcript[4:].index_at(9.0) == 0
+
+    def test_from_entries_returns_transcripts_unchanged(self):
+        transcript = Transcript(cues(3))
+
+        assert Transcript.from_entries(transcript) is transcript
+        assert Transcript.from_entries(cues(3)) == transcript
+
+    def test_smaller_than_the_list_of_dicts(self):
+        transcript = Transcript(cues(1000))
+
+        # A cue dict alone is ~180 bytes before its strings and floats
+        assert transcript.nbytes < 1000 * 100
@@ -0,0 +1,190 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from transcript_extractor import (
+    TranscriptBackend, TranscriptExtractor, TranscriptUnavailable, extract_video_id, fetch_oembed_metadata,
+    write_transcript_file
+)
+from ytdlp_extractor import ExtractionCancelled
+
+ENTRY = {"start": "00:00:00.000", "end": "00:00:01.000", "text": "hello", "start_seconds": 0.0, "end_seconds": 1.0}
+
+
+class FakeBackend(TranscriptBackend):
+    """Backend that answers after a delay, fails, or waits to be cancelled."""
+
+    def __init__(self, name, delay=0.0, fail=False, empty=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.empty = empty
+        self.started = threading.Event()
+        self.saw_cancel = threading.Event()
+
+    def extract(self, video_url, video_id, cancelled=None, output_dir=None, languages=None):
+        self.started.set()
+        self.languages = languages
+        if cancelled is not None and cancelled.wait(self.delay):
+            self.saw_cancel.set()
+            raise ExtractionCancelled(self.name)
+        if cancelled is None:
+            time.sleep(self.delay)
+        if self.fail:
+            raise ValueError(f"{self.name} failed")
+        transcript = [] if self.empty else [dict(ENTRY, text=self.name)]
+        return {
+            "transcript": transcript,
+            "language": "en",
+            "tracks": {"en": {"transcript": transcript, "kind": "automatic", "name": "English"}},
+            "metadata": {"title": None}
+        }
+
+
+class TestRace:
+    """Test cases for racing backends."""
+
+    def test_fast_backend_wins_without_starting_slow_one(self):
+        fast, slow = FakeBackend("fast", delay=0.01), FakeBackend("slow", delay=0.01)
+        extractor = TranscriptExtractor([fast, slow], mode="race", hedge_delay=1)
+
+        result = extractor.extract("url", "abc")
+
+        assert result["backend"] == "fast"
+        assert result["transcript"][0]["text"] == "fast"
+        assert not slow.started.is_set()
+        assert extractor.stats()["fast"]["wins"] == 1
+
+    def test_hedge_starts_slow_backend_and_first_result_wins(self):
+        stuck, hedge = FakeBackend("stuck", delay=5), FakeBackend("hedge", delay=0.01)
+        extractor = TranscriptExtractor([stuck, hedge], mode="race", hedge_delay=0.05)
+
+        result = extractor.extract("url", "abc")
+
+        assert result["backend"] == "hedge"
+        # The losing backend is told to stop
+        assert stuck.saw_cancel.wait(1)
+        stats = extractor.stats()
+        assert stats["hedge"]["successes"] == 1
+        assert stats["stuck"]["attempts"] == 1
+
+    def test_failure_starts_next_backend_immediately(self):
+        broken, slow = FakeBackend("broken", fail=True), FakeBackend("slow", delay=0.01)
+        extractor = TranscriptExtractor([broken, slow], mode="race", hedge_delay=10)
+
+        started = time.monotonic()
+        result = extractor.extract("url", "abc")
+
+        assert result["backend"] == "slow"
+        assert time.monotonic() - started < 2
+        assert extractor.stats()["broken"]["failures"] == 1
+
+    def test_empty_transcript_is_not_a_win(self):
+        empty, good = FakeBackend("empty", empty=True), FakeBackend("good", delay=0.01)
+        extractor = TranscriptExtractor([empty, good], mode="race", hedge_delay=10)
+
+        assert extractor.extract("url", "abc")["backend"] == "good"
+        assert extractor.stats()["empty"]["failures"] == 1
+
+    def test_backends_start_through_spawn(self):
+        stuck, hedge = FakeBackend("stuck", delay=5), FakeBackend("hedge", delay=0.01)
+        extractor = TranscriptExtractor([stuck, hedge], mode="race", hedge_delay=0.05)
+        spawned = []
+
+        def spawn(fn, *args, name=None):
+            spawned.append(name)
+            threading.Thread(target=fn, args=args, daemon=True).start()
+
+        assert extractor.extract("url", "abc", spawn=spawn)["backend"] == "hedge"
+        assert spawned == ["transcript-stuck", "transcript-hedge"]
+
+    def test_all_backends_fail(self):
+        extractor = TranscriptExtractor(
+            [FakeBackend("a", fail=True), FakeBackend("b", fail=True)], mode="race", hedge_delay=0.01
+        )
+
+        with pytest.raises(TranscriptUnavailable) as excinfo:
+            extractor.extract("url", "abc")
+        assert set(excinfo.value.errors) == {"a", "b"}
+
+    def test_caller_cancellation(self):
+        stuck = FakeBackend("stuck", delay=5)
+        extractor = TranscriptExtractor([stuck, FakeBackend("other", delay=5)], mode="race", hedge_delay=10)
+        cancelled = threading.Event()
+        threading.Timer(0.05, cancelled.set).start()
+
+        with pytest.raises(ExtractionCancelled):
+            extractor.extract("url", "abc", cancelled=cancelled)
+        assert stuck.saw_cancel.wait(1)
+
+
+class TestFallback:
+    """Test cases for trying backends in order."""
+
+    def test_tries_backends_in_order(self):
+        broken, good = FakeBackend("broken", fail=True), FakeBackend("good")
+        extractor = TranscriptExtractor([broken, good], mode="fallback")
+
+        assert extractor.extract("url", "abc")["backend"] == "good"
+        stats = extractor.stats()
+        assert stats["broken"]["failures"] == 1
+        assert stats["good"]["wins"] == 1
+        assert stats["good"]["mean_latency"] is not None
+
+    def test_passes_languages_to_backends(self):
+        backend = FakeBackend("good")
+        extractor = TranscriptExtractor([backend], mode="fallback")
+
+        extractor.extract("url", "abc", languages=("es", "en"))
+
+        assert backend.languages == ("es", "en")
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            TranscriptExtractor([FakeBackend("a")], mode="fastest")
+
+
+class FakeSession:
+    """requests.Session stand-in answering with a fixed JSON body or error."""
+
+    def __init__(self, data=None, error=None):
+        self.data = data
+        self.error = error
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        if self.error:
+            raise self.error
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: self.data)
+
+
+class TestHelpers:
+    """Test cases for the helpers shared with the CLI scripts."""
+
+    def test_extract_video_id(self):
+        assert extract_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10") == "dQw4w9WgXcQ"
+        assert extract_video_id("https://youtu.be/dQw4w9WgXcQ") == "dQw4w9WgXcQ"
+        assert extract_video_id("dQw4w9WgXcQ") == "dQw4w9WgXcQ"
+
+    def test_write_transcript_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        output_file = write_transcript_file("A: Title?", "https://youtu.be/abc", [ENTRY])
+
+        assert output_file == "A_Title_transcript.txt"
+        with open(tmp_path / output_file) as f:
+            assert f.read() == "Title: A: Title?\nURL: https://youtu.be/abc\n\n00:00:00.000 --> 00:00:01.000\nhello\n"
+
+    def test_fetch_oembed_metadata(self):
+        session = FakeSession({"title": "A Title", "author_name": "Channel", "html": "<iframe>"})
+
+        assert fetch_oembed_metadata("dQw4w9WgXcQ", session) == {"title": "A Title"}
+        url, params = session.calls[0]
+        assert url == "https://www.youtube.com/oembed"
+        assert params["url"] == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    def test_fetch_oembed_metadata_failure(self):
+        assert fetch_oembed_metadata("abc", FakeSession(error=OSError("401 Unauthorized"))) == {}
@@ -0,0 +1,118 @@
+import pytest
+
+import app as server
+from transcript import Transcript
+from vtt_parser import seconds_to_time_str
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+def cached_transcript(count=10, length=2.0):
+    transcript = Transcript(
+        {
+            "start": seconds_to_time_str(n * length),
+            "end": seconds_to_time_str((n + 1) * length),
+            "text": f"cue {n}",
+            "start_seconds": n * length,
+            "end_seconds": (n + 1) * length
+        }
+        for n in range(count)
+    )
+    return {
+        "video_id": VIDEO_ID,
+        "title": "Example video",
+        "url": f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        "language": "English",
+        "language_code": "en",
+        "transcript": transcript,
+        "metadata": {},
+        "cached": True
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    lookups = []
+
+    def check_transcript_cache(video_id, languages=None):
+        lookups.append((video_id, languages))
+        return cached_transcript() if video_id == VIDEO_ID else None
+
+    monkeypatch.setattr(server, "check_transcript_cache", check_transcript_cache)
+    client = server.app.test_client()
+    client.lookups = lookups
+    return client
+
+
+class TestTranscriptRange:
+    """Test cases for GET /transcript/<video_id>."""
+
+    @pytest.mark.parametrize("query", [
+        "from=abc",
+        "to=ten",
+        "from=10&to=5",
+        "from=nan",
+        "to=inf",
+        "cursor=next",
+        "cursor=-1",
+        "limit=0",
+        "limit=-5",
+        "limit=many",
+    ])
+    def test_bad_parameters(self, client, query):
+        response = client.get(f"/transcript/{VIDEO_ID}?{query}")
+
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+        assert not client.lookups
+
+    def test_invalid_video_id(self, client):
+        assert client.get("/transcript/abc").status_code == 400
+
+    def test_cache_miss(self, client):
+        response = client.get("/transcript/aaaaaaaaaaa")
+
+        assert response.status_code == 404
+        body = response.get_json()
+        assert body["success"] is False
+        assert body["video_id"] == "aaaaaaaaaaa"
+
+    def test_follows_next_cursor_to_the_last_page(self, client):
+        texts = []
+        cursor = None
+        pages = 0
+
+        while True:
+            query = "from=3&to=15&limit=3" + (f"&cursor={cursor}" if cursor else "")
+            response = client.get(f"/transcript/{VIDEO_ID}?{query}")
+            assert response.status_code == 200
+            body = response.get_json()
+            assert body["total"] == 7
+            assert (body["from"], body["to"]) == (3.0, 15.0)
+            texts += [cue["text"] for cue in body["transcript"]]
+            pages += 1
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert texts == [f"cue {n}" for n in range(1, 8)]
+
+    def test_whole_transcript_by_default(self, client):
+        body = client.get(f"/transcript/{VIDEO_ID}").get_json()
+
+        assert body["total"] == 10
+        assert len(body["transcript"]) == 10
+        assert body["next_cursor"] is None
+        assert body["transcript"][0] == {
+            "start": "00:00:00.000", "end": "00:00:02.000", "text": "cue 0",
+            "start_seconds": 0.0, "end_seconds": 2.0
+        }
+
+    def test_page_size_is_capped(self, client, monkeypatch):
+        monkeypatch.setattr(server, "TRANSCRIPT_MAX_PAGE_SIZE", 4)
+
+        body = client.get(f"/transcript/{VIDEO_ID}?limit=100").get_json()
+
+        assert len(body["transcript"]) == 4
+        assert body["next_cursor"] == "4"
@@ -0,0 +1,110 @@
+import gzip
+import json
+
+import pytest
+
+import transcript_response
+from transcript import Transcript
+from transcript_response import CachedTranscriptResponse, choose_encoding, etag_matches
+
+ROW = {
+    "video_id": "dQw4w9WgXcQ",
+    "title": "Title",
+    "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "language": "English",
+    "language_code": "en",
+    "transcript_data": Transcript([
+        {"start": "00:00:00.000", "end": "00:00:01.000", "text": f"line {n} ✓", "start_seconds": float(n), "end_seconds": n + 1.0}
+        for n in range(200)
+    ]),
+    "metadata": {"duration": 200}
+}
+
+
+class TestCachedTranscriptResponse:
+    """Test cases for serialized cached transcript responses."""
+
+    def test_body_matches_the_response_fields(self):
+        response = CachedTranscriptResponse(ROW)
+
+        body = json.loads(response.body(rag_stored=True))
+
+        assert body["success"] is True
+        assert body["cached"] is True
+        assert body["rag_stored"] is True
+        assert body["extraction_time"] == 0
+        assert body["video_id"] == "dQw4w9WgXcQ"
+        assert body["transcript"] == ROW["transcript_data"].to_list()
+
+    def test_fields_are_serialized_once(self):
+        response = CachedTranscriptResponse(ROW)
+
+        assert response.body_parts(True)[0] is response.body_parts(False)[0]
+        assert response.etag(True) == response.etag(True)
+        assert response.etag(True) != response.etag(False)
+        assert response.etag(True).startswith('"')
+        # Compressed bodies are different bytes, so they get their own tags
+        assert len({response.etag(True), response.etag(True, "gzip"), response.etag(True, "br")}) == 3
+
+    def test_compressed_once_and_reused(self):
+        response = CachedTranscriptResponse(ROW)
+
+        compressed = response.body(False, "gzip")
+
+        assert compressed is response.body(False, "gzip")
+        assert gzip.decompress(compressed) == response.body(False)
+        assert len(compressed) < len(response.body(False)) / 3
+        assert response.nbytes == len(response.prefix) + len(compressed)
+
+    def test_per_request_fields_are_spliced(self):
+        response = CachedTranscriptResponse(ROW)
+
+        body = json.loads(b"".join(response.body_parts(rag_stored=False, cached=False, extraction_time=12.5)))
+
+        assert (body["rag_stored"], body["cached"], body["extraction_time"]) == (False, False, 12.5)
+        assert body["title"] == "Title"
+
+    def test_stdlib_encoder_fallback(self, monkeypatch):
+        expected = json.loads(CachedTranscriptResponse(ROW).body(True))
+        monkeypatch.setattr(transcript_response, "ORJSON_AVAILABLE", False)
+
+        assert json.loads(CachedTranscriptResponse(ROW).body(True)) == expected
+
+    def test_same_content_same_etag(self):
+        assert CachedTranscriptResponse(ROW).etag(False) == CachedTranscriptResponse(dict(ROW)).etag(False)
+        assert CachedTranscriptResponse(ROW).etag(False) != CachedTranscriptResponse(dict(ROW, title="New")).etag(False)
+
+
+class TestNegotiation:
+    """Test cases for conditional requests and content encoding."""
+
+    @pytest.mark.parametrize("header, expected", [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ('"xyz"', False),
+        ("*", True),
+    ])
+    def test_etag_matches(self, header, expected):
+        assert etag_matches(header, '"abc"') is expected
+
+    @pytest.mark.parametrize("header, expected", [
+        (None, None),
+        ("gzip, deflate", "gzip"),
+        ("deflate", None),
+        ("gzip;q=0", None),
+        ("*", transcript_response.ENCODINGS[0]),
+        ("identity", None),
+    ])
+    def test_choose_encoding(self, header, expected):
+        assert choose_encoding(header, body_size=10_000) == expected
+
+    def test_small_bodies_are_not_compressed(self):
+        assert choose_encoding("gzip", body_size=10) is None
+
+    def test_prefers_brotli_when_available(self, monkeypatch):
+        monkeypatch.setattr(transcript_response, "ENCODINGS", ("br", "gzip"))
+
+        assert choose_encoding("gzip, deflate, br", body_size=10_000) == "br"
+        assert choose_encoding("gzip, br;q=0.5", body_size=10_000) == "gzip"
@@ -0,0 +1,110 @@
+import pytest
+
+from video_id import canonical_url, is_video_id, resolve_video_id
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+# Every shape of link to the same video must resolve to one cache key
+RESOLVES = [
+    # Bare IDs
+    "dQw4w9WgXcQ",
+    "  dQw4w9WgXcQ\n",
+    # Watch pages
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "http://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtube.com/watch?v=dQw4w9WgXcQ",
+    "www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "youtube.com/watch?v=dQw4w9WgXcQ",
+    "//www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://WWW.YouTube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com:443/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL0123456789&index=3",
+    "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?app=desktop&v=dQw4w9WgXcQ&pp=ygUJcmljayByb2xs",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=AbCdEfGhIjKlMnOp",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ#t=1m30s",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&ab_channel=RickAstley",
+    "https://www.youtube.com/watch/dQw4w9WgXcQ",
+    # Other YouTube hosts
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=youtu.be",
+    "https://music.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+    "https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVMdQw4w9WgXcQ",
+    "https://gaming.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtubekids.com/watch?v=dQw4w9WgXcQ",
+    # Short links
+    "https://youtu.be/dQw4w9WgXcQ",
+    "http://youtu.be/dQw4w9WgXcQ",
+    "youtu.be/dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=AbCdEfGhIjKlMnOp",
+    "https://youtu.be/dQw4w9WgXcQ?t=42",
+    "https://youtu.be/dQw4w9WgXcQ?feature=shared",
+    "https://www.youtu.be/dQw4w9WgXcQ",
+    # Shorts and live
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://youtube.com/shorts/dQw4w9WgXcQ?feature=share",
+    "https://m.youtube.com/shorts/dQw4w9WgXcQ?si=AbCdEfGhIjKlMnOp",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ/",
+    "https://www.youtube.com/live/dQw4w9WgXcQ",
+    "https://www.youtube.com/live/dQw4w9WgXcQ?si=AbCdEfGhIjKlMnOp&t=120",
+    # Embeds and legacy player URLs
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ?autoplay=1&start=30",
+    "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+    "https://www.youtube.com/v/dQw4w9WgXcQ?version=3",
+    "https://www.youtube.com/e/dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?vi=dQw4w9WgXcQ",
+    # Wrapped watch URLs
+    "https://www.youtube.com/attribution_link?a=abc&u=/watch%3Fv%3DdQw4w9WgXcQ%26feature%3Dshare",
+    "https://www.youtube.com/attribution_link?u=%2Fwatch%3Fv%3DdQw4w9WgXcQ",
+    "https://www.youtube.com/oembed?url=https%3A//www.youtube.com/watch%3Fv%3DdQw4w9WgXcQ&format=json",
+]
+
+# Nothing here names a single video; these must not become cache keys
+REJECTS = [
+    None,
+    "",
+    "   ",
+    "dQw4w9WgXc",
+    "dQw4w9WgXcQQ",
+    "dQw4w9WgX!Q",
+    "https://www.youtube.com/",
+    "https://www.youtube.com/watch",
+    "https://www.youtube.com/watch?v=",
+    "https://www.youtube.com/watch?v=short",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQextra",
+    "https://www.youtube.com/playlist?list=PL0123456789",
+    "https://www.youtube.com/@RickAstleyYT",
+    "https://www.youtube.com/channel/UCuAXFkgsw1L7xaCfnd5JJOw",
+    "https://www.youtube.com/results?search_query=rick+astley",
+    "https://youtu.be/",
+    "https://youtu.be/not-an-id",
+    "https://vimeo.com/dQw4w9WgXcQ",
+    "https://example.com/watch?v=dQw4w9WgXcQ",
+    "https://notyoutube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtube.com.evil.example/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/shorts/",
+    "javascript:alert(1)",
+    "http://[::1",
+]
+
+
+class TestResolveVideoId:
+    """Test cases for the canonical video ID resolver."""
+
+    @pytest.mark.parametrize("value", RESOLVES)
+    def test_resolves(self, value):
+        assert resolve_video_id(value) == VIDEO_ID
+
+    @pytest.mark.parametrize("value", REJECTS)
+    def test_rejects(self, value):
+        assert resolve_video_id(value) is None
+
+    @pytest.mark.parametrize("video_id", ["jNQXAC9IVRw", "9bZkp7q19f0", "_-_-_-_-_-A", "a1B2c3D4e5F"])
+    def test_id_alphabet(self, video_id):
+        assert is_video_id(video_id)
+        assert resolve_video_id(f"https://youtu.be/{video_id}") == video_id
+
+    def test_canonical_url_round_trips(self):
+        assert resolve_video_id(canonical_url(VIDEO_ID)) == VIDEO_ID
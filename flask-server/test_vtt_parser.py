@@ -0,0 +1,176 @@
+import io
+
+import pytest
+
+from vtt_parser import (
+    VttReader,
+    iter_vtt_cues,
+    parse_vtt_content,
+    dedupe_rolling_cues,
+    looks_rolling,
+    seconds_to_time_str,
+    time_str_to_seconds,
+)
+
+# Shape of yt-dlp --write-auto-subs output: each line is typed out word by word,
+# held for 10 ms, then scrolls up while the next line is typed below it
+ROLLING_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.160 --> 00:00:02.070 align:start position:0%
+ 
+it's<00:00:00.480><c> time</c><00:00:00.719><c> to</c>
+
+00:00:02.070 --> 00:00:02.080 align:start position:0%
+it's time to
+ 
+
+00:00:02.080 --> 00:00:04.789 align:start position:0%
+it's time to
+get<00:00:02.560><c> started</c>
+
+00:00:04.789 --> 00:00:04.799 align:start position:0%
+get started
+ 
+
+00:00:04.799 --> 00:00:07.000 align:start position:0%
+get started
+with<00:00:05.200><c> the</c><00:00:05.600><c> demo</c>
+
+00:00:07.000 --> 00:00:07.010 align:start position:0%
+with the demo
+ 
+"""
+
+MANUAL_VTT = """WEBVTT
+
+00:00:01.000 --> 00:00:03.500
+Hello and welcome
+
+00:00:03.500 --> 00:00:06.000 align:middle
+<i>to the show</i>
+"""
+
+
+class TestParseVttContent:
+    """Test cases for VTT parsing."""
+
+    def test_manual_captions_are_unchanged(self):
+        assert parse_vtt_content(MANUAL_VTT) == [
+            {"start": "00:00:01.000", "end": "00:00:03.500", "text": "Hello and welcome", "start_seconds": 1.0, "end_seconds": 3.5},
+            {"start": "00:00:03.500", "end": "00:00:06.000", "text": "to the show", "start_seconds": 3.5, "end_seconds": 6.0},
+        ]
+
+    def test_rolling_captions_are_deduplicated(self):
+        transcript = parse_vtt_content(ROLLING_VTT)
+
+        assert [entry["text"] for entry in transcript] == ["it's time to", "get started", "with the demo"]
+        assert [(entry["start_seconds"], entry["end_seconds"]) for entry in transcript] == [
+            (0.16, 2.07), (2.08, 4.789), (4.799, 7.0)
+        ]
+        assert transcript[1]["start"] == "00:00:02.080"
+        assert transcript[1]["end"] == "00:00:04.789"
+
+    def test_rolling_captions_raw(self):
+        transcript = parse_vtt_content(ROLLING_VTT, dedupe=False)
+
+        assert len(transcript) == 6
+        assert transcript[2]["text"] == "it's time to get started"
+
+    def test_segments_do_not_overlap(self):
+        transcript = parse_vtt_content(ROLLING_VTT)
+
+        for previous, current in zip(transcript, transcript[1:]):
+            assert previous["end_seconds"] <= current["start_seconds"]
+
+
+class TestVttReader:
+    """Test cases for streaming VTT parsing."""
+
+    def test_file_input_matches_string_input(self, tmp_path):
+        path = tmp_path / "captions.en.vtt"
+        path.write_text(ROLLING_VTT)
+
+        with open(path) as f:
+            assert parse_vtt_content(f) == parse_vtt_content(ROLLING_VTT)
+        with open(path, "rb") as f:
+            assert parse_vtt_content(f, dedupe=False) == parse_vtt_content(ROLLING_VTT, dedupe=False)
+
+    def test_cues_are_yielded_lazily(self):
+        lines = iter(MANUAL_VTT.splitlines(keepends=True))
+        cues = iter_vtt_cues(lines)
+
+        assert next(cues)["text"] == "Hello and welcome"
+        # The second cue hasn't been read yet
+        assert next(lines).startswith("00:00:03.500")
+
+    def test_rolling_is_detected_while_reading(self):
+        reader = VttReader(io.StringIO(ROLLING_VTT))
+        assert not reader.rolling
+
+        list(reader)
+
+        assert reader.rolling
+        manual = VttReader(MANUAL_VTT)
+        list(manual)
+        assert not manual.rolling
+
+    def test_crlf_line_endings(self):
+        assert parse_vtt_content(MANUAL_VTT.replace("\n", "\r\n")) == parse_vtt_content(MANUAL_VTT)
+
+    def test_last_cue_without_trailing_newline(self):
+        assert parse_vtt_content(MANUAL_VTT.rstrip("\n")) == parse_vtt_content(MANUAL_VTT)
+
+    def test_malformed_timestamps_are_counted_once(self, capsys):
+        reader = VttReader("WEBVTT\n\n00:01.000 --> 00:02.000\nhi\n\n00:00:02.5 --> 00:00:03.000\nthere\n")
+
+        cues = list(reader)
+
+        # Same values as time_str_to_seconds, without a warning per timestamp
+        assert [(cue["start_seconds"], cue["end_seconds"]) for cue in cues] == [(0, 0), (2.005, 3.0)]
+        assert reader.malformed_timestamps == 2
+        assert capsys.readouterr().out.count("malformed") == 1
+
+
+class TestCacheMigration:
+    """Test cases for migrating transcripts cached before de-duplication."""
+
+    # What the old parser stored: the first typed cue of each line was lost and
+    # the 10 ms hold cues carried the text
+    LEGACY_CACHE = [
+        {"start": "00:00:02.070", "end": "00:00:02.080 align:start position:0%", "text": "it's time to", "start_seconds": 2.07, "end_seconds": 2.08},
+        {"start": "00:00:02.080", "end": "00:00:04.789 align:start position:0%", "text": "it's time to get started", "start_seconds": 2.08, "end_seconds": 4.789},
+        {"start": "00:00:04.789", "end": "00:00:04.799 align:start position:0%", "text": "get started", "start_seconds": 4.789, "end_seconds": 4.799},
+        {"start": "00:00:04.799", "end": "00:00:07.000 align:start position:0%", "text": "get started with the demo", "start_seconds": 4.799, "end_seconds": 7.0},
+        {"start": "00:00:07.000", "end": "00:00:07.010 align:start position:0%", "text": "with the demo", "start_seconds": 7.0, "end_seconds": 7.01},
+        {"start": "00:00:07.010", "end": "00:00:09.000 align:start position:0%", "text": "with the demo and more", "start_seconds": 7.01, "end_seconds": 9.0},
+    ]
+
+    def test_legacy_cache_is_detected(self):
+        assert looks_rolling(self.LEGACY_CACHE)
+
+    def test_legacy_cache_is_migrated(self):
+        migrated = dedupe_rolling_cues(self.LEGACY_CACHE)
+
+        assert ' '.join(entry["text"] for entry in migrated) == "it's time to get started with the demo and more"
+        assert migrated[1]["end"] == "00:00:04.789"
+
+    def test_migration_is_idempotent(self):
+        migrated = dedupe_rolling_cues(self.LEGACY_CACHE)
+
+        assert not looks_rolling(migrated)
+        assert not looks_rolling(parse_vtt_content(MANUAL_VTT))
+
+
+class TestTimestamps:
+    """Test cases for timestamp conversion."""
+
+    @pytest.mark.parametrize("seconds, text", [
+        (0.0, "00:00:00.000"),
+        (2.27, "00:00:02.270"),
+        (3723.5, "01:02:03.500"),
+    ])
+    def test_round_trip(self, seconds, text):
+        assert seconds_to_time_str(seconds) == text
+        assert time_str_to_seconds(text) == seconds
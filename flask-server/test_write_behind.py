@@ -0,0 +1,154 @@
+import threading
+
+import pytest
+
+from write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue:
+    """Test cases for the write-behind queue."""
+
+    def test_runs_jobs_in_the_background(self):
+        queue = WriteBehindQueue(workers=1)
+        done = threading.Event()
+
+        queue.submit("abc", done.set)
+
+        assert done.wait(2)
+        assert queue.flush(2)
+        assert queue.stats()["completed"] == 1
+        queue.close()
+
+    def test_coalesces_jobs_per_key(self):
+        queue = WriteBehindQueue(workers=1)
+        release = threading.Event()
+        writes = []
+
+        # Hold the only worker so the next jobs wait in the queue
+        queue.submit("blocker", release.wait, 5)
+        for n in range(5):
+            queue.submit("abc", writes.append, n)
+        release.set()
+
+        assert queue.flush(2)
+        assert writes == [4]
+        stats = queue.stats()
+        assert stats["coalesced"] == 4
+        assert stats["completed"] == 2
+        queue.close()
+
+    def test_retries_failures_with_backoff(self):
+        queue = WriteBehindQueue(workers=1, max_attempts=3, retry_delay=0.01)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("supabase down")
+
+        queue.submit("abc", flaky)
+
+        assert queue.flush(2)
+        assert len(attempts) == 3
+        stats = queue.stats()
+        assert (stats["retried"], stats["completed"], stats["failed"]) == (2, 1, 0)
+        queue.close()
+
+    def test_false_result_counts_as_failure(self):
+        queue = WriteBehindQueue(workers=1, max_attempts=2, retry_delay=0.01)
+        calls = []
+
+        queue.submit("abc", lambda: calls.append(1) or False)
+
+        assert queue.flush(2)
+        assert len(calls) == 2
+        assert queue.stats()["failed"] == 1
+        queue.close()
+
+    def test_flush_skips_retry_backoff(self):
+        queue = WriteBehindQueue(workers=1, max_attempts=2, retry_delay=60)
+        attempts = []
+
+        def fails_once():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("supabase down")
+
+        queue.submit("abc", fails_once)
+
+        assert queue.flush(2)
+        assert len(attempts) == 2
+        queue.close()
+
+    def test_same_key_never_runs_concurrently(self):
+        queue = WriteBehindQueue(workers=4)
+        active = []
+        overlaps = []
+        lock = threading.Lock()
+
+        def write(n):
+            with lock:
+                active.append(n)
+                overlaps.append(len(active))
+            threading.Event().wait(0.01)
+            with lock:
+                active.remove(n)
+
+        for n in range(10):
+            queue.submit("abc", write, n)
+            threading.Event().wait(0.005)
+
+        assert queue.flush(2)
+        assert max(overlaps) == 1
+        queue.close()
+
+    def test_cancel_drops_queued_jobs_for_key_prefix(self):
+        queue = WriteBehindQueue(workers=1)
+        release = threading.Event()
+        writes = []
+
+        queue.submit("blocker", release.wait, 5)
+        queue.submit(("rows", "abc", ("de", "en")), writes.append, "abc rows")
+        queue.submit(("rows", "xyz", ("en",)), writes.append, "xyz rows")
+
+        assert queue.cancel(("rows", "abc")) == 1
+        release.set()
+
+        assert queue.flush(2)
+        assert writes == ["xyz rows"]
+        assert queue.stats()["cancelled"] == 1
+        queue.close()
+
+    def test_cancel_waits_for_running_job_and_skips_its_retry(self):
+        queue = WriteBehindQueue(workers=1, max_attempts=3, retry_delay=0.01)
+        started = threading.Event()
+        release = threading.Event()
+        attempts = []
+
+        def failing_write():
+            attempts.append(1)
+            started.set()
+            release.wait(5)
+            raise ConnectionError("supabase down")
+
+        queue.submit("abc", failing_write)
+        assert started.wait(2)
+        threading.Timer(0.05, release.set).start()
+
+        assert queue.cancel("abc", timeout=2) == 0
+        assert not queue.pending("abc")
+        assert queue.flush(2)
+        assert len(attempts) == 1
+        assert queue.stats()["retried"] == 0
+        queue.close()
+
+    def test_close_drains_and_rejects_new_jobs(self):
+        queue = WriteBehindQueue(workers=2)
+        writes = []
+        for n in range(10):
+            queue.submit(n, writes.append, n)
+
+        assert queue.close(2)
+        assert sorted(writes) == list(range(10))
+        with pytest.raises(RuntimeError):
+            queue.submit("late", writes.append, "late")
@@ -0,0 +1,254 @@
+import io
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import ytdlp_extractor
+from ytdlp_extractor import (
+    ExtractionCancelled, SubtitlesNotFound, YtDlpExtractor, language_available, language_preference,
+    match_language, original_automatic_captions, select_subtitle, select_subtitles, video_metadata
+)
+
+INFO = {
+    "id": "abc",
+    "title": "Example video",
+    "duration": 212,
+    "chapters": [
+        {"title": "Intro", "start_time": 0.0, "end_time": 18.0},
+        {"title": "Main", "start_time": 18.0, "end_time": 212.0},
+    ],
+    "automatic_captions": {
+        "en": [
+            {"ext": "json3", "url": "https://example.com/en.json3"},
+            {"ext": "vtt", "url": "https://example.com/en.vtt"},
+        ],
+        "de": [{"ext": "vtt", "url": "https://example.com/de.vtt"}],
+    },
+    "subtitles": {
+        "fr": [{"ext": "vtt", "url": "https://example.com/fr-manual.vtt", "name": "French"}],
+        "de-DE": [{"ext": "vtt", "url": "https://example.com/de-manual.vtt", "name": "German (Germany)"}],
+    },
+}
+
+
+class FakeYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL that serves INFO and fixed caption text."""
+
+    created = 0
+
+    def __init__(self, params):
+        FakeYoutubeDL.created += 1
+        self.params = params
+        self.in_use = threading.Lock()
+
+    def extract_info(self, url, download=True, process=True):
+        assert not download and not process
+        # Fails if two threads share an instance
+        assert self.in_use.acquire(blocking=False)
+        self.in_use.release()
+        return INFO
+
+    def urlopen(self, url):
+        return io.BytesIO(f"WEBVTT\n\n00:00:00.000 --> 00:00:01.000\n{url}\n".encode())
+
+
+@pytest.fixture
+def fake_ydl(monkeypatch):
+    FakeYoutubeDL.created = 0
+    monkeypatch.setattr(ytdlp_extractor, "yt_dlp", SimpleNamespace(YoutubeDL=FakeYoutubeDL), raising=False)
+    return FakeYoutubeDL
+
+
+class TestSelectSubtitle:
+    """Test cases for picking a caption track."""
+
+    def test_prefers_vtt_automatic_captions(self):
+        assert select_subtitle(INFO, ("en",)) == ("en", "automatic", "https://example.com/en.vtt")
+
+    def test_falls_back_to_manual_subtitles(self):
+        assert select_subtitle(INFO, ("fr",)) == ("fr", "manual", "https://example.com/fr-manual.vtt")
+
+    def test_language_order(self):
+        assert select_subtitle(INFO, ("es", "de", "en"))[0] == "de"
+
+    def test_prefers_manual_tracks(self):
+        # de has an automatic track and a manual de-DE one
+        assert select_subtitle(INFO, ("de",)) == ("de", "manual", "https://example.com/de-manual.vtt")
+
+    def test_one_track_per_available_language(self):
+        selected = select_subtitles(INFO, ("es", "fr", "en"))
+
+        assert [(language, kind, name) for language, kind, _, name in selected] == [
+            ("fr", "manual", "French"),
+            ("en", "automatic", "en"),
+        ]
+
+    def test_no_match(self):
+        assert select_subtitle(INFO, ("es",)) is None
+        assert select_subtitle({}, ("en",)) is None
+
+
+    def test_skips_machine_translated_automatic_captions(self):
+        info = {
+            "language": "en",
+            "automatic_captions": {
+                "en-orig": [{"ext": "vtt", "url": "https://example.com/api/timedtext?lang=en&kind=asr", "name": "English (Original)"}],
+                "en": [{"ext": "vtt", "url": "https://example.com/api/timedtext?lang=en&kind=asr&tlang=en"}],
+                "fr": [{"ext": "vtt", "url": "https://example.com/api/timedtext?lang=en&kind=asr&tlang=fr"}],
+                "de": [{"ext": "vtt", "url": "https://example.com/api/timedtext?lang=en&kind=asr&tlang=de"}],
+            },
+            "subtitles": {"de": [{"ext": "vtt", "url": "https://example.com/de-manual.vtt", "name": "German"}]},
+        }
+
+        assert original_automatic_captions(info).keys() == {"en-orig", "en"}
+        assert [(language, kind) for language, kind, _, _ in select_subtitles(info, ("fr", "de", "en"))] == [
+            ("de", "manual"),
+            ("en", "automatic"),
+        ]
+        assert video_metadata(info)["caption_languages"] == {"manual": ["de"], "automatic": ["en", "en-orig"]}
+
+class TestLanguages:
+    """Test cases for language preference and matching."""
+
+    def test_preference_appends_fallbacks(self):
+        assert language_preference(["es", " en", "es"], fallback=("en",)) == ("es", "en")
+        assert language_preference(None, fallback=("en",)) == ("en",)
+
+    def test_match_language(self):
+        assert match_language(["en", "en-US"], "en") == "en"
+        assert match_language(["en-US", "en-GB"], "en") == "en-GB"
+        assert match_language(["fr"], "en") is None
+
+    def test_language_available(self):
+        caption_languages = video_metadata(INFO)["caption_languages"]
+
+        assert language_available(caption_languages, "de")
+        assert language_available(caption_languages, "fr")
+        assert not language_available(caption_languages, "es")
+
+
+class TestVideoMetadata:
+    """Test cases for the metadata stored with a transcript."""
+
+    def test_single_pass_metadata(self):
+        metadata = video_metadata(INFO)
+
+        assert metadata["title"] == "Example video"
+        assert metadata["duration"] == 212
+        assert metadata["chapters"][1] == {"title": "Main", "start_seconds": 18.0, "end_seconds": 212.0}
+        assert metadata["caption_languages"] == {"manual": ["de-DE", "fr"], "automatic": ["de", "en"]}
+
+    def test_missing_fields(self):
+        assert video_metadata({}) == {
+            "title": None,
+            "duration": None,
+            "chapters": [],
+            "caption_languages": {"manual": [], "automatic": []}
+        }
+
+
+class TestYtDlpExtractor:
+    """Test cases for in-process extraction."""
+
+    def test_returns_captions_in_memory(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path))
+
+        result = extractor.extract("https://www.youtube.com/watch?v=abc")
+
+        assert result["vtt"].endswith("https://example.com/en.vtt\n")
+        assert (result["language"], result["kind"]) == ("en", "automatic")
+        assert result["metadata"]["title"] == "Example video"
+
+    def test_fetches_every_language_in_one_call(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path))
+
+        result = extractor.extract("https://www.youtube.com/watch?v=abc", languages=("es", "fr", "en"))
+
+        assert result["language"] == "fr"
+        assert list(result["tracks"]) == ["fr", "en"]
+        assert result["tracks"]["fr"]["kind"] == "manual"
+        assert result["tracks"]["en"]["vtt"].endswith("https://example.com/en.vtt\n")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_reuses_warm_instances(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path), instances=2)
+
+        for _ in range(5):
+            extractor.extract("https://www.youtube.com/watch?v=abc")
+
+        assert fake_ydl.created == 1
+
+    def test_instances_are_not_shared_between_threads(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path), instances=2)
+        errors = []
+
+        def work():
+            try:
+                for _ in range(20):
+                    extractor.extract("https://www.youtube.com/watch?v=abc")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert fake_ydl.created <= 2
+
+    def test_borrow_times_out_when_every_instance_is_busy(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path), instances=1)
+
+        with extractor.borrow():
+            with pytest.raises(TimeoutError):
+                with extractor.borrow(timeout=0.05):
+                    pass
+
+            cancelled = threading.Event()
+            cancelled.set()
+            with pytest.raises(ExtractionCancelled):
+                with extractor.borrow(cancelled=cancelled):
+                    pass
+
+        with extractor.borrow(timeout=0.05):
+            pass
+
+    def test_failed_construction_gives_slot_back(self, fake_ydl, monkeypatch, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path), instances=1)
+
+        def broken(params):
+            raise OSError("cache dir not writable")
+
+        monkeypatch.setattr(ytdlp_extractor, "yt_dlp", SimpleNamespace(YoutubeDL=broken), raising=False)
+        for _ in range(3):
+            with pytest.raises(OSError):
+                with extractor.borrow(timeout=0.05):
+                    pass
+
+        monkeypatch.setattr(ytdlp_extractor, "yt_dlp", SimpleNamespace(YoutubeDL=fake_ydl), raising=False)
+        with extractor.borrow(timeout=0.05) as ydl:
+            assert isinstance(ydl, fake_ydl)
+
+    def test_passes_cache_dir(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path))
+
+        with extractor.borrow() as ydl:
+            assert ydl.params["cachedir"] == str(tmp_path)
+            assert ydl.params["skip_download"]
+
+    def test_missing_language(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(languages=("es",), cache_dir=str(tmp_path))
+
+        with pytest.raises(SubtitlesNotFound):
+            extractor.extract("https://www.youtube.com/watch?v=abc")
+
+    def test_cancelled_before_caption_download(self, fake_ydl, tmp_path):
+        extractor = YtDlpExtractor(cache_dir=str(tmp_path))
+        cancelled = threading.Event()
+        cancelled.set()
+
+        with pytest.raises(ExtractionCancelled):
+            extractor.extract("https://www.youtube.com/watch?v=abc", cancelled=cancelled)
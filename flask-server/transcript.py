@@ -0,0 +1,197 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from vtt_parser import seconds_to_time_str
+
+
+class Transcript:
+    """Compact, columnar store for transcript cues.
+
+    Start and end times are float arrays and all cue text lives in one string
+    with an offset array, instead of one dict per cue. Indexing returns a
+    fresh cue dict ({start, end, text, start_seconds, end_seconds}), so code
+    written for lists of dicts keeps working; slicing and between() return
+    views over the same arrays without copying any cues.
+
+    The start/end timestamp strings are regenerated from the seconds; they are
+    only stored when they don't round-trip (e.g. "00:00:02.5").
+    """
+
+    __slots__ = ("_starts", "_ends", "_text", "_offsets", "_labels", "_lo", "_hi", "_sorted")
+
+    def __init__(self, entries: Iterable[Dict] = ()):
+        starts = array("d")
+        ends = array("d")
+        offsets = array("q", [0])
+        texts = []
+        labels = None
+        position = 0
+
+        for n, entry in enumerate(entries):
+            start_seconds = float(entry["start_seconds"])
+            end_seconds = float(entry["end_seconds"])
+            text = entry["text"]
+            starts.append(start_seconds)
+            ends.append(end_seconds)
+            texts.append(text)
+            position += len(text)
+            offsets.append(position)
+
+            start, end = entry["start"], entry["end"]
+            if labels is None and (start != seconds_to_time_str(start_seconds) or end != seconds_to_time_str(end_seconds)):
+                # Regenerate the labels of every earlier cue, which did round-trip
+                labels = ([seconds_to_time_str(s) for s in starts[:n]], [seconds_to_time_str(e) for e in ends[:n]])
+            if labels is not None:
+                labels[0].append(start)
+                labels[1].append(end)
+
+        self._starts = starts
+        self._ends = ends
+        self._text = "".join(texts)
+        self._offsets = offsets
+        self._labels = labels
+        self._lo = 0
+        self._hi = len(starts)
+        self._sorted = all(a <= b for a, b in zip(starts, starts[1:]))
+
+    @classmethod
+    def from_entries(cls, entries: Union["Transcript", Iterable[Dict]]) -> "Transcript":
+        """Build a Transcript from cue dicts, returning Transcripts unchanged."""
+        return entries if isinstance(entries, Transcript) else cls(entries)
+
+    def _view(self, lo: int, hi: int) -> "Transcript":
+        view = Transcript.__new__(Transcript)
+        view._starts = self._starts
+        view._ends = self._ends
+        view._text = self._text
+        view._offsets = self._offsets
+        view._labels = self._labels
+        view._sorted = self._sorted
+        view._lo = lo
+        view._hi = max(lo, hi)
+        return view
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def _cue(self, i: int) -> Dict:
+        start_seconds = self._starts[i]
+        end_seconds = self._ends[i]
+        if self._labels is None:
+            start, end = seconds_to_time_str(start_seconds), seconds_to_time_str(end_seconds)
+        else:
+            start, end = self._labels[0][i], self._labels[1][i]
+        return {
+            "start": start,
+            "end": end,
+            "text": self._text[self._offsets[i]:self._offsets[i + 1]],
+            "start_seconds": start_seconds,
+            "end_seconds": end_seconds
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return Transcript(self._cue(self._lo + i) for i in range(start, stop, step))
+            return self._view(self._lo + start, self._lo + stop)
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript index out of range")
+        return self._cue(self._lo + index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._lo, self._hi):
+            yield self._cue(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Transcript, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"<Transcript {len(self)} cues>"
+
+    def text(self, index: int) -> str:
+        """Text of one cue, without building its dict."""
+        i = self._lo + (index + len(self) if index < 0 else index)
+        return self._text[self._offsets[i]:self._offsets[i + 1]]
+
+    @property
+    def start_seconds(self) -> array:
+        """Start times of the cues in this view (a copy)."""
+        return self._starts[self._lo:self._hi]
+
+    @property
+    def end_seconds(self) -> array:
+        """End times of the cues in this view (a copy)."""
+        return self._ends[self._lo:self._hi]
+
+    @property
+    def duration(self) -> float:
+        return max(self._ends[self._lo:self._hi], default=0.0)
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> "Transcript":
+        """Cues overlapping the time range [start, end), as a view.
+
+        Uses binary search over the start times; open ends default to the
+        start or end of the transcript. A cue spanning start is included when
+        it is part of the run of cues overlapping start, as in de-duplicated
+        and manual captions.
+        """
+        lo, hi = self._lo, self._hi
+        if not self._sorted:
+            return Transcript(
+                cue for cue in self
+                if (start is None or cue["end_seconds"] > start) and (end is None or cue["start_seconds"] < end)
+            )
+
+        if end is not None:
+            hi = bisect_left(self._starts, end, lo, hi)
+        if start is not None:
+            # Step back from the first cue starting after start over the
+            # cues still running at start
+            first = bisect_right(self._starts, start, lo, hi)
+            while first > lo and self._ends[first - 1] > start:
+                first -= 1
+            lo = first
+        return self._view(lo, hi)
+
+    def page(
+        self, start: Optional[float] = None, end: Optional[float] = None, offset: int = 0, limit: int = 200
+    ) -> Tuple["Transcript", Optional[int], int]:
+        """One page of the cues overlapping [start, end).
+
+        Returns:
+            The page as a view, the offset of the next page (None after the
+            last page) and the number of cues in the whole range
+        """
+        window = self.between(start, end)
+        offset = max(0, offset)
+        page = window[offset:offset + max(1, limit)]
+        next_offset = offset + len(page)
+        return page, (next_offset if next_offset < len(window) else None), len(window)
+
+    def index_at(self, seconds: float) -> int:
+        """Index of the last cue starting at or before seconds (-1 if none)."""
+        return bisect_right(self._starts, seconds, self._lo, self._hi) - 1 - self._lo
+
+    def to_list(self) -> List[Dict]:
+        """Cue dicts, for JSON responses and cache rows."""
+        return [self._cue(i) for i in range(self._lo, self._hi)]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the underlying arrays and text buffer."""
+        size = (
+            self._starts.itemsize * len(self._starts) * 2
+            + self._offsets.itemsize * len(self._offsets)
+            + sys.getsizeof(self._text)
+        )
+        if self._labels is not None:
+            size += sum(len(label) for labels in self._labels for label in labels)
+        return size
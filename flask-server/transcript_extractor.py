@@ -0,0 +1,482 @@
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from video_id import resolve_video_id
+from vtt_parser import parse_vtt_content, seconds_to_time_str
+from ytdlp_extractor import (
+    ExtractionCancelled, SubtitlesNotFound, SUBTITLE_LANGUAGES, YTDLP_AVAILABLE,
+    YtDlpExtractor, download_subtitles_cli, match_language, video_metadata
+)
+
+try:
+    from youtube_transcript_api import YouTubeTranscriptApi
+    TRANSCRIPT_API_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ youtube_transcript_api not available: {e}")
+    TRANSCRIPT_API_AVAILABLE = False
+
+# Comma-separated backend names, fastest first
+TRANSCRIPT_BACKENDS = os.getenv("TRANSCRIPT_BACKENDS", "transcript_api,ytdlp")
+
+# "race" hedges across backends, "fallback" tries them one after another
+TRANSCRIPT_MODE = os.getenv("TRANSCRIPT_MODE", "race")
+
+# Seconds a backend gets on its own before the next one is started
+TRANSCRIPT_HEDGE_DELAY = float(os.getenv("TRANSCRIPT_HEDGE_DELAY", "3"))
+
+
+class TranscriptUnavailable(Exception):
+    """Raised when no backend returned a transcript; errors holds each backend's failure."""
+
+    def __init__(self, message: str, errors: Optional[Dict[str, BaseException]] = None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+
+def extract_video_id(url):
+    """Extract video ID from a YouTube URL or bare ID, or None if it has none"""
+    return resolve_video_id(url)
+
+
+def fetch_video_title(video_id, session, timeout=(3.05, 10)):
+    """Get video title from the YouTube watch page.
+
+    Only needed when the backend that won returned no title.
+
+    Args:
+        session: requests.Session used for the request
+    """
+    try:
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+
+        # Extract title from the page HTML
+        title_match = re.search(r'"title":"([^"]+)"', response.text)
+        if title_match:
+            # Decode unicode escape sequences
+            return title_match.group(1).encode().decode('unicode-escape')
+
+        # Fallback pattern, without the " - YouTube" suffix
+        title_match = re.search(r'<title>([^<]+)</title>', response.text)
+        if title_match:
+            return re.sub(r' - YouTube$', '', title_match.group(1))
+
+        return "Unknown Title"
+    except Exception as e:
+        print(f"Could not fetch video title: {e}")
+        return "Unknown Title"
+
+
+def fetch_oembed_metadata(video_id, session, timeout=(3.05, 10)) -> Dict[str, Any]:
+    """Get a video's title from YouTube's oEmbed endpoint.
+
+    A few hundred bytes of JSON instead of the ~1 MB watch page; returns an
+    empty dict if the lookup fails (e.g. for private videos).
+
+    Args:
+        session: requests.Session used for the request
+    """
+    try:
+        response = session.get(
+            "https://www.youtube.com/oembed",
+            params={"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        return {"title": data.get("title")}
+    except Exception as e:
+        print(f"Could not fetch oEmbed metadata: {e}")
+        return {}
+
+
+def write_transcript_file(video_title, video_url, transcript_data):
+    """Save a transcript as "<title>_transcript.txt": title and URL, then VTT cues.
+
+    Returns:
+        Path of the written file
+    """
+    cues = [f"{entry['start']} --> {entry['end']}\n{entry['text']}\n" for entry in transcript_data]
+    file_content = f"Title: {video_title}\nURL: {video_url}\n\n" + "\n".join(cues)
+
+    # Clean title for filename (remove invalid characters)
+    clean_title = re.sub(r'[<>:"/\\|?*]', '', video_title).replace(' ', '_')
+
+    output_file = f"{clean_title}_transcript.txt"
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(file_content)
+    return output_file
+
+
+class TranscriptBackend:
+    """A way of getting a transcript for a video.
+
+    Subclasses implement extract(), fetching every requested language that
+    has captions in one go and returning a dict with tracks (language ->
+    transcript entries in the parse_vtt_content format, kind and name), the
+    transcript and language of the most preferred available language, and
+    metadata (see video_metadata). They should stop early when cancelled is set.
+    """
+
+    name = "backend"
+
+    def extract(
+        self,
+        video_url: str,
+        video_id: str,
+        cancelled: Optional[threading.Event] = None,
+        output_dir: Optional[str] = None,
+        languages: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+def _with_primary(tracks: Dict[str, Dict[str, Any]], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Backend result for tracks, ordered most preferred language first."""
+    language = next(iter(tracks))
+    return {
+        "transcript": tracks[language]["transcript"],
+        "language": language,
+        "tracks": tracks,
+        "metadata": metadata
+    }
+
+
+class TranscriptApiBackend(TranscriptBackend):
+    """youtube-transcript-api: one caption listing and one fetch, fast when YouTube allows it.
+
+    The caption API carries no video info, so the title comes from the oEmbed
+    endpoint (when a session is given) and the duration from the end of the
+    last cue; chapters aren't available on this path.
+    """
+
+    name = "transcript_api"
+
+    def __init__(self, languages: Sequence[str] = SUBTITLE_LANGUAGES, session=None, timeout=(3.05, 10)):
+        if not TRANSCRIPT_API_AVAILABLE:
+            raise RuntimeError("youtube_transcript_api is not installed")
+        self.languages = tuple(languages)
+        self.session = session
+        self.timeout = timeout
+
+    def _list_transcripts(self, video_id: str):
+        # 1.x moved to instance methods; older releases use class methods
+        api = YouTubeTranscriptApi()
+        if hasattr(api, "list"):
+            return api.list(video_id)
+        return YouTubeTranscriptApi.list_transcripts(video_id)
+
+    @staticmethod
+    def _entries(fetched) -> List[Dict[str, Any]]:
+        snippets = fetched.to_raw_data() if hasattr(fetched, "to_raw_data") else fetched
+
+        entries = []
+        for snippet in snippets:
+            text = snippet["text"].replace("\n", " ").strip()
+            if not text:
+                continue
+            start = float(snippet["start"])
+            end = start + float(snippet.get("duration", 0))
+            entries.append({
+                "start": seconds_to_time_str(start),
+                "end": seconds_to_time_str(end),
+                "text": text,
+                "start_seconds": start,
+                "end_seconds": end
+            })
+        return entries
+
+    def extract(self, video_url, video_id, cancelled=None, output_dir=None, languages=None):
+        languages = tuple(languages or self.languages)
+        listing = self._list_transcripts(video_id)
+        manual = {t.language_code: t for t in listing if not t.is_generated}
+        generated = {t.language_code: t for t in listing if t.is_generated}
+
+        tracks = {}
+        for language in languages:
+            # Uploaded subtitles first, like the yt-dlp backend
+            for kind, available in (("manual", manual), ("automatic", generated)):
+                code = match_language(available, language)
+                if code is None:
+                    continue
+                if cancelled is not None and cancelled.is_set():
+                    raise ExtractionCancelled(f"Extraction of {video_url} cancelled")
+                transcript = available[code]
+                tracks[language] = {
+                    "transcript": self._entries(transcript.fetch()),
+                    "kind": kind,
+                    "name": transcript.language
+                }
+                break
+
+        if not tracks:
+            raise SubtitlesNotFound(f"No {'/'.join(languages)} transcripts for {video_id}")
+
+        if cancelled is not None and cancelled.is_set():
+            raise ExtractionCancelled(f"Extraction of {video_url} cancelled")
+        info = fetch_oembed_metadata(video_id, self.session, self.timeout) if self.session is not None else {}
+        result = _with_primary(tracks, video_metadata(info))
+        result["metadata"]["duration"] = round(max((e["end_seconds"] for e in result["transcript"]), default=0)) or None
+        result["metadata"]["caption_languages"] = {"manual": sorted(manual), "automatic": sorted(generated)}
+        return result
+
+
+class YtDlpBackend(TranscriptBackend):
+    """yt-dlp: slower, but the most reliable; in-process when the library is available."""
+
+    name = "ytdlp"
+
+    def __init__(self, extractor: Optional[YtDlpExtractor] = None, languages: Sequence[str] = SUBTITLE_LANGUAGES):
+        self.languages = tuple(languages)
+        self.extractor = extractor
+        if self.extractor is None and YTDLP_AVAILABLE:
+            self.extractor = YtDlpExtractor(languages=self.languages)
+
+    def extract(self, video_url, video_id, cancelled=None, output_dir=None, languages=None):
+        languages = tuple(languages or self.languages)
+        if self.extractor is not None:
+            result = self.extractor.extract(video_url, cancelled=cancelled, languages=languages)
+        else:
+            result = download_subtitles_cli(
+                video_url, video_id, languages, output_dir=output_dir, cancelled=cancelled
+            )
+
+        tracks = {
+            language: {"transcript": parse_vtt_content(track["vtt"]), "kind": track["kind"], "name": track["name"]}
+            for language, track in result["tracks"].items()
+        }
+        return _with_primary(tracks, result["metadata"])
+
+
+BACKENDS = {
+    TranscriptApiBackend.name: TranscriptApiBackend,
+    YtDlpBackend.name: YtDlpBackend
+}
+
+
+class BackendStats:
+    """Latency and outcome counters for one backend."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.wins = 0
+        self.total_latency = 0.0
+        self.last_latency: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        completed = self.successes + self.failures
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+            "wins": self.wins,
+            "mean_latency": self.total_latency / completed if completed else None,
+            "last_latency": self.last_latency
+        }
+
+
+class TranscriptExtractor:
+    """Gets a transcript from one of several backends.
+
+    In "race" mode the first backend starts immediately and each further one
+    starts after hedge_delay seconds, or as soon as the previous one fails.
+    The first non-empty transcript wins and the other backends are cancelled.
+    "fallback" mode tries backends one at a time, in order.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[TranscriptBackend],
+        mode: str = TRANSCRIPT_MODE,
+        hedge_delay: float = TRANSCRIPT_HEDGE_DELAY
+    ):
+        if not backends:
+            raise ValueError("At least one transcript backend is required")
+        if mode not in ("race", "fallback"):
+            raise ValueError(f"Unknown transcript extraction mode: {mode}")
+
+        self.backends = list(backends)
+        self.mode = mode
+        self.hedge_delay = hedge_delay
+
+        self._stats = {backend.name: BackendStats() for backend in self.backends}
+        self._lock = threading.Lock()
+
+    def _attempt(self, backend: TranscriptBackend, video_url, video_id, cancelled, output_dir, languages) -> Dict[str, Any]:
+        stats = self._stats[backend.name]
+        with self._lock:
+            stats.attempts += 1
+
+        started = time.monotonic()
+        try:
+            result = backend.extract(video_url, video_id, cancelled=cancelled, output_dir=output_dir, languages=languages)
+            if not result["transcript"]:
+                raise SubtitlesNotFound(f"{backend.name} returned an empty transcript")
+        except ExtractionCancelled:
+            with self._lock:
+                stats.cancelled += 1
+            raise
+        except Exception:
+            with self._lock:
+                stats.failures += 1
+                stats.last_latency = time.monotonic() - started
+                stats.total_latency += stats.last_latency
+            raise
+
+        with self._lock:
+            stats.successes += 1
+            stats.last_latency = time.monotonic() - started
+            stats.total_latency += stats.last_latency
+
+        return dict(result, backend=backend.name)
+
+    def _won(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._stats[result["backend"]].wins += 1
+        return result
+
+    def _fallback(self, video_url, video_id, cancelled, output_dir, languages) -> Dict[str, Any]:
+        errors = {}
+        for backend in self.backends:
+            if cancelled is not None and cancelled.is_set():
+                raise ExtractionCancelled(f"Extraction of {video_url} cancelled")
+            try:
+                return self._won(self._attempt(backend, video_url, video_id, cancelled, output_dir, languages))
+            except ExtractionCancelled:
+                raise
+            except Exception as e:
+                print(f"⚠️ Transcript backend {backend.name} failed for {video_id}: {e}")
+                errors[backend.name] = e
+
+        raise TranscriptUnavailable(f"No transcript backend succeeded for {video_id}", errors)
+
+    def _race(self, video_url, video_id, cancelled, output_dir, languages, spawn) -> Dict[str, Any]:
+        outcomes: "queue.Queue" = queue.Queue()
+        events = []
+        errors = {}
+
+        def run(backend, event, backend_dir):
+            try:
+                result = self._attempt(backend, video_url, video_id, event, backend_dir, languages)
+                outcomes.put((backend, result, None))
+            except Exception as e:
+                outcomes.put((backend, None, e))
+
+        def start(backend):
+            event = threading.Event()
+            events.append(event)
+            # Backends that write files get their own subdirectory
+            backend_dir = None
+            if output_dir is not None:
+                backend_dir = os.path.join(output_dir, backend.name)
+                os.makedirs(backend_dir, exist_ok=True)
+            name = f"transcript-{backend.name}"
+            if spawn is None:
+                threading.Thread(target=run, args=(backend, event, backend_dir), daemon=True, name=name).start()
+            else:
+                spawn(run, backend, event, backend_dir, name=name)
+
+        pending = list(self.backends)
+        running = 0
+        next_start = time.monotonic()
+        try:
+            while True:
+                if cancelled is not None and cancelled.is_set():
+                    raise ExtractionCancelled(f"Extraction of {video_url} cancelled")
+
+                # Start the next backend when the hedge delay passes without a result
+                now = time.monotonic()
+                if pending and now >= next_start:
+                    start(pending.pop(0))
+                    running += 1
+                    next_start = now + self.hedge_delay
+                if not running:
+                    raise TranscriptUnavailable(f"No transcript backend succeeded for {video_id}", errors)
+
+                wait = min(0.5, max(0.0, next_start - now)) if pending else 0.5
+                try:
+                    backend, result, error = outcomes.get(timeout=wait)
+                except queue.Empty:
+                    continue
+
+                running -= 1
+                if error is None:
+                    return self._won(result)
+
+                if not isinstance(error, ExtractionCancelled):
+                    print(f"⚠️ Transcript backend {backend.name} failed for {video_id}: {error}")
+                errors[backend.name] = error
+                # A failure hands over to the next backend right away
+                next_start = time.monotonic()
+
+        finally:
+            # Stop the backends that lost the race
+            for event in events:
+                event.set()
+
+    def extract(
+        self,
+        video_url: str,
+        video_id: str,
+        cancelled: Optional[threading.Event] = None,
+        output_dir: Optional[str] = None,
+        languages: Optional[Sequence[str]] = None,
+        spawn: Optional[Callable[..., Any]] = None
+    ) -> Dict[str, Any]:
+        """Get a transcript from the configured backends.
+
+        Args:
+            video_url: YouTube video URL
+            video_id: YouTube video ID
+            cancelled: Optional event that stops all backends when set
+            output_dir: Directory for backends that write files
+            languages: Languages in order of preference; each one with
+                captions is fetched by the winning backend
+            spawn: Starts a racing backend, as spawn(fn, *args, name=...);
+                ExtractionJob.spawn counts backends that lose the race but
+                can't stop at once against the pool's workers
+
+        Returns:
+            Dict with tracks (per language), transcript and language of the
+            most preferred one, metadata and the winning backend's name
+
+        Raises:
+            TranscriptUnavailable: If every backend failed
+            ExtractionCancelled: If cancelled was set
+        """
+        if self.mode == "fallback" or len(self.backends) == 1:
+            return self._fallback(video_url, video_id, cancelled, output_dir, languages)
+        return self._race(video_url, video_id, cancelled, output_dir, languages, spawn)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend latency and success counters."""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+
+def create_backends(names: str = TRANSCRIPT_BACKENDS, **options) -> List[TranscriptBackend]:
+    """Build backends from a comma-separated list of names, skipping unavailable ones.
+
+    Args:
+        options: Keyword arguments keyed by backend name, e.g. ytdlp={"extractor": ...}
+    """
+    backends = []
+    for name in (part.strip() for part in names.split(",")):
+        if not name:
+            continue
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown transcript backend: {name}")
+        try:
+            backends.append(BACKENDS[name](**options.get(name, {})))
+        except RuntimeError as e:
+            print(f"⚠️ Transcript backend {name} disabled: {e}")
+    return backends
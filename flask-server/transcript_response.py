@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Bodies smaller than this are always sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+
+# Content encodings offered, most preferred first
+ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+_COMPRESSORS = {
+    # Bodies are compressed once per cached transcript, so a high level pays off
+    "gzip": lambda body: gzip.compress(body, compresslevel=9, mtime=0),
+}
+if BROTLI_AVAILABLE:
+    _COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=9)
+
+
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(value) -> bytes:
+    """Serialize to compact UTF-8 JSON, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value)
+    return _compact_encoder.encode(value).encode("utf-8")
+
+
+def choose_encoding(accept_encoding: Optional[str], body_size: int) -> Optional[str]:
+    """Best content encoding the client accepts for a body, or None for identity."""
+    if not accept_encoding or body_size < COMPRESS_MIN_BYTES:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class CachedTranscriptResponse:
+    """The /transcript body for one transcript, serialized once.
+
+    Everything except rag_stored, cached and extraction_time is serialized
+    on first use with the fast encoder and kept as bytes; each response
+    splices those three fields onto it. Cached-hit bodies only vary with
+    rag_stored, so their compressed copies are also built once and reused
+    for every later hit; each encoding has its own strong ETag.
+    """
+
+    def __init__(self, row: Dict):
+        self.fields = {
+            "video_id": row["video_id"],
+            "title": row["title"],
+            "url": row["url"],
+            "language": row.get("language") or "English",
+            "language_code": row.get("language_code") or "en",
+            "transcript": row["transcript_data"],
+            "metadata": row.get("metadata") or {}
+        }
+        self._prefix: Optional[bytes] = None
+        self._digest: Optional[str] = None
+        self._encoded: Dict[Tuple[bool, str], bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def prefix(self) -> bytes:
+        """The serialized body up to, not including, its closing brace."""
+        if self._prefix is None:
+            with self._lock:
+                if self._prefix is None:
+                    transcript = self.fields["transcript"]
+                    body = dumps({
+                        "success": True,
+                        **self.fields,
+                        "transcript": transcript.to_list() if hasattr(transcript, "to_list") else transcript
+                    })
+                    self._digest = hashlib.sha256(body).hexdigest()[:32]
+                    self._prefix = body[:-1]
+        return self._prefix
+
+    def body_parts(self, rag_stored: bool, cached: bool = True, extraction_time: float = 0) -> List[bytes]:
+        """Body as [serialized fields, per-request fields], to send without joining."""
+        suffix = dumps({"rag_stored": rag_stored, "cached": cached, "extraction_time": extraction_time})
+        return [self.prefix, b"," + suffix[1:]]
+
+    def etag(self, rag_stored: bool, encoding: Optional[str] = None) -> str:
+        """Strong ETag of the cached-hit body in one content encoding.
+
+        Each encoding is a different byte sequence, so it gets its own tag.
+        """
+        self.prefix
+        suffix = f"-{encoding}" if encoding else ""
+        return f'"{self._digest}-{int(rag_stored)}{suffix}"'
+
+    def body(self, rag_stored: bool, encoding: Optional[str] = None) -> bytes:
+        """Cached-hit body bytes, compressed with encoding (compressed once, then reused)."""
+        if encoding is None:
+            return b"".join(self.body_parts(rag_stored))
+
+        encoded = self._encoded.get((rag_stored, encoding))
+        if encoded is None:
+            encoded = _COMPRESSORS[encoding](self.body(rag_stored))
+            with self._lock:
+                self._encoded[(rag_stored, encoding)] = encoded
+        return encoded
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the serialized and compressed bodies."""
+        with self._lock:
+            return len(self._prefix or b"") + sum(len(body) for body in self._encoded.values())
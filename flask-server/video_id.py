@@ -0,0 +1,88 @@
+import re
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# YouTube video IDs: 11 characters of URL-safe base64
+_VIDEO_ID = re.compile(r'[A-Za-z0-9_-]{11}')
+
+# Hosts that serve the same videos as youtube.com
+_YOUTUBE_HOSTS = {
+    "youtube.com", "m.youtube.com", "music.youtube.com", "gaming.youtube.com",
+    "youtube-nocookie.com", "youtubekids.com"
+}
+
+# Short links put the ID in the first path segment
+_SHORT_LINK_HOSTS = {"youtu.be"}
+
+# First path segment -> the next segment is the video ID
+_ID_PATH_PREFIXES = {"embed", "shorts", "live", "v", "e", "watch", "vi"}
+
+# Query parameters that can carry a watch URL instead of an ID
+_NESTED_URL_PARAMS = ("u", "url", "continue")
+
+
+def is_video_id(value: str) -> bool:
+    """Whether value has the format of a YouTube video ID."""
+    return bool(_VIDEO_ID.fullmatch(value))
+
+
+def _host(netloc: str) -> str:
+    host = netloc.rsplit("@", 1)[-1].split(":", 1)[0].lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def resolve_video_id(value: Optional[str], _depth: int = 0) -> Optional[str]:
+    """Canonical video ID for a YouTube URL or bare ID, or None if there isn't one.
+
+    Handles watch, Shorts, live, embed and youtu.be links on any YouTube host
+    (m., music., nocookie), with or without a scheme, and ignores tracking
+    parameters (si, feature, pp, t, ...) so every shape of link to a video
+    resolves to the same cache key.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+
+    if is_video_id(value):
+        return value
+
+    if "://" not in value:
+        value = "https://" + value.lstrip("/")
+    try:
+        parts = urlsplit(value)
+    except ValueError:
+        return None
+
+    host = _host(parts.netloc)
+    segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+    query = parse_qs(parts.query)
+
+    if host in _SHORT_LINK_HOSTS:
+        candidate = segments[0] if segments else None
+        return candidate if candidate and is_video_id(candidate) else None
+
+    if host not in _YOUTUBE_HOSTS:
+        return None
+
+    for candidate in query.get("v", []) + query.get("vi", []):
+        if is_video_id(candidate.strip()):
+            return candidate.strip()
+
+    if len(segments) >= 2 and segments[0].lower() in _ID_PATH_PREFIXES and is_video_id(segments[1]):
+        return segments[1]
+
+    # attribution_link and sign-in redirects wrap the real watch URL
+    if _depth < 2:
+        for param in _NESTED_URL_PARAMS:
+            for nested in query.get(param, []):
+                if nested.startswith("/"):
+                    nested = "youtube.com" + nested
+                video_id = resolve_video_id(nested, _depth + 1)
+                if video_id:
+                    return video_id
+    return None
+
+
+def canonical_url(video_id: str) -> str:
+    """The watch URL every request for video_id is normalized to."""
+    return f"https://www.youtube.com/watch?v={video_id}"
@@ -0,0 +1,227 @@
+import io
+import re
+
+# Inline word timings and class tags that only YouTube's rolling auto-captions use
+_ROLLING_MARKUP = re.compile(r'<\d{2}:\d{2}:\d{2}\.\d{3}>|<c[.>]')
+
+# Any VTT formatting tag, removed from cue text
+_TAG = re.compile(r'<[^>]+>')
+
+# The HH:MM:SS.mmm form every YouTube cue timing uses
+_TIMESTAMP = re.compile(r'(\d+):(\d\d):(\d\d)\.(\d{3})')
+
+# Cues shorter than this are "hold" cues that just freeze the finished line
+HOLD_CUE_SECONDS = 0.05
+
+# How many recently emitted words are compared against the start of each cue
+_TAIL_WORDS = 64
+
+
+class VttReader:
+    """Single-pass, streaming VTT cue reader.
+
+    Reads lines from a string, a text or binary file, or any iterable of
+    lines, and yields cue dicts lazily, so a multi-hour file never has to be
+    split into a list of lines. After iteration, rolling is True if the
+    content used rolling auto-caption markup and malformed_timestamps counts
+    timings that parsed as 0.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, bytes):
+            source = source.decode('utf-8')
+        if isinstance(source, str):
+            source = io.StringIO(source, newline='\n')
+        self.source = source
+        self.rolling = False
+        self.malformed_timestamps = 0
+
+    def _seconds(self, time_str):
+        match = _TIMESTAMP.fullmatch(time_str)
+        if match:
+            hours, minutes, seconds, milliseconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(milliseconds) / 1000
+        try:
+            return _time_str_to_seconds(time_str)
+        except Exception:
+            self.malformed_timestamps += 1
+            return 0
+
+    def __iter__(self):
+        cue = None
+        text_lines = []
+        rolling_markup = _ROLLING_MARKUP.search
+
+        for line in self.source:
+            if line.__class__ is bytes:
+                line = line.decode('utf-8')
+            if line[-1:] == '\n':
+                line = line[:-1]
+            if not self.rolling and '<' in line and rolling_markup(line):
+                self.rolling = True
+
+            if cue is not None:
+                # Whitespace-only lines (YouTube pads rolling cues with " ")
+                # don't end the cue, they just carry no text
+                if line.rstrip('\r'):
+                    stripped = line.strip()
+                    if stripped:
+                        text_lines.append(stripped)
+                    continue
+
+                # Blank line: the cue is complete
+                if text_lines:
+                    yield self._entry(cue, text_lines)
+                cue = None
+                text_lines = []
+
+            # Look for timestamp lines (format: "00:00:00.000 --> 00:00:03.000")
+            elif '-->' in line:
+                parts = line.strip().split(' --> ')
+                if len(parts) == 2:
+                    # Drop cue settings such as "align:start position:0%"
+                    cue = (parts[0].strip().split(' ', 1)[0], parts[1].strip().split(' ', 1)[0])
+
+        if cue is not None and text_lines:
+            yield self._entry(cue, text_lines)
+
+        if self.malformed_timestamps:
+            print(f"⚠️ {self.malformed_timestamps} malformed VTT timestamps parsed as 0")
+
+    def _entry(self, cue, text_lines):
+        start_time_str, end_time_str = cue
+        text = ' '.join(text_lines)
+        # Remove VTT formatting tags
+        if '<' in text:
+            text = _TAG.sub('', text)
+
+        return {
+            "start": start_time_str,
+            "end": end_time_str,
+            "text": text,
+            "start_seconds": self._seconds(start_time_str),
+            "end_seconds": self._seconds(end_time_str)
+        }
+
+
+def iter_vtt_cues(source):
+    """Yield raw (not de-duplicated) cues from VTT text, a file or lines, one at a time."""
+    return iter(VttReader(source))
+
+
+def parse_vtt_content(vtt_content, dedupe=True):
+    """Parse VTT content into structured transcript data
+
+    vtt_content may be VTT text or a file object. Rolling auto-captions
+    (detected by their inline word timings) are merged into clean,
+    non-overlapping segments unless dedupe is False.
+    """
+    reader = VttReader(vtt_content)
+    transcript_data = list(reader)
+
+    if dedupe and reader.rolling:
+        return dedupe_rolling_cues(transcript_data)
+
+    return transcript_data
+
+def _time_str_to_seconds(time_str):
+    # Clean VTT alignment attributes (e.g., "00:00:02.240 align:start position:0%")
+    clean_time = time_str.split(' ')[0]  # Take only the time part before any spaces
+
+    parts = clean_time.split(':')
+    hours = int(parts[0])
+    minutes = int(parts[1])
+    seconds_parts = parts[2].split('.')
+    seconds = int(seconds_parts[0])
+    milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
+
+    return hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
+
+def time_str_to_seconds(time_str):
+    """Convert time string (HH:MM:SS.mmm) to seconds, handling VTT alignment attributes"""
+    try:
+        return _time_str_to_seconds(time_str)
+    except Exception as e:
+        print(f"⚠️ Error parsing time string '{time_str}': {e}")
+        return 0
+
+def seconds_to_time_str(seconds):
+    """Format seconds as a VTT timestamp (HH:MM:SS.mmm)"""
+    total_ms = int(round(seconds * 1000))
+    hours, rest = divmod(total_ms, 3600000)
+    minutes, rest = divmod(rest, 60000)
+    secs, ms = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}"
+
+def _word_overlap(tail, words):
+    """Length of the longest suffix of tail that is also a prefix of words"""
+    for k in range(min(len(tail), len(words)), 0, -1):
+        if tail[-k:] == words[:k]:
+            return k
+    return 0
+
+def dedupe_rolling_cues(transcript_data):
+    """Merge rolling auto-caption cues into clean, non-overlapping segments.
+
+    YouTube auto-captions repeat each line across consecutive cues while it
+    scrolls, with near-zero-duration "hold" cues in between. Each cue only
+    contributes the words that don't continue what was already emitted.
+    Words first seen in a hold cue were spoken since the previous segment
+    ended, so their segment starts there. Segment ends are clipped to the next
+    segment's start.
+    """
+    segments = []
+    tail = []
+
+    for entry in transcript_data:
+        words = entry["text"].split()
+        if not words:
+            continue
+
+        new_words = words[_word_overlap(tail, words):]
+        if not new_words:
+            continue
+
+        start_seconds = entry["start_seconds"]
+        end_seconds = entry.get("end_seconds", start_seconds)
+        if end_seconds - start_seconds < HOLD_CUE_SECONDS and segments:
+            start_seconds = segments[-1]["end_seconds"]
+
+        if segments and segments[-1]["end_seconds"] > start_seconds:
+            previous = segments[-1]
+            previous["end_seconds"] = max(previous["start_seconds"], start_seconds)
+            previous["end"] = seconds_to_time_str(previous["end_seconds"])
+
+        segments.append({
+            "start": seconds_to_time_str(start_seconds),
+            "end": seconds_to_time_str(end_seconds),
+            "text": ' '.join(new_words),
+            "start_seconds": start_seconds,
+            "end_seconds": end_seconds
+        })
+        tail = (tail + new_words)[-_TAIL_WORDS:]
+
+    return segments
+
+def looks_rolling(transcript_data):
+    """Detect already-parsed transcripts that still contain rolling auto-caption duplicates.
+
+    Used to migrate transcripts cached before de-duplication existed. Rolling
+    captions have both frequent hold cues and cues that start by repeating the
+    end of the previous one; de-duplicated output has neither.
+    """
+    if len(transcript_data) < 4:
+        return False
+
+    holds = 0
+    overlaps = 0
+    previous_words = []
+    for entry in transcript_data:
+        words = entry["text"].split()
+        if entry.get("end_seconds", entry["start_seconds"]) - entry["start_seconds"] < HOLD_CUE_SECONDS:
+            holds += 1
+        if _word_overlap(previous_words, words):
+            overlaps += 1
+        previous_words = words
+
+    return holds >= 0.2 * len(transcript_data) and overlaps >= 0.3 * len(transcript_data)
@@ -0,0 +1,214 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Threads writing queued jobs; jobs for one key never run concurrently
+WRITE_BEHIND_WORKERS = int(os.getenv("WRITE_BEHIND_WORKERS", "2"))
+
+# Attempts per job before it is dropped
+WRITE_BEHIND_ATTEMPTS = int(os.getenv("WRITE_BEHIND_ATTEMPTS", "5"))
+
+# Seconds before the first retry; doubled for each further attempt
+WRITE_BEHIND_RETRY_DELAY = float(os.getenv("WRITE_BEHIND_RETRY_DELAY", "1"))
+
+
+class _Job:
+    __slots__ = ("fn", "args", "kwargs", "attempts", "due")
+
+    def __init__(self, fn, args, kwargs, due):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.attempts = 0
+        self.due = due
+
+
+class WriteBehindQueue:
+    """Background writer for work that shouldn't hold up a response.
+
+    Jobs are queued per key: a job submitted while another for the same key
+    is still waiting replaces it, so only the latest write runs. A job that
+    raises or returns False is retried with exponential backoff up to
+    max_attempts times. flush() runs everything still queued, without the
+    backoff, and is called on interpreter exit; cancel() drops jobs whose
+    writes are no longer wanted.
+    """
+
+    def __init__(
+        self,
+        workers: int = WRITE_BEHIND_WORKERS,
+        max_attempts: int = WRITE_BEHIND_ATTEMPTS,
+        retry_delay: float = WRITE_BEHIND_RETRY_DELAY,
+        name: str = "write-behind"
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+
+        self._pending: Dict[Hashable, _Job] = {}
+        self._running = set()
+        self._cancelled = set()
+        self._cond = threading.Condition()
+        self._flushing = False
+        self._closed = False
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.cancelled = 0
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{n}", daemon=True)
+            for n in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs):
+        """Queue fn(*args, **kwargs), replacing a job for key that hasn't started."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            self.submitted += 1
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = _Job(fn, args, kwargs, time.monotonic())
+            self._cond.notify()
+
+    def pending(self, key: Hashable) -> bool:
+        """Whether a job for key is queued or running."""
+        with self._cond:
+            return key in self._pending or key in self._running
+
+    def cancel(self, key: Hashable, timeout: Optional[float] = None) -> int:
+        """Drop queued jobs for key, or for tuple keys that start with it.
+
+        Jobs already running can't be stopped: they are not retried, and
+        cancel waits up to timeout seconds for them to finish, so whatever they
+        wrote can be cleaned up once it returns.
+
+        Returns:
+            Number of queued jobs dropped
+        """
+        def matches(job_key):
+            if job_key == key:
+                return True
+            return isinstance(key, tuple) and isinstance(job_key, tuple) and job_key[:len(key)] == key
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            dropped = [job_key for job_key in self._pending if matches(job_key)]
+            for job_key in dropped:
+                del self._pending[job_key]
+            self.cancelled += len(dropped)
+
+            running = {job_key for job_key in self._running if matches(job_key)}
+            self._cancelled |= running
+            self._cond.notify_all()
+
+            while self._running & running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return len(dropped)
+
+    def _next_job(self):
+        """Wait for a due job whose key isn't running; None once closed and drained."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                next_due = None
+                for key, job in self._pending.items():
+                    if key in self._running:
+                        continue
+                    if self._flushing or job.due <= now:
+                        del self._pending[key]
+                        self._running.add(key)
+                        return key, job
+                    next_due = job.due if next_due is None else min(next_due, job.due)
+
+                if self._closed and not self._pending:
+                    return None
+                self._cond.wait(None if next_due is None else next_due - now)
+
+    def _work(self):
+        while True:
+            picked = self._next_job()
+            if picked is None:
+                return
+            key, job = picked
+
+            job.attempts += 1
+            try:
+                ok = job.fn(*job.args, **job.kwargs) is not False
+                error = None if ok else "returned False"
+            except Exception as e:
+                ok, error = False, e
+
+            with self._cond:
+                self._running.discard(key)
+                # A newer job for the key replaces this one instead of a retry,
+                # and a cancelled one is never retried
+                replaced = key in self._pending or key in self._cancelled
+                self._cancelled.discard(key)
+                retry = not ok and not replaced and job.attempts < self.max_attempts
+                if ok:
+                    self.completed += 1
+                elif retry:
+                    self.retried += 1
+                    job.due = time.monotonic() + self.retry_delay * 2 ** (job.attempts - 1)
+                    self._pending[key] = job
+                elif not replaced:
+                    self.failed += 1
+                self._cond.notify_all()
+
+            if retry:
+                print(f"⚠️ Write-behind job {key} failed (attempt {job.attempts}), retrying: {error}")
+            elif not ok and not replaced:
+                print(f"❌ Write-behind job {key} failed after {job.attempts} attempts: {error}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Run every queued job now, skipping retry backoff, and wait for them.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._pending or self._running:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush, then stop accepting jobs and stop the worker threads."""
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify_all()
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and job counters."""
+        with self._cond:
+            return {
+                "queued": len(self._pending),
+                "running": len(self._running),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+                "retried": self.retried,
+                "failed": self.failed,
+                "cancelled": self.cancelled
+            }
@@ -0,0 +1,407 @@
+import json
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import yt_dlp
+    YTDLP_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ yt_dlp library not available, using the yt-dlp command: {e}")
+    YTDLP_AVAILABLE = False
+
+# Where yt-dlp keeps solved player signatures between runs
+YTDLP_CACHE_DIR = os.getenv(
+    "YTDLP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "yt-dlp")
+)
+
+# YoutubeDL instances kept warm; each serves one extraction at a time
+YTDLP_INSTANCES = int(os.getenv("YTDLP_INSTANCES", "2"))
+
+# Languages fetched alongside whatever a request asks for, so they are cached
+# by the same extraction
+SUBTITLE_LANGUAGES = tuple(
+    code.strip() for code in os.getenv("CAPTION_FALLBACK_LANGUAGES", "en").split(",") if code.strip()
+) or ("en",)
+
+
+# Network timeout in seconds for yt-dlp requests, so stuck extractions fail
+YTDLP_SOCKET_TIMEOUT = float(os.getenv("YTDLP_SOCKET_TIMEOUT", "20"))
+
+# Seconds an extraction waits for a free YoutubeDL instance before failing
+YTDLP_BORROW_TIMEOUT = float(os.getenv("YTDLP_BORROW_TIMEOUT", "30"))
+
+
+class SubtitlesNotFound(Exception):
+    """Raised when a video has no captions in any of the requested languages."""
+
+
+class ExtractionCancelled(Exception):
+    """Raised when an extraction is stopped through its cancellation event."""
+
+
+def language_preference(requested: Optional[Iterable[str]] = None, fallback: Sequence[str] = SUBTITLE_LANGUAGES) -> Tuple[str, ...]:
+    """Requested languages followed by the fallback languages, without duplicates."""
+    languages = []
+    for code in list(requested or []) + list(fallback):
+        code = code.strip()
+        if code and code not in languages:
+            languages.append(code)
+    return tuple(languages)
+
+
+def match_language(available: Iterable[str], language: str) -> Optional[str]:
+    """Find the track for language among available codes.
+
+    An exact match wins; otherwise a regional variant of the same language
+    ("en-US" or "en-GB" for "en") is used.
+    """
+    available = list(available)
+    if language in available:
+        return language
+
+    base = language.split("-")[0]
+    variants = sorted(code for code in available if code.split("-")[0] == base)
+    return variants[0] if variants else None
+
+
+def original_automatic_captions(info: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Automatic caption tracks in the language that was spoken, from yt-dlp video info.
+
+    YouTube offers machine translations of the speech-recognition track into
+    nearly every language, and yt-dlp lists them next to the original. Those
+    are left out: a "-orig" track, a track in the video's source language or
+    one whose URL asks for no translation (tlang) is kept.
+    """
+    source = (info.get("language") or "").split("-")[0]
+    return {
+        code: tracks
+        for code, tracks in (info.get("automatic_captions") or {}).items()
+        if code.endswith("-orig")
+        or (source and code.split("-")[0] == source)
+        or not any("tlang=" in (track.get("url") or "") for track in tracks)
+    }
+
+
+def select_subtitles(info: Dict[str, Any], languages: Sequence[str] = SUBTITLE_LANGUAGES) -> List[Tuple[str, str, str, str]]:
+    """Pick one VTT caption track per requested language from yt-dlp video info.
+
+    Uploaded (manual) subtitles are preferred over automatic captions: they
+    are smaller, and free of the rolling duplicates auto-captions carry.
+    Machine-translated automatic captions are never picked, and languages
+    without a track are skipped.
+
+    Returns:
+        List of (language, "manual" or "automatic", track URL, track name), in
+        the order of languages
+    """
+    selected = []
+    for language in languages:
+        for kind, tracks in (("manual", info.get("subtitles") or {}), ("automatic", original_automatic_captions(info))):
+            code = match_language(tracks, language)
+            track = next(
+                (track for track in tracks.get(code) or [] if track.get("ext") == "vtt" and track.get("url")),
+                None
+            )
+            if track:
+                selected.append((language, kind, track["url"], track.get("name") or code))
+                break
+    return selected
+
+
+def select_subtitle(info: Dict[str, Any], languages: Sequence[str] = SUBTITLE_LANGUAGES) -> Optional[Tuple[str, str, str]]:
+    """Pick the caption track for the first available language.
+
+    Returns:
+        Tuple of (language, "manual" or "automatic", track URL), or None
+    """
+    selected = select_subtitles(info, languages)
+    return selected[0][:3] if selected else None
+
+
+def language_available(caption_languages: Dict[str, List[str]], language: str) -> bool:
+    """Whether video_metadata's caption_languages lists a track for language."""
+    return any(
+        match_language(caption_languages.get(kind) or [], language)
+        for kind in ("manual", "automatic")
+    )
+
+
+def video_metadata(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the parts of yt-dlp video info stored alongside a transcript.
+
+    Returns:
+        Dict with title, duration (seconds), chapters and the caption
+        languages available as manual and untranslated automatic tracks
+    """
+    chapters = [
+        {
+            "title": chapter.get("title"),
+            "start_seconds": chapter.get("start_time"),
+            "end_seconds": chapter.get("end_time")
+        }
+        for chapter in info.get("chapters") or []
+    ]
+
+    return {
+        "title": info.get("title"),
+        "duration": info.get("duration"),
+        "chapters": chapters,
+        "caption_languages": {
+            "manual": sorted(info.get("subtitles") or {}),
+            "automatic": sorted(original_automatic_captions(info))
+        }
+    }
+
+
+class YtDlpExtractor:
+    """Extracts captions in-process with warm, reusable YoutubeDL instances.
+
+    Running the yt-dlp command pays for a new interpreter, the yt-dlp import
+    and the player JS download on every video. Instances here live as long as
+    the server, keep their extractor and player caches in memory, and share
+    an on-disk cache directory. Captions are fetched straight into memory.
+    YoutubeDL is not thread-safe, so each instance serves one caller at a time.
+    """
+
+    def __init__(
+        self,
+        languages: Sequence[str] = SUBTITLE_LANGUAGES,
+        cache_dir: str = YTDLP_CACHE_DIR,
+        instances: int = YTDLP_INSTANCES,
+        options: Optional[Dict[str, Any]] = None,
+        borrow_timeout: float = YTDLP_BORROW_TIMEOUT
+    ):
+        self.languages = tuple(languages)
+        self.cache_dir = cache_dir
+        self.max_instances = max(1, instances)
+        self.options = options or {}
+        self.borrow_timeout = borrow_timeout
+
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _ydl_options(self) -> Dict[str, Any]:
+        return {
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            "cachedir": self.cache_dir,
+            "socket_timeout": YTDLP_SOCKET_TIMEOUT,
+            **self.options
+        }
+
+    @contextmanager
+    def borrow(
+        self, timeout: Optional[float] = None, cancelled: Optional[threading.Event] = None
+    ) -> Iterator["yt_dlp.YoutubeDL"]:
+        """Borrow a warm YoutubeDL instance, creating one if under the limit.
+
+        Args:
+            timeout: Seconds to wait for a busy instance, defaulting to borrow_timeout
+            cancelled: Optional event that stops the wait
+
+        Raises:
+            TimeoutError: If no instance is free in time
+            ExtractionCancelled: If cancelled is set while waiting
+        """
+        try:
+            ydl = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.max_instances
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    ydl = yt_dlp.YoutubeDL(self._ydl_options())
+                except BaseException:
+                    # Give the slot back, or failed constructions shrink the pool for good
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                ydl = self._wait_idle(timeout, cancelled)
+
+        try:
+            yield ydl
+        finally:
+            self._idle.put(ydl)
+
+    def _wait_idle(self, timeout: Optional[float], cancelled: Optional[threading.Event]) -> "yt_dlp.YoutubeDL":
+        timeout = self.borrow_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                raise ExtractionCancelled("Cancelled while waiting for a yt-dlp instance")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No yt-dlp instance free within {timeout:.0f}s")
+            try:
+                return self._idle.get(timeout=min(0.5, remaining))
+            except queue.Empty:
+                continue
+
+    def extract(
+        self,
+        video_url: str,
+        cancelled: Optional[threading.Event] = None,
+        languages: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Fetch a video's info and captions without touching the filesystem.
+
+        One info call serves every language; a caption file is then fetched
+        for each language that has a track.
+
+        Args:
+            video_url: YouTube video URL
+            cancelled: Optional event; when set, caption downloads are skipped
+            languages: Languages in order of preference, defaulting to self.languages
+
+        Returns:
+            Dict with tracks (language -> vtt, kind and name), the vtt, language
+            and kind of the most preferred available language, metadata (see
+            video_metadata) and the raw yt-dlp info
+
+        Raises:
+            SubtitlesNotFound: If no caption track matches the languages
+            ExtractionCancelled: If cancelled is set while waiting for an
+                instance or once the video info is in
+            TimeoutError: If every instance stays busy for borrow_timeout
+        """
+        languages = tuple(languages or self.languages)
+
+        with self.borrow(cancelled=cancelled) as ydl:
+            # process=False skips format sorting, which caption extraction doesn't need
+            info = ydl.extract_info(video_url, download=False, process=False)
+
+            selected = select_subtitles(info, languages)
+            if not selected:
+                raise SubtitlesNotFound(f"No {'/'.join(languages)} captions for {video_url}")
+
+            tracks = {}
+            for language, kind, url, name in selected:
+                if cancelled is not None and cancelled.is_set():
+                    raise ExtractionCancelled(f"Extraction of {video_url} cancelled")
+                with ydl.urlopen(url) as response:
+                    tracks[language] = {"vtt": response.read().decode('utf-8'), "kind": kind, "name": name}
+
+        language = selected[0][0]
+        return {
+            "vtt": tracks[language]["vtt"],
+            "language": language,
+            "kind": tracks[language]["kind"],
+            "tracks": tracks,
+            "metadata": video_metadata(info),
+            "info": info
+        }
+
+
+def download_subtitles_cli(
+    video_url: str,
+    video_id: str,
+    languages: Sequence[str] = SUBTITLE_LANGUAGES,
+    output_dir: Optional[str] = None,
+    cancelled: Optional[threading.Event] = None
+) -> Dict[str, Any]:
+    """Download captions and video info by running the yt-dlp command.
+
+    The original extraction path, kept as a fallback when the yt_dlp library
+    can't be imported and as the baseline for bench_extraction.py. Files are
+    written under output_dir (a fresh temporary directory if not given) rather
+    than the working directory, so concurrent calls never share files.
+
+    Args:
+        cancelled: Optional event; when set, the yt-dlp process is killed
+
+    Returns:
+        Dict with tracks, vtt, language, kind and metadata, as from
+        YtDlpExtractor.extract
+
+    Raises:
+        ExtractionCancelled: If cancelled is set while yt-dlp is running
+    """
+    if output_dir is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return download_subtitles_cli(video_url, video_id, languages, temp_dir, cancelled)
+
+    cmd = [
+        'yt-dlp',
+        '--write-subs',
+        '--write-auto-subs',
+        '--sub-langs', ','.join(languages),
+        '--sub-format', 'vtt',
+        '--skip-download',
+        '--write-info-json',
+        '--paths', output_dir,
+        '--output', '%(id)s.%(ext)s',
+        video_url
+    ]
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=0.5)
+            break
+        except subprocess.TimeoutExpired:
+            if cancelled is not None and cancelled.is_set():
+                process.kill()
+                process.communicate()
+                raise ExtractionCancelled(f"Extraction of {video_url} cancelled")
+
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+
+    info = {}
+    info_files = list(Path(output_dir).glob("*.info.json"))
+    if info_files:
+        with open(info_files[0], 'r', encoding='utf-8') as f:
+            info = json.load(f)
+
+    # Files are named <id>.<language>.vtt; yt-dlp writes the manual track
+    # when a language has both
+    files = {}
+    for subtitle_file in Path(output_dir).glob("*.vtt"):
+        if video_id in subtitle_file.name:
+            files[subtitle_file.name[:-len(".vtt")].rsplit(".", 1)[-1]] = subtitle_file
+
+    originals = original_automatic_captions(info)
+    if info:
+        # Drop the machine translations --write-auto-subs also writes
+        files = {code: path for code, path in files.items() if code in (info.get("subtitles") or {}) or code in originals}
+
+    tracks = {}
+    for language in languages:
+        code = match_language(files, language)
+        if code is None:
+            continue
+        with open(files[code], 'r', encoding='utf-8') as f:
+            vtt_content = f.read()
+        manual = (info.get("subtitles") or {}).get(code)
+        automatic = originals.get(code)
+        track = (manual or automatic or [{}])[0]
+        tracks[language] = {
+            "vtt": vtt_content,
+            "kind": "manual" if manual else "automatic",
+            "name": track.get("name") or code
+        }
+
+    if not tracks:
+        raise SubtitlesNotFound("No subtitle files found")
+
+    language = next(iter(tracks))
+    return {
+        "vtt": tracks[language]["vtt"],
+        "language": language,
+        "kind": tracks[language]["kind"],
+        "tracks": tracks,
+        "metadata": video_metadata(info)
+    }
@@ -11,12 +11,13 @@ Main components:
 # Make key components available at package level
 try:
     from .rag_agent import youtube_ai_assistant, PydanticAIDeps
-    from .ingest_youtube import process_and_store_transcript
+    from .ingest_youtube import process_and_store_transcript, resume_transcript_ingest
     
     __all__ = [
         'youtube_ai_assistant',
         'PydanticAIDeps', 
-        'process_and_store_transcript'
+        'process_and_store_transcript',
+        'resume_transcript_ingest'
     ]
 except ImportError as e:
     print(f"Warning: Could not import RAG components: {e}")
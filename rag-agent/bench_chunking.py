@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fixed 3-cue chunking vs token-aware chunking.
+
+Compares chunk counts, embedded tokens, embedding requests and end-to-end
+ingest time through process_and_store_transcript. OpenAI and Supabase are
+replaced with in-process stand-ins that add a fixed latency per request, so
+the numbers reflect round trips saved rather than network noise.
+
+Usage:
+    python bench_chunking.py                      # synthetic 1h and 3h auto-captions
+    python bench_chunking.py --transcript t.json  # transcript_data JSON (e.g. from /transcript)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from types import SimpleNamespace
+
+# ingest_youtube creates its clients at import time
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench")
+
+import ingest_youtube
+
+WORDS = "so the idea here is that we can take this and really just make it work for you".split()
+
+
+def synthetic_auto_captions(hours: float, seed: int = 7):
+    """Generate auto-caption-like cues: ~2 s long, 3-7 words each."""
+    rng = random.Random(seed)
+    cues = []
+    t = 0.0
+    while t < hours * 3600:
+        duration = rng.uniform(1.2, 2.8)
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 7)))
+        cues.append({
+            "start": f"{t:.3f}",
+            "end": f"{t + duration:.3f}",
+            "text": text,
+            "start_seconds": t,
+            "end_seconds": t + duration
+        })
+        t += duration
+    return cues
+
+
+class SlowEmbeddings:
+    """Embeddings stand-in with a fixed latency per request."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.tokens = 0
+        self.with_raw_response = SimpleNamespace(create=self.create)
+
+    async def create(self, model, input):
+        self.requests += 1
+        self.tokens += sum(ingest_youtube.count_tokens(text) for text in input)
+        await asyncio.sleep(self.latency)
+        data = [SimpleNamespace(index=i, embedding=[0.01] * 1536) for i in range(len(input))]
+        response = SimpleNamespace(data=data)
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+
+class SlowSupabase:
+    """Supabase stand-in with a fixed latency per write."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, **kwargs):
+        return self
+
+    def execute(self):
+        self.writes += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(data=[])
+
+
+def run_strategy(strategy: str, transcript, embed_latency: float, write_latency: float):
+    ingest_youtube.CHUNK_STRATEGY = strategy
+    embeddings = SlowEmbeddings(embed_latency)
+    db = SlowSupabase(write_latency)
+    ingest_youtube.openai_client = SimpleNamespace(embeddings=embeddings)
+    ingest_youtube.supabase = db
+
+    started = time.perf_counter()
+    chunks = list(ingest_youtube.iter_transcript_chunks(transcript))
+    chunk_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary = asyncio.run(ingest_youtube.process_and_store_transcript("bench", "https://youtu.be/bench", "Bench", transcript))
+    ingest_time = time.perf_counter() - started
+
+    return {
+        "strategy": ingest_youtube.chunker_id(),
+        "chunks": len(chunks),
+        "avg_tokens": embeddings.tokens / max(1, len(chunks)),
+        "tokens": embeddings.tokens,
+        "requests": embeddings.requests,
+        "writes": db.writes,
+        "chunk_ms": chunk_time * 1000,
+        "ingest_s": ingest_time,
+        "stored": summary["chunks_stored"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcript", help="JSON file with transcript_data entries")
+    parser.add_argument("--hours", type=float, nargs="*", default=[1, 3], help="Synthetic transcript lengths")
+    parser.add_argument("--embed-latency", type=float, default=0.3, help="Seconds per embeddings request")
+    parser.add_argument("--write-latency", type=float, default=0.05, help="Seconds per Supabase write")
+    args = parser.parse_args()
+
+    # Measure chunking and request counts only, not the on-disk cache
+    ingest_youtube.EMBEDDING_CACHE_PATH = ""
+
+    if args.transcript:
+        with open(args.transcript, encoding="utf-8") as f:
+            data = json.load(f)
+        inputs = [(args.transcript, data.get("transcript", data) if isinstance(data, dict) else data)]
+    else:
+        inputs = [(f"synthetic {hours:g}h", synthetic_auto_captions(hours)) for hours in args.hours]
+
+    header = f"{'input':<16} {'strategy':<22} {'chunks':>7} {'avg tok':>8} {'tokens':>8} {'requests':>8} {'writes':>7} {'chunk ms':>9} {'ingest s':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, transcript in inputs:
+        for strategy in ("entries", "tokens"):
+            r = run_strategy(strategy, transcript, args.embed_latency, args.write_latency)
+            print(
+                f"{name:<16} {r['strategy']:<22} {r['chunks']:>7} {r['avg_tokens']:>8.1f} {r['tokens']:>8} "
+                f"{r['requests']:>8} {r['writes']:>7} {r['chunk_ms']:>9.1f} {r['ingest_s']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import base64
+import json
+import os
+import sqlite3
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BATCH_ENDPOINT = "/v1/embeddings"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# The Batch API accepts up to 50,000 requests and 200 MB per input file, and
+# an embeddings batch up to 50,000 inputs across all of its requests
+BATCH_MAX_REQUESTS_PER_FILE = 50000
+BATCH_MAX_INPUTS_PER_FILE = 50000
+BATCH_MAX_FILE_BYTES = 190 * 1024 * 1024
+
+# Batch statuses after which no more results will appear. Expired batches
+# still deliver the requests that finished in time.
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def decode_embedding(value) -> array:
+    """Decode an embedding returned as a float list or as base64-packed float32."""
+    if isinstance(value, str):
+        vector = array('f')
+        vector.frombytes(base64.b64decode(value))
+        return vector
+    return array('f', value)
+
+
+class BatchJobStore:
+    """Durable state for one backfill job, kept in job.sqlite3 in the job directory.
+
+    Tracks every input file (upload, batch and load state) and the chunks
+    behind every request, so a job that takes hours can be submitted by one
+    process and polled and loaded by another.
+    """
+
+    def __init__(self, job_dir: str):
+        self.job_dir = job_dir
+        os.makedirs(job_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(job_dir, "job.sqlite3"), isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "create table if not exists files ("
+            " file_index integer primary key,"
+            " path text not null,"
+            " request_count integer not null,"
+            " status text not null default 'prepared',"
+            " input_file_id text,"
+            " batch_id text,"
+            " output_file_id text,"
+            " error_file_id text,"
+            " loaded integer not null default 0)"
+        )
+        self._conn.execute(
+            "create table if not exists requests ("
+            " custom_id text primary key,"
+            " file_index integer not null,"
+            " payload text not null,"
+            " status text not null default 'pending')"
+        )
+
+    def add_file(self, file_index: int, path: str, requests: List[Tuple[str, Dict[str, Any]]]):
+        """Record a finished input file and the payload behind each of its requests."""
+        self._conn.execute("begin")
+        self._conn.execute(
+            "insert or replace into files (file_index, path, request_count) values (?, ?, ?)",
+            (file_index, path, len(requests))
+        )
+        self._conn.executemany(
+            "insert or replace into requests (custom_id, file_index, payload) values (?, ?, ?)",
+            [(custom_id, file_index, json.dumps(payload)) for custom_id, payload in requests]
+        )
+        self._conn.execute("commit")
+
+    def files(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "select * from files"
+        params: Tuple = ()
+        if status:
+            query += " where status = ?"
+            params = (status,)
+        return [dict(row) for row in self._conn.execute(query + " order by file_index", params)]
+
+    def update_file(self, file_index: int, **fields):
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        self._conn.execute(f"update files set {columns} where file_index = ?", (*fields.values(), file_index))
+
+    def get_payload(self, custom_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("select payload from requests where custom_id = ?", (custom_id,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def mark_requests(self, custom_ids: List[str], status: str):
+        self._conn.executemany(
+            "update requests set status = ? where custom_id = ?",
+            [(status, custom_id) for custom_id in custom_ids]
+        )
+
+    def mark_file_requests(self, file_index: int, status: str, only_pending: bool = True):
+        query = "update requests set status = ? where file_index = ?"
+        if only_pending:
+            query += " and status = 'pending'"
+        self._conn.execute(query, (status, file_index))
+
+    def request_counts(self) -> Dict[str, int]:
+        return {row["status"]: row["n"] for row in self._conn.execute("select status, count(*) as n from requests group by status")}
+
+    def close(self):
+        self._conn.close()
+
+
+class BatchInputWriter:
+    """Writes embedding requests to JSONL batch input files in a job directory.
+
+    A new file is started whenever the current one would exceed the Batch API
+    request, embedding input or size limits. Each finished file is recorded
+    in the job store.
+    """
+
+    def __init__(
+        self,
+        store: BatchJobStore,
+        model: str,
+        max_requests: int = BATCH_MAX_REQUESTS_PER_FILE,
+        max_bytes: int = BATCH_MAX_FILE_BYTES,
+        max_inputs: int = BATCH_MAX_INPUTS_PER_FILE
+    ):
+        self.store = store
+        self.model = model
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.max_inputs = max_inputs
+
+        self.file_index = len(store.files())
+        self._file = None
+        self._path = None
+        self._bytes = 0
+        self._inputs = 0
+        self._requests: List[Tuple[str, Dict[str, Any]]] = []
+
+    def add(self, custom_id: str, texts: List[str], payload: Dict[str, Any]):
+        """Append one embeddings request; payload is kept to turn its result into rows."""
+        line = json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            # base64 float32 keeps the output file ~4x smaller than JSON floats
+            "body": {"model": self.model, "input": texts, "encoding_format": "base64"}
+        }).encode('utf-8') + b'\n'
+
+        if self._file and (
+            len(self._requests) >= self.max_requests
+            or self._bytes + len(line) > self.max_bytes
+            or self._inputs + len(texts) > self.max_inputs
+        ):
+            self._finish_file()
+
+        if not self._file:
+            self._path = os.path.join(self.store.job_dir, f"input-{self.file_index:04d}.jsonl")
+            self._file = open(self._path, 'wb')
+            self._bytes = 0
+            self._inputs = 0
+
+        self._file.write(line)
+        self._bytes += len(line)
+        self._inputs += len(texts)
+        self._requests.append((custom_id, payload))
+
+    def _finish_file(self):
+        self._file.close()
+        self.store.add_file(self.file_index, self._path, self._requests)
+        self._file = None
+        self._requests = []
+        self.file_index += 1
+
+    def close(self):
+        if self._file:
+            self._finish_file()
+
+
+async def submit_batch_file(client, path: str, metadata: Optional[Dict[str, str]] = None) -> Tuple[str, Any]:
+    """Upload an input file and create an embeddings batch for it.
+
+    Returns:
+        Tuple of (input file ID, created batch)
+    """
+    with open(path, 'rb') as f:
+        uploaded = await client.files.create(file=f, purpose="batch")
+
+    batch = await client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+        metadata=metadata or {}
+    )
+    return uploaded.id, batch
+
+
+async def download_file(client, file_id: str, path: str):
+    """Stream a file from the Files API to disk without holding it in memory."""
+    async with client.files.with_streaming_response.content(file_id) as response:
+        with open(path, 'wb') as f:
+            async for chunk in response.iter_bytes():
+                f.write(chunk)
+
+
+def iter_batch_results(path: str) -> Iterator[Tuple[str, Optional[List[array]], Optional[str]]]:
+    """Read a batch output or error file one line at a time.
+
+    Yields:
+        Tuples of (custom_id, vectors in input order, None) for successful
+        requests and (custom_id, None, error message) for failed ones
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            result = json.loads(line)
+            custom_id = result["custom_id"]
+            response = result.get("response") or {}
+
+            if result.get("error") or response.get("status_code") != 200:
+                error = result.get("error") or (response.get("body") or {}).get("error") or {}
+                message = error.get("message") if isinstance(error, dict) else str(error)
+                yield custom_id, None, message or f"status {response.get('status_code')}"
+                continue
+
+            data = sorted(response["body"]["data"], key=lambda item: item["index"])
+            yield custom_id, [decode_embedding(item["embedding"]) for item in data], None
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def normalize_text(text: str) -> str:
+    """Normalize chunk text so trivially different copies share a cache entry."""
+    return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+
+def make_cache_key(model: str, text: str) -> str:
+    """Content address for an embedding: hash of the model plus normalized text."""
+    return hashlib.sha256(f"{model}\n{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent embedding cache backed by a local SQLite file.
+
+    Vectors are stored as float32 blobs. When the stored size exceeds
+    max_bytes, least recently used entries are evicted down to 90% of the cap.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Shared by the background ingest threads, guarded by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute(
+            "create table if not exists embeddings ("
+            " key text primary key,"
+            " vector blob not null,"
+            " size integer not null,"
+            " last_used real not null)"
+        )
+        self._conn.execute("create index if not exists idx_embeddings_last_used on embeddings (last_used)")
+        self.total_bytes = self._conn.execute("select coalesce(sum(size), 0) from embeddings").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, array]:
+        """Look up several keys, returning only the ones that are cached."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start:start + _LOOKUP_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"select key, vector from embeddings where key in ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[key] = vector
+
+                if rows:
+                    self._conn.execute(
+                        f"update embeddings set last_used = ? where key in ({','.join('?' * len(rows))})",
+                        [now] + [key for key, _ in rows]
+                    )
+
+        return found
+
+    def put_many(self, vectors: Dict[str, Iterable[float]]):
+        """Store vectors by key, evicting old entries if the cache grows past max_bytes."""
+        now = time.time()
+        rows = []
+        for key, vector in vectors.items():
+            blob = array('f', vector).tobytes()
+            rows.append((key, blob, len(blob) + len(key), now))
+
+        with self._lock:
+            self._conn.execute("begin")
+            for row in rows:
+                previous = self._conn.execute("select size from embeddings where key = ?", (row[0],)).fetchone()
+                self._conn.execute("insert or replace into embeddings values (?, ?, ?, ?)", row)
+                self.total_bytes += row[2] - (previous[0] if previous else 0)
+            self._conn.execute("commit")
+
+            if self.total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _evict(self, target_bytes: int):
+        evicted = 0
+        cursor = self._conn.execute("select key, size from embeddings order by last_used")
+        doomed: List[str] = []
+        for key, size in cursor:
+            if self.total_bytes <= target_bytes:
+                break
+            doomed.append(key)
+            self.total_bytes -= size
+            evicted += 1
+        cursor.close()
+
+        self._conn.execute("begin")
+        for start in range(0, len(doomed), _LOOKUP_BATCH):
+            batch = doomed[start:start + _LOOKUP_BATCH]
+            self._conn.execute(f"delete from embeddings where key in ({','.join('?' * len(batch))})", batch)
+        self._conn.execute("commit")
+
+        if evicted:
+            print(f"🧹 Evicted {evicted} cached embeddings ({self.total_bytes} bytes remain)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,289 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Mapping
+
+import openai
+
+# Default OpenAI embedding dimensions for text-embedding-3-small
+EMBEDDING_DIMENSIONS = 1536
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+class EmbeddingError(Exception):
+    """Raised when an embedding request cannot be completed."""
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse an OpenAI rate-limit reset header (e.g. "1s", "6m0s", "20ms") into seconds."""
+    if not value:
+        return None
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Token bucket that refills continuously up to a per-minute capacity.
+
+    State is guarded by a threading lock rather than an asyncio one, so one
+    bucket can be shared by coroutines running on different event loops and
+    threads. acquire() reserves its tokens straight away, letting the level
+    go negative, and sleeps until the refill has covered the deficit; later
+    callers queue behind that reservation.
+    """
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = float(capacity_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        """Wait until amount tokens are available and take them."""
+        # A request larger than the whole bucket still has to go out eventually
+        amount = min(float(amount), self.capacity)
+
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            await asyncio.sleep(wait)
+
+    def observe(self, limit: Optional[float], remaining: Optional[float]):
+        """Align the bucket with the limit and remaining quota reported by the server."""
+        with self._lock:
+            self._refill()
+            if limit:
+                self.capacity = limit
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+
+    def headroom(self) -> float:
+        """Fraction of the bucket currently available."""
+        with self._lock:
+            self._refill()
+            return max(0.0, self.tokens) / self.capacity if self.capacity else 0.0
+
+
+class EmbeddingScheduler:
+    """Schedules embedding requests within OpenAI request and token rate limits.
+
+    Requests draw from two token buckets (requests/min and tokens/min) that are
+    kept in sync with the x-ratelimit-* response headers. Rate-limited and
+    transient failures are retried with exponential backoff and full jitter.
+    Concurrency grows additively while both buckets have headroom and halves
+    on every 429.
+
+    One scheduler is meant to be shared by every ingest in the process, so
+    the quota and the limits learned from headers apply to all of them. Its
+    state is guarded by a threading lock, so ingests running under separate
+    asyncio.run() calls on different threads can use it at the same time.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        requests_per_minute: float = 3000,
+        tokens_per_minute: float = 1000000,
+        max_concurrency: int = 8,
+        initial_concurrency: int = 2,
+        max_retries: int = 6,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        dimensions: int = EMBEDDING_DIMENSIONS
+    ):
+        # The scheduler owns retries, so disable the client's built-in ones
+        self.client = client.with_options(max_retries=0) if hasattr(client, "with_options") else client
+        self.model = model
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.concurrency = min(initial_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dimensions = dimensions
+
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    async def _acquire_slot(self):
+        # Callers may be on different event loops, so poll instead of waiting
+        # on an asyncio primitive bound to one of them
+        delay = 0.005
+        while True:
+            with self._lock:
+                if self.in_flight < self.concurrency:
+                    self.in_flight += 1
+                    return
+            await asyncio.sleep(delay)
+            delay = min(0.1, delay * 2)
+
+    async def _release_slot(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _observe_headers(self, headers: Optional[Mapping[str, str]]):
+        if not headers:
+            return
+
+        self.request_bucket.observe(
+            _header_float(headers, "x-ratelimit-limit-requests"),
+            _header_float(headers, "x-ratelimit-remaining-requests")
+        )
+        self.token_bucket.observe(
+            _header_float(headers, "x-ratelimit-limit-tokens"),
+            _header_float(headers, "x-ratelimit-remaining-tokens")
+        )
+
+    def _retry_after(self, headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        if not headers:
+            return None
+
+        retry_after_ms = _header_float(headers, "retry-after-ms")
+        if retry_after_ms is not None:
+            return retry_after_ms / 1000
+        retry_after = _header_float(headers, "retry-after")
+        if retry_after is not None:
+            return retry_after
+
+        # Fall back to whichever quota resets last
+        resets = [
+            parse_reset_duration(headers.get("x-ratelimit-reset-requests")),
+            parse_reset_duration(headers.get("x-ratelimit-reset-tokens"))
+        ]
+        resets = [reset for reset in resets if reset is not None]
+        return max(resets) if resets else None
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with full jitter, never shorter than retry_after."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _on_success(self):
+        # Additive increase while both quotas have room to spare
+        if self.request_bucket.headroom() > 0.2 and self.token_bucket.headroom() > 0.2:
+            with self._lock:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def _on_rate_limited(self):
+        # Multiplicative decrease
+        with self._lock:
+            self.rate_limited += 1
+            self.concurrency = max(1, self.concurrency // 2)
+
+    def _count(self, stats: Optional[Dict[str, Any]], name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+        if stats is not None:
+            key = f"embedding_{name}"
+            stats[key] = stats.get(key, 0) + 1
+
+    def _validate(self, vectors: List[List[float]], expected: int):
+        if len(vectors) != expected:
+            raise EmbeddingError(f"Expected {expected} embeddings, got {len(vectors)}")
+        for vector in vectors:
+            if len(vector) != self.dimensions:
+                raise EmbeddingError(f"Expected {self.dimensions}-dim embedding, got {len(vector)}")
+            if not any(vector):
+                raise EmbeddingError("Received an all-zero embedding")
+
+    async def embed(self, texts: List[str], token_count: int, stats: Optional[Dict[str, Any]] = None) -> List[List[float]]:
+        """Embed texts in one request, waiting for quota and retrying as needed.
+
+        Args:
+            texts: Texts to embed in a single request
+            token_count: Total tokens across texts, charged to the token bucket
+            stats: Optional counters dict; embedding_requests and
+                embedding_retries are incremented for this caller
+
+        Returns:
+            Embedding vectors in the same order as texts
+
+        Raises:
+            EmbeddingError: If the request fails permanently or exhausts its retries
+        """
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(token_count)
+
+            headers = None
+            retry_after = None
+            await self._acquire_slot()
+            try:
+                self._count(stats, "requests")
+                raw = await self.client.embeddings.with_raw_response.create(
+                    model=self.model,
+                    input=texts
+                )
+                headers = raw.headers
+                response = raw.parse()
+                ordered = sorted(response.data, key=lambda item: item.index)
+                vectors = [item.embedding for item in ordered]
+                self._validate(vectors, len(texts))
+
+                self._observe_headers(headers)
+                self._on_success()
+                return vectors
+
+            except openai.RateLimitError as e:
+                last_error = e
+                headers = e.response.headers
+                self._observe_headers(headers)
+                self._on_rate_limited()
+                retry_after = self._retry_after(headers)
+                print(f"⚠️ Embedding request rate limited (concurrency now {self.concurrency})")
+            except (openai.APIConnectionError, openai.InternalServerError, EmbeddingError) as e:
+                last_error = e
+                print(f"⚠️ Embedding request failed: {e}")
+            except openai.APIStatusError as e:
+                # Other 4xx errors (bad input, auth) won't succeed on retry
+                raise EmbeddingError(f"Embedding request rejected: {e}") from e
+            finally:
+                await self._release_slot()
+
+            if attempt < self.max_retries:
+                self._count(stats, "retries")
+                await asyncio.sleep(self.backoff_delay(attempt, retry_after))
+
+        raise EmbeddingError(f"Embedding request failed after {self.max_retries + 1} attempts: {last_error}")
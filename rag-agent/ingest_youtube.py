@@ -1,13 +1,30 @@
 import os
 import asyncio
-from typing import List, Dict, Any
+import threading
+import argparse
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Optional, Set
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+import tiktoken
 from openai import AsyncOpenAI
+from postgrest.types import ReturnMethod
 from supabase import create_client, Client
 
+from embedding_scheduler import EmbeddingScheduler, EmbeddingError
+from embedding_cache import EmbeddingCache, make_cache_key
+from embedding_batch import (
+    BatchJobStore,
+    BatchInputWriter,
+    TERMINAL_STATUSES,
+    submit_batch_file,
+    download_file,
+    iter_batch_results,
+)
+from transcript_normalizer import iter_normalized_entries, parse_steps
+
 load_dotenv()
 
 # Initialize OpenAI and Supabase clients
@@ -17,6 +34,66 @@ supabase: Client = create_client(
     os.getenv("SUPABASE_SERVICE_KEY")
 )
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Upper bounds for a single embeddings.create request (OpenAI allows 2048 inputs
+# and 300k tokens per request; stay well below both by default)
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "256"))
+
+# Starting quota for the embedding scheduler; refined from x-ratelimit-* headers
+EMBEDDING_RPM_LIMIT = float(os.getenv("EMBEDDING_RPM_LIMIT", "3000"))
+EMBEDDING_TPM_LIMIT = float(os.getenv("EMBEDDING_TPM_LIMIT", "1000000"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+
+# Chunking strategy: "tokens" packs whole cues up to a token budget and time
+# window; "entries" is the legacy fixed group of 3 cues
+CHUNK_STRATEGY = os.getenv("CHUNK_STRATEGY", "tokens")
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+CHUNK_MAX_SECONDS = float(os.getenv("CHUNK_MAX_SECONDS", "120"))
+
+# Caption noise stripped before chunking and embedding (tags, sounds, fillers,
+# repeats); "none" embeds the caption text as-is
+TRANSCRIPT_NORMALIZATION = parse_steps(os.getenv("TRANSCRIPT_NORMALIZATION", "tags,sounds,fillers,repeats"))
+
+# Local content-addressed embedding cache; set EMBEDDING_CACHE_PATH to an empty
+# string to disable it
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "embeddings.sqlite3")
+)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Bounds on the streaming ingest pipeline: embedding batches in flight and
+# embedded batches waiting to be written. Together with the batch limits above
+# these cap peak memory regardless of video length.
+INGEST_MAX_IN_FLIGHT = int(os.getenv("INGEST_MAX_IN_FLIGHT", "4"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+
+# Rows per bulk upsert into youtube_transcript_pages (each row carries a
+# 1536-dim vector, so keep request bodies to a few MB)
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+
+# PostgREST returns at most 1000 rows per request by default
+SELECT_PAGE_SIZE = 1000
+
+# Offline backfills through the OpenAI Batch API: where job files and state
+# live, and how often to poll submitted batches
+BACKFILL_DIR = os.getenv(
+    "BACKFILL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "backfill")
+)
+BACKFILL_POLL_SECONDS = float(os.getenv("BACKFILL_POLL_SECONDS", "60"))
+# Transcripts read from youtube_transcripts_cache per request while preparing
+BACKFILL_PAGE_SIZE = 50
+
+_encoding = None
+_embedding_cache = None
+_embedding_scheduler = None
+_embedding_scheduler_lock = threading.Lock()
+
 @dataclass
 class ProcessedChunk:
     video_id: str
@@ -26,43 +103,153 @@ class ProcessedChunk:
     summary: str
     content: str
     metadata: Dict[str, Any]
-    embedding: List[float]
+    embedding: array  # float32 ('f') buffer, ~6 KB per chunk instead of ~50 KB of floats
 
-def chunk_vtt_transcript(transcript_data: List[Dict], entries_per_chunk: int = 3) -> List[Dict]:
-    """Chunk VTT transcript data into semantic groups.
+def _build_chunk(chunk_entries: List[Dict]) -> Dict:
+    """Combine consecutive transcript entries into a single chunk dict."""
+    # Combine text from all entries in this chunk
+    combined_text = ' '.join(entry['text'] for entry in chunk_entries)
+
+    # Get start time from first entry, end time from last entry
+    start_time = chunk_entries[0]['start']
+    end_time = chunk_entries[-1]['end']
+    start_seconds = chunk_entries[0]['start_seconds']
+    end_seconds = chunk_entries[-1].get('end_seconds', start_seconds + 15)  # fallback
+
+    return {
+        'text': combined_text,
+        'start_time': start_time,
+        'end_time': end_time,
+        'start_seconds': start_seconds,
+        'end_seconds': end_seconds,
+        'duration': end_seconds - start_seconds,
+        'entry_count': len(chunk_entries)
+    }
+
+def iter_vtt_chunks(transcript_data: Iterable[Dict], entries_per_chunk: int = 3) -> Iterator[Dict]:
+    """Lazily chunk VTT transcript data, holding at most one chunk's entries.
 
     Args:
-        transcript_data: List of transcript entries with start, end, text, start_seconds
+        transcript_data: Iterable of transcript entries with start, end, text, start_seconds
         entries_per_chunk: Number of transcript entries to group together (default: 3)
 
-    Returns:
-        List of chunks with combined text and metadata
+    Yields:
+        Chunks with combined text and metadata
     """
-    chunks = []
+    chunk_entries = []
+
+    for entry in transcript_data:
+        chunk_entries.append(entry)
+        if len(chunk_entries) == entries_per_chunk:
+            yield _build_chunk(chunk_entries)
+            chunk_entries = []
+
+    if chunk_entries:
+        yield _build_chunk(chunk_entries)
+
+def iter_token_chunks(
+    transcript_data: Iterable[Dict],
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    max_seconds: float = CHUNK_MAX_SECONDS
+) -> Iterator[Dict]:
+    """Lazily chunk transcript entries by token budget and time window.
+
+    Whole cues are packed into a chunk until adding the next one would exceed
+    max_tokens or stretch the chunk past max_seconds. Cues are never split, so
+    start_seconds/end_seconds always fall on cue boundaries; a single cue larger
+    than the budget becomes a chunk of its own.
+
+    Args:
+        transcript_data: Iterable of transcript entries with start, end, text, start_seconds
+        max_tokens: Token budget per chunk
+        overlap_tokens: Trailing cues (up to this many tokens) repeated at the
+            start of the next chunk for context
+        max_seconds: Maximum time span of a chunk
+
+    Yields:
+        Chunks with combined text and metadata, plus their token_count
+    """
+    chunk_entries: List[Tuple[Dict, int]] = []
+    chunk_tokens = 0
+
+    def emit():
+        chunk = _build_chunk([entry for entry, _ in chunk_entries])
+        chunk['token_count'] = chunk_tokens
+        return chunk
+
+    for entry in transcript_data:
+        tokens = entry.get('token_count') or count_tokens(entry['text'])
 
-    for i in range(0, len(transcript_data), entries_per_chunk):
-        chunk_entries = transcript_data[i:i + entries_per_chunk]
+        if chunk_entries:
+            start_seconds = chunk_entries[0][0]['start_seconds']
+            end_seconds = entry.get('end_seconds', entry['start_seconds'])
+            if chunk_tokens + tokens > max_tokens or end_seconds - start_seconds > max_seconds:
+                yield emit()
 
-        # Combine text from all entries in this chunk
-        combined_text = ' '.join(entry['text'] for entry in chunk_entries)
+                # Carry whole trailing cues forward as overlap
+                carried: List[Tuple[Dict, int]] = []
+                carried_tokens = 0
+                for previous, previous_tokens in reversed(chunk_entries):
+                    if carried_tokens + previous_tokens > overlap_tokens:
+                        break
+                    carried.insert(0, (previous, previous_tokens))
+                    carried_tokens += previous_tokens
 
-        # Get start time from first entry, end time from last entry
-        start_time = chunk_entries[0]['start']
-        end_time = chunk_entries[-1]['end']
-        start_seconds = chunk_entries[0]['start_seconds']
-        end_seconds = chunk_entries[-1].get('end_seconds', start_seconds + 15)  # fallback
+                # Drop the overlap if it would leave no room for the new cue
+                if carried and (
+                    carried_tokens + tokens > max_tokens
+                    or end_seconds - carried[0][0]['start_seconds'] > max_seconds
+                ):
+                    carried, carried_tokens = [], 0
 
-        chunks.append({
-            'text': combined_text,
-            'start_time': start_time,
-            'end_time': end_time,
-            'start_seconds': start_seconds,
-            'end_seconds': end_seconds,
-            'duration': end_seconds - start_seconds,
-            'entry_count': len(chunk_entries)
-        })
+                chunk_entries, chunk_tokens = carried, carried_tokens
 
-    return chunks
+        chunk_entries.append((entry, tokens))
+        chunk_tokens += tokens
+
+    if chunk_entries:
+        yield emit()
+
+def chunker_id() -> str:
+    """Identify the active chunking configuration, stored in chunk metadata."""
+    if CHUNK_STRATEGY == "entries":
+        chunker = "entries:3"
+    else:
+        chunker = f"tokens:{CHUNK_MAX_TOKENS}/{CHUNK_OVERLAP_TOKENS}/{CHUNK_MAX_SECONDS:g}s"
+    if TRANSCRIPT_NORMALIZATION:
+        chunker += f"+norm:{','.join(TRANSCRIPT_NORMALIZATION)}"
+    return chunker
+
+def iter_transcript_chunks(transcript_data: Iterable[Dict], stats: Optional[Dict] = None) -> Iterator[Dict]:
+    """Normalize and chunk a transcript with the configured settings.
+
+    Args:
+        transcript_data: Iterable of transcript entries from VTT parsing
+        stats: Optional dict that receives the normalization token counters
+
+    Yields:
+        Chunks of normalized text
+    """
+    if TRANSCRIPT_NORMALIZATION or stats is not None:
+        # Token counts are reused by the token chunker, so only skip them when nothing needs them
+        counter = count_tokens if stats is not None or CHUNK_STRATEGY != "entries" else None
+        transcript_data = iter_normalized_entries(transcript_data, TRANSCRIPT_NORMALIZATION, stats, counter)
+    if CHUNK_STRATEGY == "entries":
+        return iter_vtt_chunks(transcript_data)
+    return iter_token_chunks(transcript_data, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, CHUNK_MAX_SECONDS)
+
+def chunk_vtt_transcript(transcript_data: List[Dict], entries_per_chunk: int = 3) -> List[Dict]:
+    """Chunk VTT transcript data into semantic groups.
+
+    Args:
+        transcript_data: List of transcript entries with start, end, text, start_seconds
+        entries_per_chunk: Number of transcript entries to group together (default: 3)
+
+    Returns:
+        List of chunks with combined text and metadata
+    """
+    return list(iter_vtt_chunks(transcript_data, entries_per_chunk))
 
 def create_title_and_summary(video_title: str, chunk_data: Dict) -> Dict[str, str]:
     """Create title and summary using template approach (no LLM needed).
@@ -90,20 +277,179 @@ def create_title_and_summary(video_title: str, chunk_data: Dict) -> Dict[str, st
         "summary": summary
     }
 
+def count_tokens(text: str) -> int:
+    """Count tokens in text using the embedding model's tokenizer.
+
+    Falls back to a ~4 characters per token estimate when the tokenizer data
+    can't be loaded (tiktoken downloads it on first use).
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"⚠️ tiktoken unavailable, estimating token counts: {e}")
+            _encoding = False
+    if _encoding is False:
+        return max(1, len(text) // 4)
+    return len(_encoding.encode(text))
+
+def batch_for_embedding(
+    chunks: Iterable[Dict],
+    max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    max_items: int = EMBEDDING_BATCH_MAX_ITEMS,
+    skip_chunk_numbers: Optional[Set[int]] = None
+) -> Iterator[List[Tuple[int, Dict]]]:
+    """Group chunks into embedding requests bounded by token and item count.
+
+    Args:
+        chunks: Chunk dicts as returned by chunk_vtt_transcript
+        max_tokens: Maximum total tokens per request
+        max_items: Maximum number of texts per request
+        skip_chunk_numbers: Chunk numbers to leave out (e.g. already stored)
+
+    Yields:
+        Lists of (chunk_number, chunk_data) tuples, in chunk order
+    """
+    batch = []
+    batch_tokens = 0
+
+    for chunk_number, chunk_data in enumerate(chunks):
+        if skip_chunk_numbers and chunk_number in skip_chunk_numbers:
+            continue
+
+        # The token chunker already counted each chunk
+        tokens = chunk_data.get('token_count') or count_tokens(chunk_data['text'])
+
+        # A single oversized chunk still gets its own request
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+
+        batch.append((chunk_number, chunk_data))
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+async def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Get embedding vectors for several texts in a single OpenAI request.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        Embedding vectors in the same order as texts
+    """
+    response = await openai_client.embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=texts
+    )
+
+    # The API tags each vector with the index of its input
+    ordered = sorted(response.data, key=lambda item: item.index)
+    if len(ordered) != len(texts):
+        raise ValueError(f"Expected {len(texts)} embeddings, got {len(ordered)}")
+
+    return [item.embedding for item in ordered]
+
 async def get_embedding(text: str) -> List[float]:
-    """Get embedding vector from OpenAI."""
-    try:
-        response = await openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"Error getting embedding: {e}")
-        return [0] * 1536  # Return zero vector on error
+    """Get embedding vector from OpenAI.
 
-async def process_chunk(chunk_data: Dict, chunk_number: int, video_id: str, video_url: str, video_title: str) -> ProcessedChunk:
-    """Process a single chunk of VTT transcript data.
+    Errors are raised rather than papered over with a zero vector, which
+    would otherwise be stored and silently corrupt similarity search.
+    """
+    response = await openai_client.embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=text
+    )
+    return response.data[0].embedding
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the shared embedding cache, opening it on first use."""
+    global _embedding_cache
+    if _embedding_cache is None and EMBEDDING_CACHE_PATH:
+        try:
+            _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES)
+        except Exception as e:
+            print(f"⚠️ Embedding cache unavailable: {e}")
+            return None
+    return _embedding_cache
+
+async def embed_texts(
+    texts: List[str],
+    scheduler: Optional[EmbeddingScheduler] = None,
+    cache: Optional[EmbeddingCache] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    token_counts: Optional[List[Optional[int]]] = None
+) -> List[Iterable[float]]:
+    """Embed texts, serving repeats from the cache and requesting only the rest.
+
+    Args:
+        texts: Texts to embed
+        scheduler: Optional scheduler that applies rate limits and retries
+        cache: Optional embedding cache consulted before calling OpenAI
+        stats: Optional counters dict; cache_hits, cache_misses and the
+            scheduler's embedding_requests and embedding_retries are incremented
+        token_counts: Optional token count per text, already known from
+            chunking; texts without one are counted for the scheduler
+
+    Returns:
+        Embedding vectors in the same order as texts
+    """
+    vectors: List[Optional[Iterable[float]]] = [None] * len(texts)
+    keys = [make_cache_key(EMBEDDING_MODEL, text) for text in texts] if cache is not None else []
+
+    if cache is not None:
+        cached = cache.get_many(keys)
+        for i, key in enumerate(keys):
+            vectors[i] = cached.get(key)
+
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if stats is not None:
+        stats["cache_hits"] = stats.get("cache_hits", 0) + len(texts) - len(missing)
+        stats["cache_misses"] = stats.get("cache_misses", 0) + len(missing)
+
+    if missing:
+        # Identical texts within the batch only need to be embedded once
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        if scheduler:
+            known = {texts[i]: token_counts[i] for i in missing if token_counts and token_counts[i]}
+            tokens = sum(known.get(text) or count_tokens(text) for text in unique_texts)
+            fetched = await scheduler.embed(unique_texts, tokens, stats)
+        else:
+            fetched = await get_embeddings(unique_texts)
+        by_text = dict(zip(unique_texts, fetched))
+
+        for i in missing:
+            vectors[i] = by_text[texts[i]]
+        if cache is not None:
+            cache.put_many({keys[i]: vectors[i] for i in missing})
+
+    return vectors
+
+def get_embedding_scheduler() -> EmbeddingScheduler:
+    """Return the process-wide rate-limit-aware scheduler, creating it on first use.
+
+    Every ingest shares it, including ones run concurrently on other threads
+    and event loops, so together they stay within one RPM/TPM quota.
+    """
+    global _embedding_scheduler
+    with _embedding_scheduler_lock:
+        if _embedding_scheduler is None:
+            _embedding_scheduler = EmbeddingScheduler(
+                openai_client,
+                EMBEDDING_MODEL,
+                requests_per_minute=EMBEDDING_RPM_LIMIT,
+                tokens_per_minute=EMBEDDING_TPM_LIMIT,
+                max_concurrency=EMBEDDING_MAX_CONCURRENCY,
+                max_retries=EMBEDDING_MAX_RETRIES
+            )
+        return _embedding_scheduler
+
+def build_processed_chunk(chunk_data: Dict, chunk_number: int, video_id: str, video_url: str, video_title: str, embedding: Iterable[float]) -> ProcessedChunk:
+    """Build a ProcessedChunk from chunk data and its embedding.
 
     Args:
         chunk_data: Dict with text, start_time, end_time, etc.
@@ -111,6 +457,7 @@ async def process_chunk(chunk_data: Dict, chunk_number: int, video_id: str, vide
         video_id: YouTube video ID
         video_url: Full YouTube URL
         video_title: Video title
+        embedding: Embedding vector for the chunk text
 
     Returns:
         ProcessedChunk ready for database insertion
@@ -118,9 +465,6 @@ async def process_chunk(chunk_data: Dict, chunk_number: int, video_id: str, vide
     # Get title and summary using template approach
     extracted = create_title_and_summary(video_title, chunk_data)
 
-    # Get embedding for the text content
-    embedding = await get_embedding(chunk_data['text'])
-
     # Create metadata with YouTube-specific information
     metadata = {
         "source": video_url,
@@ -132,6 +476,7 @@ async def process_chunk(chunk_data: Dict, chunk_number: int, video_id: str, vide
         "duration": chunk_data['duration'],
         "entry_count": chunk_data['entry_count'],
         "chunk_size": len(chunk_data['text']),
+        "chunker": chunker_id(),
         "processed_at": datetime.now(timezone.utc).isoformat()
     }
 
@@ -143,22 +488,82 @@ async def process_chunk(chunk_data: Dict, chunk_number: int, video_id: str, vide
         summary=extracted['summary'],
         content=chunk_data['text'],
         metadata=metadata,
-        embedding=embedding
+        embedding=array('f', embedding)
     )
 
+async def process_chunk(chunk_data: Dict, chunk_number: int, video_id: str, video_url: str, video_title: str) -> ProcessedChunk:
+    """Process a single chunk of VTT transcript data.
+
+    Args:
+        chunk_data: Dict with text, start_time, end_time, etc.
+        chunk_number: Sequential chunk number
+        video_id: YouTube video ID
+        video_url: Full YouTube URL
+        video_title: Video title
+
+    Returns:
+        ProcessedChunk ready for database insertion
+    """
+    embedding = await get_embedding(chunk_data['text'])
+    return build_processed_chunk(chunk_data, chunk_number, video_id, video_url, video_title, embedding)
+
+async def process_chunk_batch(
+    batch: List[Tuple[int, Dict]],
+    video_id: str,
+    video_url: str,
+    video_title: str,
+    scheduler: Optional[EmbeddingScheduler] = None,
+    cache: Optional[EmbeddingCache] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> List[ProcessedChunk]:
+    """Process a batch of chunks with at most one embeddings request.
+
+    Args:
+        batch: List of (chunk_number, chunk_data) tuples from batch_for_embedding
+        video_id: YouTube video ID
+        video_url: Full YouTube URL
+        video_title: Video title
+        scheduler: Optional scheduler that applies rate limits and retries
+        cache: Optional embedding cache consulted before calling OpenAI
+        stats: Optional counters dict for cache hits and misses
+
+    Returns:
+        ProcessedChunks in the same order as batch
+    """
+    texts = [chunk_data['text'] for _, chunk_data in batch]
+    token_counts = [chunk_data.get('token_count') for _, chunk_data in batch]
+    embeddings = await embed_texts(texts, scheduler, cache, stats, token_counts)
+
+    return [
+        build_processed_chunk(chunk_data, chunk_number, video_id, video_url, video_title, embedding)
+        for (chunk_number, chunk_data), embedding in zip(batch, embeddings)
+    ]
+
+def format_vector(embedding: Iterable[float]) -> str:
+    """Format an embedding as a pgvector literal.
+
+    Nine significant digits round-trip float32 exactly and keep request bodies
+    far smaller than JSON-encoded Python floats.
+    """
+    return '[' + ','.join(f'{value:.9g}' for value in embedding) + ']'
+
+def chunk_to_row(chunk: ProcessedChunk) -> Dict[str, Any]:
+    """Convert a processed chunk into a youtube_transcript_pages row."""
+    return {
+        "video_id": chunk.video_id,
+        "url": chunk.url,
+        "chunk_number": chunk.chunk_number,
+        "title": chunk.title,
+        "summary": chunk.summary,
+        "content": chunk.content,
+        "metadata": chunk.metadata,
+        "embedding": format_vector(chunk.embedding)
+    }
+
 async def insert_chunk(chunk: ProcessedChunk):
     """Insert a processed chunk into Supabase youtube_transcript_pages table."""
     try:
-        data = {
-            "video_id": chunk.video_id,
-            "url": chunk.url,
-            "chunk_number": chunk.chunk_number,
-            "title": chunk.title,
-            "summary": chunk.summary,
-            "content": chunk.content,
-            "metadata": chunk.metadata,
-            "embedding": chunk.embedding
-        }
+        data = chunk_to_row(chunk)
         print(f"Attempting to Insert chunk {chunk.chunk_number} for video {chunk.video_id}")
 
         result = supabase.table("youtube_transcript_pages").insert(data).execute()
@@ -168,84 +573,632 @@ async def insert_chunk(chunk: ProcessedChunk):
         print(f"Error inserting chunk: {e}")
         return None
 
-async def process_and_store_transcript(video_id: str, video_url: str, video_title: str, transcript_data: List[Dict]):
-    """Process a YouTube transcript and store its chunks in batches to avoid rate limits.
+async def upsert_chunks(chunks: List[ProcessedChunk]) -> Dict[str, Any]:
+    """Write a batch of processed chunks to Supabase in a single upsert.
+
+    Rows conflict on the unique (video_id, chunk_number) constraint, so
+    retrying a batch after a partial failure never creates duplicates.
+
+    Args:
+        chunks: Processed chunks to write
+
+    Returns:
+        Dict with success status, row count, chunk range and optional error
+    """
+    report = {
+        "success": False,
+        "count": 0,
+        "first_chunk": chunks[0].chunk_number if chunks else None,
+        "last_chunk": chunks[-1].chunk_number if chunks else None
+    }
+
+    if not chunks:
+        report["success"] = True
+        return report
+
+    try:
+        # Never persist a placeholder vector
+        for chunk in chunks:
+            if not chunk.embedding or not any(chunk.embedding):
+                raise EmbeddingError(f"Chunk {chunk.chunk_number} has no embedding")
+
+        rows = [chunk_to_row(chunk) for chunk in chunks]
+
+        # Don't ask PostgREST to echo the rows (and their vectors) back
+        supabase.table("youtube_transcript_pages") \
+            .upsert(rows, on_conflict="video_id,chunk_number", returning=ReturnMethod.minimal) \
+            .execute()
+
+        report["success"] = True
+        report["count"] = len(rows)
+        print(f"Upserted chunks {report['first_chunk']}-{report['last_chunk']} for video {chunks[0].video_id}")
+    except Exception as e:
+        report["error"] = str(e)
+        print(f"❌ Error upserting chunks {report['first_chunk']}-{report['last_chunk']}: {e}")
+
+    return report
+
+def new_ingest_summary(video_id: str) -> Dict[str, Any]:
+    """Create an empty ingest summary with all counters at zero."""
+    return {
+        "video_id": video_id,
+        "chunks_total": 0,
+        "chunks_stored": 0,
+        "batches_ok": 0,
+        "batches_failed": 0,
+        "embedding_requests": 0,
+        "embedding_retries": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "tokens_before": 0,
+        "tokens_after": 0,
+        "tokens_saved": 0,
+        "entries_dropped": 0,
+        "failed_batches": []
+    }
+
+def count_expected_chunks(transcript_data: Iterable[Dict]) -> int:
+    """Count the chunks ingestion would produce for a transcript, without embedding."""
+    return sum(1 for _ in iter_transcript_chunks(transcript_data))
+
+def get_existing_chunk_numbers(
+    video_id: str,
+    missing_embedding_only: bool = False,
+    chunker: Optional[str] = None
+) -> Set[int]:
+    """Fetch the chunk numbers already stored for a video.
+
+    Args:
+        video_id: YouTube video ID
+        missing_embedding_only: Only return rows whose embedding is NULL
+        chunker: Only return rows produced by this chunking configuration
+
+    Returns:
+        Set of stored chunk numbers
+    """
+    chunk_numbers = set()
+    start = 0
+
+    while True:
+        query = supabase.table("youtube_transcript_pages") \
+            .select("chunk_number") \
+            .eq("video_id", video_id)
+        if missing_embedding_only:
+            query = query.is_("embedding", "null")
+        if chunker:
+            query = query.eq("metadata->>chunker", chunker)
+
+        result = query.order("chunk_number") \
+            .range(start, start + SELECT_PAGE_SIZE - 1) \
+            .execute()
+
+        rows = result.data or []
+        chunk_numbers.update(row["chunk_number"] for row in rows)
+        if len(rows) < SELECT_PAGE_SIZE:
+            return chunk_numbers
+        start += SELECT_PAGE_SIZE
+
+def delete_chunk_numbers(video_id: str, chunk_numbers: Iterable[int]) -> int:
+    """Delete specific chunks of a video.
+
+    Returns:
+        Number of rows deleted
+    """
+    chunk_numbers = sorted(chunk_numbers)
+    deleted = 0
+
+    for start in range(0, len(chunk_numbers), SELECT_PAGE_SIZE):
+        result = supabase.table("youtube_transcript_pages") \
+            .delete() \
+            .eq("video_id", video_id) \
+            .in_("chunk_number", chunk_numbers[start:start + SELECT_PAGE_SIZE]) \
+            .execute()
+        deleted += len(result.data) if result.data else 0
+
+    return deleted
+
+def get_ingest_record(video_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch the language, chunker and expected chunk count a video was indexed with.
+
+    Returns:
+        The youtube_transcript_ingests row, or None if the video was never
+        ingested (or only before the table existed)
+    """
+    result = supabase.table("youtube_transcript_ingests") \
+        .select("video_id, language_code, chunker, chunks_expected") \
+        .eq("video_id", video_id) \
+        .execute()
+    return result.data[0] if result.data else None
+
+def store_ingest_record(video_id: str, language_code: str, expected: int):
+    """Record the language and expected chunk count of the current chunker for a video."""
+    supabase.table("youtube_transcript_ingests") \
+        .upsert({
+            "video_id": video_id,
+            "language_code": language_code,
+            "chunker": chunker_id(),
+            "chunks_expected": expected,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }, on_conflict="video_id", returning=ReturnMethod.minimal) \
+        .execute()
+
+def get_cached_transcript(video_id: str, language_code: str) -> Optional[Dict[str, Any]]:
+    """Fetch one language's row from youtube_transcripts_cache.
+
+    Returns:
+        Dict with video_id, url, title, language_code and transcript_data, or None
+    """
+    result = supabase.table("youtube_transcripts_cache") \
+        .select("video_id, url, title, language_code, transcript_data") \
+        .eq("video_id", video_id) \
+        .eq("language_code", language_code) \
+        .execute()
+    return result.data[0] if result.data else None
+
+def reconcile_stored_chunks(
+    video_id: str,
+    expected: int,
+    language_code: str,
+    repair: bool = False
+) -> Tuple[Set[int], int]:
+    """Find the chunks of a video the current chunker can keep and delete the rest.
+
+    Rows from another chunking configuration (including legacy rows with no
+    chunker in their metadata), from another language and beyond the expected
+    range would be retrieved next to the new chunks, so they are removed
+    before anything is written. The video's ingest record is then updated to
+    this language and expected count.
+
+    Args:
+        video_id: YouTube video ID
+        expected: Number of chunks the current chunker produces for the transcript
+        language_code: Caption language of the transcript being ingested
+        repair: Also treat rows stored without an embedding as missing
+
+    Returns:
+        Tuple of (chunk numbers to keep, number of rows deleted)
+    """
+    record = get_ingest_record(video_id)
+    existing = set()
+    # Chunks are keyed by video, so another language's chunks are never kept
+    if record is None or record["language_code"] == language_code:
+        existing = {number for number in get_existing_chunk_numbers(video_id, chunker=chunker_id()) if number < expected}
+
+    orphans_deleted = delete_chunk_numbers(video_id, get_existing_chunk_numbers(video_id) - existing)
+    if orphans_deleted:
+        print(f"🧹 Deleted {orphans_deleted} stale chunks for video {video_id}")
+    if repair:
+        existing -= get_existing_chunk_numbers(video_id, missing_embedding_only=True)
+
+    store_ingest_record(video_id, language_code, expected)
+    return existing, orphans_deleted
+
+async def resume_transcript_ingest(
+    video_id: str,
+    video_url: str,
+    video_title: str,
+    transcript_data: List[Dict],
+    language_code: str = "en",
+    repair: bool = False
+) -> Dict[str, Any]:
+    """Embed and store only the chunks a video is missing.
+
+    The expected chunk set is computed from the transcript and compared with
+    the chunk numbers already stored by the same chunker, so a crashed or
+    partially failed ingest can be finished without re-embedding what is
+    already there. Chunks from another chunking configuration, another
+    language or beyond the expected range are deleted first, and the expected
+    count is recorded for availability checks.
 
     Args:
         video_id: YouTube video ID
         video_url: Full YouTube URL
         video_title: Video title
         transcript_data: List of transcript entries from VTT parsing
+        language_code: Caption language of transcript_data
+        repair: Also re-embed rows stored without an embedding
+
+    Returns:
+        process_and_store_transcript summary plus expected/existing/missing counts
     """
+    expected = count_expected_chunks(transcript_data)
+    existing, orphans_deleted = reconcile_stored_chunks(video_id, expected, language_code, repair)
+
+    missing = expected - len(existing)
+    print(f"Video {video_id}: {len(existing)}/{expected} chunks stored, {missing} missing")
+
+    if missing:
+        summary = await process_and_store_transcript(
+            video_id, video_url, video_title, transcript_data, skip_chunk_numbers=existing
+        )
+    else:
+        summary = new_ingest_summary(video_id)
+
+    summary.update({
+        "chunks_expected": expected,
+        "chunks_existing": len(existing),
+        "chunks_missing": missing,
+        "orphans_deleted": orphans_deleted,
+        "complete": len(existing) + summary["chunks_stored"] >= expected
+    })
+    return summary
+
+async def process_and_store_transcript(
+    video_id: str,
+    video_url: str,
+    video_title: str,
+    transcript_data: Iterable[Dict],
+    skip_chunk_numbers: Optional[Set[int]] = None
+) -> Dict[str, Any]:
+    """Process a YouTube transcript and store its chunks as a streaming pipeline.
+
+    Chunks are generated lazily, embedded in bounded batches and written by a
+    single writer, so only a fixed number of batches is ever held in memory.
+
+    Args:
+        video_id: YouTube video ID
+        video_url: Full YouTube URL
+        video_title: Video title
+        transcript_data: Transcript entries from VTT parsing
+        skip_chunk_numbers: Chunk numbers already stored, which are not re-embedded
+
+    Returns:
+        Dict with chunk and batch counters, plus reports for failed batches
+    """
+    summary = new_ingest_summary(video_id)
+
+    def record(report: Dict[str, Any]):
+        if report["success"]:
+            summary["batches_ok"] += 1
+            summary["chunks_stored"] += report["count"]
+        else:
+            summary["batches_failed"] += 1
+            summary["failed_batches"].append(report)
+
     try:
-        # Split transcript into semantic chunks
-        chunks = chunk_vtt_transcript(transcript_data)
-        print(f"Processing {len(chunks)} chunks for video {video_id}")
-
-        # Process chunks in smaller batches to avoid overwhelming OpenAI API
-        batch_size = 50  # Process 50 chunks at a time
-        total_results = []
-        
-        for batch_start in range(0, len(chunks), batch_size):
-            batch_end = min(batch_start + batch_size, len(chunks))
-            batch_chunks = chunks[batch_start:batch_end]
-            
-            print(f"Processing batch {batch_start//batch_size + 1}/{(len(chunks) + batch_size - 1)//batch_size}: chunks {batch_start}-{batch_end-1}")
-            
+        print(f"Processing transcript for video {video_id}")
+
+        scheduler = get_embedding_scheduler()
+        cache = get_embedding_cache()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+        in_flight = asyncio.Semaphore(INGEST_MAX_IN_FLIGHT)
+        embed_tasks: List[asyncio.Task] = []
+
+        async def embed_batch(batch: List[Tuple[int, Dict]]):
             try:
-                # Process this batch of chunks in parallel
-                tasks = [
-                    process_chunk(chunk_data, batch_start + i, video_id, video_url, video_title)
-                    for i, chunk_data in enumerate(batch_chunks)
-                ]
-                processed_chunks = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Check for exceptions in processing
-                successful_chunks = []
-                for i, chunk in enumerate(processed_chunks):
-                    if isinstance(chunk, Exception):
-                        print(f"❌ Error processing chunk {batch_start + i}: {chunk}")
-                    else:
-                        successful_chunks.append(chunk)
-                
-                print(f"Successfully processed {len(successful_chunks)}/{len(batch_chunks)} chunks in batch")
-                
-                # Store successful chunks in parallel
-                if successful_chunks:
-                    insert_tasks = [insert_chunk(chunk) for chunk in successful_chunks]
-                    batch_results = await asyncio.gather(*insert_tasks, return_exceptions=True)
-                    
-                    # Check insertion results
-                    successful_inserts = 0
-                    for i, result in enumerate(batch_results):
-                        if isinstance(result, Exception):
-                            print(f"❌ Error inserting chunk: {result}")
-                        elif result is not None:
-                            successful_inserts += 1
-                    
-                    print(f"Successfully inserted {successful_inserts}/{len(successful_chunks)} chunks in batch")
-                    total_results.extend(batch_results)
-                
-                # Small delay between batches to be nice to APIs
-                if batch_end < len(chunks):
-                    await asyncio.sleep(1)
-                    
+                processed_chunks = await process_chunk_batch(batch, video_id, video_url, video_title, scheduler, cache, summary)
+                await queue.put((batch, processed_chunks, None))
             except Exception as e:
-                print(f"❌ Error processing batch {batch_start}-{batch_end-1}: {e}")
-                continue
+                await queue.put((batch, None, e))
+            finally:
+                in_flight.release()
+
+        async def produce():
+            # chunk -> embed: a new batch starts only when an in-flight slot frees up
+            try:
+                chunks = iter_transcript_chunks(transcript_data, stats=summary)
+                for batch in batch_for_embedding(chunks, EMBEDDING_BATCH_MAX_TOKENS, EMBEDDING_BATCH_MAX_ITEMS, skip_chunk_numbers):
+                    summary["chunks_total"] += len(batch)
+                    await in_flight.acquire()
+                    embed_tasks[:] = [task for task in embed_tasks if not task.done()]
+                    embed_tasks.append(asyncio.create_task(embed_batch(batch)))
+                await asyncio.gather(*embed_tasks)
+            finally:
+                await queue.put(None)
+
+        async def write():
+            # embed -> write: buffer up to one upsert's worth of rows
+            pending: List[ProcessedChunk] = []
+
+            async def flush(rows: List[ProcessedChunk]):
+                rows.sort(key=lambda chunk: chunk.chunk_number)
+                record(await upsert_chunks(rows))
+
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+
+                batch, processed_chunks, error = item
+                first_chunk = batch[0][0]
+                last_chunk = batch[-1][0]
+
+                if error:
+                    print(f"❌ Error processing batch {first_chunk}-{last_chunk}: {error}")
+                    record({
+                        "success": False,
+                        "count": 0,
+                        "first_chunk": first_chunk,
+                        "last_chunk": last_chunk,
+                        "error": str(error)
+                    })
+                    continue
+
+                print(f"Embedded chunks {first_chunk}-{last_chunk} for video {video_id}")
+                pending.extend(processed_chunks)
+                while len(pending) >= UPSERT_BATCH_SIZE:
+                    await flush(pending[:UPSERT_BATCH_SIZE])
+                    pending = pending[UPSERT_BATCH_SIZE:]
+
+            if pending:
+                await flush(pending)
+
+        stages = [asyncio.ensure_future(produce()), asyncio.ensure_future(write())]
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            # If a stage failed (e.g. bad transcript input halfway through), stop
+            # the other one and the batches still embedding, and collect their
+            # outcomes so nothing keeps running or fails unobserved
+            for task in stages + embed_tasks:
+                task.cancel()
+            await asyncio.gather(*stages, *embed_tasks, return_exceptions=True)
+
+        print(f"✅ Successfully stored {summary['chunks_stored']}/{summary['chunks_total']} chunks for video {video_id}")
+        print(f"   Embedding cache: {summary['cache_hits']} hits, {summary['cache_misses']} misses")
+        print(f"   Normalization saved {summary['tokens_saved']}/{summary['tokens_before']} tokens, dropped {summary['entries_dropped']} empty entries")
+        if summary["batches_failed"]:
+            print(f"⚠️ {summary['batches_failed']} batches failed for video {video_id}")
+        return summary
 
-        successful_results = [r for r in total_results if r is not None and not isinstance(r, Exception)]
-        print(f"✅ Successfully stored {len(successful_results)} total chunks for video {video_id}")
-        return successful_results
-        
     except Exception as e:
         print(f"❌ Critical error in process_and_store_transcript: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        summary["error"] = str(e)
+        return summary
+
+
 
+def iter_cached_transcripts(limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Page through youtube_transcripts_cache, one page of transcripts in memory at a time.
 
+    Videos cached in several languages are yielded once, using the
+    earliest-cached language; prepare_backfill switches to the language a
+    video is already indexed in.
 
+    Yields:
+        Dicts with video_id, url, title, language_code and transcript_data
+    """
+    start = 0
+    yielded = 0
+    last_video_id = None
+
+    while limit is None or yielded < limit:
+        result = supabase.table("youtube_transcripts_cache") \
+            .select("video_id, url, title, language_code, transcript_data") \
+            .order("video_id") \
+            .order("created_at") \
+            .range(start, start + BACKFILL_PAGE_SIZE - 1) \
+            .execute()
+
+        rows = result.data or []
+        for row in rows:
+            if limit is not None and yielded >= limit:
+                return
+            if row["video_id"] == last_video_id:
+                continue
+            last_video_id = row["video_id"]
+            yielded += 1
+            yield row
+        if len(rows) < BACKFILL_PAGE_SIZE:
+            return
+        start += BACKFILL_PAGE_SIZE
+
+def prepare_backfill(videos: Iterable[Dict[str, Any]], job_dir: str) -> Dict[str, Any]:
+    """Write batch input files for every chunk the given videos are missing.
+
+    Chunks already stored by the current chunker are skipped and stale rows
+    are deleted, exactly like resume_transcript_ingest, so a backfill can be
+    re-run safely.
+
+    Args:
+        videos: Dicts with video_id, url, title, transcript_data and optional
+            language_code (default "en")
+        job_dir: Directory for the job's input files and state
+
+    Returns:
+        Dict with video, request and chunk counts and the number of input files
+    """
+    store = BatchJobStore(job_dir)
+    writer = BatchInputWriter(store, EMBEDDING_MODEL)
+    summary = {"job_dir": job_dir, "videos": 0, "videos_complete": 0, "requests": 0, "chunks": 0, "files": 0}
+
+    try:
+        for video in videos:
+            video_id = video["video_id"]
+            summary["videos"] += 1
+            language_code = video.get("language_code", "en")
+
+            # Keep building on the language the video is already indexed in
+            record = get_ingest_record(video_id)
+            if record and record["language_code"] != language_code:
+                video = get_cached_transcript(video_id, record["language_code"]) or video
+                language_code = video.get("language_code", language_code)
+
+            existing, _ = reconcile_stored_chunks(video_id, count_expected_chunks(video["transcript_data"]), language_code)
+            chunks = iter_transcript_chunks(video["transcript_data"])
+
+            requests = 0
+            for batch in batch_for_embedding(chunks, EMBEDDING_BATCH_MAX_TOKENS, EMBEDDING_BATCH_MAX_ITEMS, existing):
+                payload = {
+                    "video_id": video_id,
+                    "url": video["url"],
+                    "title": video["title"],
+                    "chunks": batch
+                }
+                writer.add(f"{video_id}:{batch[0][0]}-{batch[-1][0]}", [chunk['text'] for _, chunk in batch], payload)
+                requests += 1
+                summary["chunks"] += len(batch)
+
+            summary["requests"] += requests
+            if not requests:
+                summary["videos_complete"] += 1
+
+        writer.close()
+        summary["files"] = len(store.files())
+        print(f"📦 Prepared {summary['requests']} requests ({summary['chunks']} chunks) for {summary['videos']} videos in {summary['files']} batch files")
+        return summary
+    finally:
+        store.close()
+
+async def submit_backfill(job_dir: str) -> Dict[str, Any]:
+    """Upload every prepared input file of a job and create its batch."""
+    store = BatchJobStore(job_dir)
+    submitted = 0
+
+    try:
+        for file in store.files(status="prepared"):
+            input_file_id, batch = await submit_batch_file(
+                openai_client, file["path"], {"job": os.path.basename(job_dir), "file_index": str(file["file_index"])}
+            )
+            store.update_file(file["file_index"], status=batch.status, input_file_id=input_file_id, batch_id=batch.id)
+            submitted += 1
+            print(f"🚀 Submitted batch {batch.id} ({file['request_count']} requests)")
+
+        return {"job_dir": job_dir, "submitted": submitted}
+    finally:
+        store.close()
+
+async def load_batch_results(store: BatchJobStore, path: str, summary: Dict[str, Any]):
+    """Turn one downloaded output or error file into stored chunks.
+
+    Rows are upserted UPSERT_BATCH_SIZE at a time and successful vectors are
+    also written to the embedding cache.
+    """
+    cache = get_embedding_cache()
+    pending: List[ProcessedChunk] = []
+    pending_ids: List[str] = []
+
+    async def flush():
+        report = await upsert_chunks(pending)
+        if report["success"]:
+            store.mark_requests(pending_ids, "loaded")
+            summary["chunks_stored"] += report["count"]
+        else:
+            summary["upserts_failed"] += 1
+        pending.clear()
+        pending_ids.clear()
+
+    for custom_id, vectors, error in iter_batch_results(path):
+        payload = store.get_payload(custom_id)
+        if payload is None:
+            continue
+
+        if error or len(vectors) != len(payload["chunks"]):
+            print(f"⚠️ Batch request {custom_id} failed: {error or 'wrong number of embeddings'}")
+            store.mark_requests([custom_id], "failed")
+            summary["requests_failed"] += 1
+            continue
+
+        for (chunk_number, chunk_data), vector in zip(payload["chunks"], vectors):
+            pending.append(build_processed_chunk(
+                chunk_data, chunk_number, payload["video_id"], payload["url"], payload["title"], vector
+            ))
+        pending_ids.append(custom_id)
+        if cache is not None:
+            cache.put_many({
+                make_cache_key(EMBEDDING_MODEL, chunk_data['text']): vector
+                for (_, chunk_data), vector in zip(payload["chunks"], vectors)
+            })
+
+        if len(pending) >= UPSERT_BATCH_SIZE:
+            await flush()
+
+    if pending:
+        await flush()
+
+async def poll_backfill(job_dir: str) -> Dict[str, Any]:
+    """Check a job's batches once and load the results of any that have finished.
+
+    Returns:
+        Dict with chunks stored and requests failed in this pass, per-status
+        file counts and whether every batch has finished and been loaded
+    """
+    store = BatchJobStore(job_dir)
+    summary = {"job_dir": job_dir, "chunks_stored": 0, "requests_failed": 0, "upserts_failed": 0}
+
+    try:
+        for file in store.files():
+            if file["loaded"] or not file["batch_id"]:
+                continue
+
+            batch = await openai_client.batches.retrieve(file["batch_id"])
+            store.update_file(
+                file["file_index"],
+                status=batch.status,
+                output_file_id=batch.output_file_id,
+                error_file_id=batch.error_file_id
+            )
+            if batch.status not in TERMINAL_STATUSES:
+                continue
+
+            print(f"📥 Batch {batch.id} {batch.status}, loading results")
+            for kind, file_id in (("output", batch.output_file_id), ("errors", batch.error_file_id)):
+                if not file_id:
+                    continue
+                path = os.path.join(job_dir, f"{kind}-{file['file_index']:04d}.jsonl")
+                await download_file(openai_client, file_id, path)
+                await load_batch_results(store, path, summary)
+
+            # Requests with no result line (failed or expired batches) are left to a later run
+            store.mark_file_requests(file["file_index"], "failed")
+            store.update_file(file["file_index"], loaded=1)
+
+        files = store.files()
+        summary["files"] = {}
+        for file in files:
+            summary["files"][file["status"]] = summary["files"].get(file["status"], 0) + 1
+        summary["requests"] = store.request_counts()
+        summary["done"] = all(file["loaded"] for file in files)
+        return summary
+    finally:
+        store.close()
+
+async def run_backfill(
+    job_dir: Optional[str] = None,
+    videos: Optional[Iterable[Dict[str, Any]]] = None,
+    poll_seconds: float = BACKFILL_POLL_SECONDS
+) -> Dict[str, Any]:
+    """Backfill embeddings through the OpenAI Batch API.
+
+    Batches are cheaper and have far higher throughput than synchronous
+    embeddings requests, at the cost of completing within hours instead of
+    seconds, so they suit backfills while interactive ingestion keeps using
+    process_and_store_transcript. A new job prepares input files from videos
+    (default: every cached transcript); an existing job directory is resumed
+    where it left off.
+
+    Args:
+        job_dir: Job directory; a new one under BACKFILL_DIR if None
+        videos: Dicts as for prepare_backfill
+        poll_seconds: Delay between polls of unfinished batches
+
+    Returns:
+        Final poll summary plus the prepare summary for new jobs
+    """
+    if job_dir is None:
+        job_dir = os.path.join(BACKFILL_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+
+    prepared = None
+    if not os.path.exists(os.path.join(job_dir, "job.sqlite3")):
+        prepared = prepare_backfill(iter_cached_transcripts() if videos is None else videos, job_dir)
+
+    await submit_backfill(job_dir)
+
+    chunks_stored = 0
+    while True:
+        summary = await poll_backfill(job_dir)
+        chunks_stored += summary["chunks_stored"]
+        if summary["done"]:
+            break
+        print(f"⏳ Waiting for batches: {summary['files']}")
+        await asyncio.sleep(poll_seconds)
+
+    summary["chunks_stored"] = chunks_stored
+    summary["prepared"] = prepared
+    print(f"✅ Backfill {job_dir} finished: {chunks_stored} chunks stored, requests {summary['requests']}")
+    return summary
 
 
 async def main():
@@ -270,4 +1223,15 @@ async def main():
     await process_and_store_transcript(video_id, video_url, video_title, transcript_data)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Ingest YouTube transcripts into youtube_transcript_pages")
+    parser.add_argument("--backfill", action="store_true", help="Embed all cached transcripts through the Batch API")
+    parser.add_argument("--job-dir", help="Resume an earlier backfill job directory")
+    parser.add_argument("--limit", type=int, help="Backfill at most this many cached transcripts")
+    parser.add_argument("--poll-seconds", type=float, default=BACKFILL_POLL_SECONDS)
+    args = parser.parse_args()
+
+    if args.backfill or args.job_dir:
+        videos = iter_cached_transcripts(args.limit) if args.limit else None
+        asyncio.run(run_backfill(args.job_dir, videos, args.poll_seconds))
+    else:
+        asyncio.run(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI Files and Batch APIs, for testing backfills.
+
+Implements just enough of /v1/files and /v1/batches for the embeddings batch
+flow: upload an input file, create a batch, poll it and download its output
+and error files. Embeddings are deterministic pseudo-random vectors derived
+from each text, and any request whose input contains the fail marker fails.
+
+Usage:
+    python local_batch_server.py --port 8089
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python ingest_youtube.py --backfill
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from array import array
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+def fake_embedding(text: str, dimensions: int) -> List[float]:
+    """Deterministic unit-scale vector for a text."""
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+    rng = random.Random(seed)
+    return [rng.uniform(-1.0, 1.0) for _ in range(dimensions)]
+
+
+class LocalBatchServer:
+    """In-process HTTP server emulating the OpenAI Files and Batch APIs.
+
+    Batches move one status forward per retrieve (validating -> in_progress
+    -> completed) after steps_to_complete polls, so clients exercise their
+    polling loop.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        dimensions: int = 1536,
+        fail_marker: str = "FAIL",
+        steps_to_complete: int = 2
+    ):
+        self.dimensions = dimensions
+        self.fail_marker = fail_marker
+        self.steps_to_complete = steps_to_complete
+        self.files: Dict[str, Dict] = {}
+        self.batches: Dict[str, Dict] = {}
+        self._polls: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._counter = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _new_id(self, prefix: str) -> str:
+        with self._lock:
+            self._counter += 1
+            return f"{prefix}-local-{self._counter}"
+
+    def _store_file(self, content: bytes, filename: str, purpose: str) -> Dict:
+        file_id = self._new_id("file")
+        self.files[file_id] = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+            "content": content
+        }
+        return self.files[file_id]
+
+    def _public_file(self, record: Dict) -> Dict:
+        return {key: value for key, value in record.items() if key != "content"}
+
+    def _run_batch(self, batch: Dict):
+        """Process every request of a batch into output and error files."""
+        output_lines = []
+        error_lines = []
+
+        for line in self.files[batch["input_file_id"]]["content"].splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request["body"]
+            texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            request_id = self._new_id("req")
+
+            if any(self.fail_marker in text for text in texts):
+                error_lines.append({
+                    "id": request_id,
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 400,
+                        "request_id": request_id,
+                        "body": {"error": {"message": "Input rejected by local batch server", "type": "invalid_request_error"}}
+                    },
+                    "error": None
+                })
+                continue
+
+            data = []
+            for index, text in enumerate(texts):
+                vector = fake_embedding(text, self.dimensions)
+                if body.get("encoding_format") == "base64":
+                    vector = base64.b64encode(array('f', vector).tobytes()).decode('ascii')
+                data.append({"object": "embedding", "index": index, "embedding": vector})
+
+            output_lines.append({
+                "id": request_id,
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": request_id,
+                    "body": {"object": "list", "data": data, "model": body["model"], "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+                },
+                "error": None
+            })
+
+        def encode(lines):
+            return b''.join(json.dumps(line).encode('utf-8') + b'\n' for line in lines)
+
+        if output_lines:
+            batch["output_file_id"] = self._store_file(encode(output_lines), "batch_output.jsonl", "batch_output")["id"]
+        if error_lines:
+            batch["error_file_id"] = self._store_file(encode(error_lines), "batch_errors.jsonl", "batch_output")["id"]
+        batch["request_counts"] = {
+            "total": len(output_lines) + len(error_lines),
+            "completed": len(output_lines),
+            "failed": len(error_lines)
+        }
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+
+    def _advance(self, batch: Dict):
+        polls = self._polls[batch["id"]] = self._polls.get(batch["id"], 0) + 1
+        if batch["status"] == "validating":
+            batch["status"] = "in_progress"
+        if batch["status"] == "in_progress" and polls >= self.steps_to_complete:
+            self._run_batch(batch)
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str):
+        path = handler.path.split('?')[0]
+        body = handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+
+        if method == "POST" and path == "/v1/files":
+            message = BytesParser(policy=default_policy).parsebytes(
+                b"Content-Type: " + handler.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                fields[name] = (part.get_filename(), part.get_payload(decode=True))
+            filename, content = fields["file"]
+            purpose = fields["purpose"][1].decode()
+            return self._send(handler, 200, self._public_file(self._store_file(content, filename or "upload.jsonl", purpose)))
+
+        if method == "POST" and path == "/v1/batches":
+            request = json.loads(body)
+            if request.get("input_file_id") not in self.files:
+                return self._send(handler, 400, {"error": {"message": "No such file", "type": "invalid_request_error"}})
+            batch_id = self._new_id("batch")
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": request["endpoint"],
+                "input_file_id": request["input_file_id"],
+                "completion_window": request["completion_window"],
+                "status": "validating",
+                "created_at": int(time.time()),
+                "metadata": request.get("metadata") or {},
+                "output_file_id": None,
+                "error_file_id": None,
+                "request_counts": {"total": 0, "completed": 0, "failed": 0}
+            }
+            return self._send(handler, 200, self.batches[batch_id])
+
+        match = re.fullmatch(r"/v1/batches/([^/]+)", path)
+        if method == "GET" and match and match.group(1) in self.batches:
+            batch = self.batches[match.group(1)]
+            with self._lock:
+                self._advance(batch)
+            return self._send(handler, 200, batch)
+
+        match = re.fullmatch(r"/v1/files/([^/]+)/content", path)
+        if method == "GET" and match and match.group(1) in self.files:
+            content = self.files[match.group(1)]["content"]
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/octet-stream")
+            handler.send_header("Content-Length", str(len(content)))
+            handler.end_headers()
+            handler.wfile.write(content)
+            return
+
+        self._send(handler, 404, {"error": {"message": f"Unknown route {method} {path}", "type": "invalid_request_error"}})
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, payload: Dict):
+        data = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--steps", type=int, default=2, help="Polls before a batch completes")
+    args = parser.parse_args()
+
+    server = LocalBatchServer(args.host, args.port, args.dimensions, steps_to_complete=args.steps)
+    print(f"Local batch server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import base64
+import json
+from array import array
+
+from embedding_batch import BatchInputWriter, BatchJobStore, decode_embedding, iter_batch_results
+
+
+class TestBatchInputWriter:
+    """Test cases for writing batch input files."""
+
+    def test_rolls_over_at_request_limit(self, tmp_path):
+        store = BatchJobStore(str(tmp_path))
+        writer = BatchInputWriter(store, "model", max_requests=2)
+        for i in range(5):
+            writer.add(f"v:{i}", [f"text {i}"], {"chunks": [[i, {"text": f"text {i}"}]]})
+        writer.close()
+
+        files = store.files()
+        assert [file["request_count"] for file in files] == [2, 2, 1]
+        with open(files[0]["path"]) as f:
+            first = json.loads(f.readline())
+        assert first["custom_id"] == "v:0"
+        assert first["url"] == "/v1/embeddings"
+        assert first["body"] == {"model": "model", "input": ["text 0"], "encoding_format": "base64"}
+        assert store.get_payload("v:4") == {"chunks": [[4, {"text": "text 4"}]]}
+
+    def test_rolls_over_at_byte_limit(self, tmp_path):
+        store = BatchJobStore(str(tmp_path))
+        writer = BatchInputWriter(store, "model", max_bytes=500)
+        for i in range(4):
+            writer.add(f"v:{i}", ["x" * 100], {})
+        writer.close()
+
+        assert [file["request_count"] for file in store.files()] == [2, 2]
+
+    def test_rolls_over_at_input_limit(self, tmp_path):
+        store = BatchJobStore(str(tmp_path))
+        writer = BatchInputWriter(store, "model", max_inputs=10)
+        for i in range(5):
+            writer.add(f"v:{i}", ["text"] * 4, {})
+        writer.close()
+
+        # 4 + 4 inputs fit in a file, a third request of 4 would make 12
+        assert [file["request_count"] for file in store.files()] == [2, 2, 1]
+
+
+class TestBatchResults:
+    """Test cases for reading batch output files."""
+
+    def test_reads_vectors_and_errors(self, tmp_path):
+        packed = base64.b64encode(array('f', [0.5, -1.0]).tobytes()).decode()
+        lines = [
+            {"custom_id": "ok", "response": {"status_code": 200, "body": {"data": [
+                {"index": 1, "embedding": [3.0, 4.0]},
+                {"index": 0, "embedding": packed}
+            ]}}, "error": None},
+            {"custom_id": "bad", "response": {"status_code": 400, "body": {"error": {"message": "too long"}}}, "error": None},
+            {"custom_id": "expired", "response": None, "error": {"code": "batch_expired", "message": "expired"}},
+        ]
+        path = tmp_path / "output.jsonl"
+        path.write_text(''.join(json.dumps(line) + "\n" for line in lines))
+
+        results = list(iter_batch_results(str(path)))
+
+        assert results[0][0] == "ok"
+        assert [list(vector) for vector in results[0][1]] == [[0.5, -1.0], [3.0, 4.0]]
+        assert results[1] == ("bad", None, "too long")
+        assert results[2] == ("expired", None, "expired")
+
+    def test_decode_embedding_accepts_lists(self):
+        assert list(decode_embedding([1.0, 2.0])) == [1.0, 2.0]
@@ -0,0 +1,52 @@
+from embedding_cache import EmbeddingCache, make_cache_key, normalize_text
+
+
+class TestCacheKey:
+    """Test cases for content addressing."""
+
+    def test_whitespace_does_not_change_key(self):
+        assert make_cache_key("m", "hello   world\n") == make_cache_key("m", " hello world")
+
+    def test_model_is_part_of_key(self):
+        assert make_cache_key("a", "hello") != make_cache_key("b", "hello")
+
+    def test_normalize_text_uses_nfc(self):
+        assert normalize_text("café") == "café"
+
+
+class TestEmbeddingCache:
+    """Test cases for the SQLite embedding cache."""
+
+    def test_round_trip_and_persistence(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = EmbeddingCache(path, max_bytes=1024 * 1024)
+        cache.put_many({"k1": [0.5, 0.25], "k2": [1.0, 2.0]})
+        cache.close()
+
+        reopened = EmbeddingCache(path, max_bytes=1024 * 1024)
+        found = reopened.get_many(["k1", "k2", "missing"])
+
+        assert set(found) == {"k1", "k2"}
+        assert list(found["k1"]) == [0.5, 0.25]
+        assert reopened.total_bytes > 0
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        # Each entry is 4 floats (16 bytes) plus a 2-char key
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=60)
+        cache.put_many({"k1": [1.0] * 4})
+        cache.put_many({"k2": [2.0] * 4})
+        cache.put_many({"k3": [3.0] * 4})
+        cache.get_many(["k1"])
+
+        cache.put_many({"k4": [4.0] * 4})
+
+        assert set(cache.get_many(["k1", "k2", "k3", "k4"])) == {"k1", "k3", "k4"}
+        assert cache.total_bytes <= 60
+
+    def test_replacing_entry_keeps_size_accurate(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+        cache.put_many({"k1": [1.0] * 4})
+        cache.put_many({"k1": [2.0] * 4})
+
+        assert len(cache) == 1
+        assert cache.total_bytes == 18
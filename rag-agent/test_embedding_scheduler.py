@@ -0,0 +1,178 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from embedding_scheduler import EmbeddingScheduler, EmbeddingError, TokenBucket, parse_reset_duration
+
+
+def rate_limit_error(headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class ScriptedEmbeddings:
+    """Fake embeddings API that replays a script of errors and header sets."""
+
+    def __init__(self, script, dimensions=4):
+        self.script = list(script)
+        self.dimensions = dimensions
+        self.calls = 0
+        self.with_raw_response = SimpleNamespace(create=self.create)
+
+    async def create(self, model, input):
+        self.calls += 1
+        step = self.script.pop(0) if self.script else {}
+        if isinstance(step, Exception):
+            raise step
+        vector = step.get("vector", [1.0] * self.dimensions)
+        data = [SimpleNamespace(index=i, embedding=list(vector)) for i in range(len(input))]
+        response = SimpleNamespace(data=data)
+        return SimpleNamespace(headers=step.get("headers", {}), parse=lambda: response)
+
+
+def make_scheduler(script, **kwargs):
+    embeddings = ScriptedEmbeddings(script)
+    client = SimpleNamespace(embeddings=embeddings)
+    options = {"dimensions": 4, "base_delay": 0.001, "max_delay": 0.01}
+    options.update(kwargs)
+    return EmbeddingScheduler(client, "text-embedding-3-small", **options), embeddings
+
+
+class TestParseResetDuration:
+    """Test cases for rate-limit reset header parsing."""
+
+    @pytest.mark.parametrize("value, expected", [
+        ("1s", 1.0),
+        ("6m0s", 360.0),
+        ("20ms", 0.02),
+        ("1h2m3s", 3723.0),
+        ("0.5s", 0.5),
+        ("2", 2.0),
+        ("", None),
+        ("soon", None),
+    ])
+    def test_parse(self, value, expected):
+        assert parse_reset_duration(value) == expected
+
+
+class TestTokenBucket:
+    """Test cases for the token bucket."""
+
+    def test_observe_caps_tokens_to_server_remaining(self):
+        bucket = TokenBucket(600)
+
+        bucket.observe(limit=1200, remaining=30)
+
+        assert bucket.capacity == 1200
+        assert bucket.tokens <= 31
+
+    def test_acquire_waits_for_refill(self):
+        # 6000/min refills 100 tokens per second
+        bucket = TokenBucket(6000)
+        bucket.tokens = 0
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await bucket.acquire(5)
+            return loop.time() - started
+
+        assert asyncio.run(run()) >= 0.04
+
+
+class TestEmbeddingScheduler:
+    """Test cases for the adaptive embedding scheduler."""
+
+    def test_retries_after_rate_limit(self):
+        scheduler, embeddings = make_scheduler([rate_limit_error({"retry-after-ms": "1"}), {}], initial_concurrency=4)
+
+        vectors = asyncio.run(scheduler.embed(["a", "b"], token_count=2))
+
+        assert vectors == [[1.0] * 4, [1.0] * 4]
+        assert embeddings.calls == 2
+        assert scheduler.retries == 1
+        assert scheduler.rate_limited == 1
+        # 429 halves concurrency before the successful retry adds one back
+        assert scheduler.concurrency == 3
+
+    def test_zero_vector_is_retried_not_returned(self):
+        scheduler, embeddings = make_scheduler([{"vector": [0.0] * 4}, {}])
+
+        vectors = asyncio.run(scheduler.embed(["a"], token_count=1))
+
+        assert vectors == [[1.0] * 4]
+        assert embeddings.calls == 2
+
+    def test_gives_up_after_max_retries(self):
+        scheduler, embeddings = make_scheduler([rate_limit_error()] * 3, max_retries=2)
+
+        with pytest.raises(EmbeddingError):
+            asyncio.run(scheduler.embed(["a"], token_count=1))
+
+        assert embeddings.calls == 3
+
+    def test_concurrency_grows_with_headroom(self):
+        headers = {
+            "x-ratelimit-limit-requests": "3000",
+            "x-ratelimit-remaining-requests": "2990",
+            "x-ratelimit-limit-tokens": "1000000",
+            "x-ratelimit-remaining-tokens": "990000",
+        }
+        scheduler, _ = make_scheduler([{"headers": headers}] * 3, initial_concurrency=1, max_concurrency=3)
+
+        async def run():
+            for _ in range(3):
+                await scheduler.embed(["a"], token_count=1)
+
+        asyncio.run(run())
+
+        assert scheduler.concurrency == 3
+
+    def test_concurrency_held_without_headroom(self):
+        headers = {
+            "x-ratelimit-limit-requests": "3000",
+            "x-ratelimit-remaining-requests": "10",
+        }
+        scheduler, _ = make_scheduler([{"headers": headers}], initial_concurrency=1)
+
+        asyncio.run(scheduler.embed(["a"], token_count=1))
+
+        assert scheduler.concurrency == 1
+
+    def test_shared_across_event_loops_and_threads(self):
+        scheduler, embeddings = make_scheduler([], initial_concurrency=1, max_concurrency=1)
+        active = []
+        peak = []
+
+        async def create(model, input):
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+            response = SimpleNamespace(data=[SimpleNamespace(index=0, embedding=[1.0] * 4)])
+            return SimpleNamespace(headers={}, parse=lambda: response)
+
+        scheduler.client.embeddings.with_raw_response.create = create
+        stats = [{} for _ in range(3)]
+
+        def ingest(n):
+            async def run():
+                for _ in range(4):
+                    await scheduler.embed(["a"], token_count=1, stats=stats[n])
+            asyncio.run(run())
+
+        threads = [threading.Thread(target=ingest, args=(n,)) for n in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # One quota and one concurrency limit for every caller
+        assert max(peak) == 1
+        assert scheduler.requests == 12
+        assert [caller["embedding_requests"] for caller in stats] == [4, 4, 4]
@@ -14,7 +14,21 @@ print(f"SUPABASE_SERVICE_KEY: {os.getenv('SUPABASE_SERVICE_KEY', 'NOT SET')[:20]
 print(f"LLM_MODEL: {os.getenv('LLM_MODEL', 'NOT SET')}")
 print("=" * 50)
 
-from ingest_youtube import chunk_vtt_transcript
+import asyncio
+from types import SimpleNamespace
+
+from openai import AsyncOpenAI
+
+import ingest_youtube
+from local_batch_server import LocalBatchServer
+from ingest_youtube import (
+    chunk_vtt_transcript,
+    batch_for_embedding,
+    process_chunk_batch,
+    process_and_store_transcript,
+    resume_transcript_ingest,
+    upsert_chunks,
+)
 
 
 class TestChunkVttTranscript:
@@ -162,6 +176,647 @@ class TestChunkVttTranscript:
         assert second_chunk['entry_count'] == 1
 
 
+@pytest.fixture(autouse=True)
+def ingest_defaults(monkeypatch):
+    # Keep tests away from the on-disk embedding cache unless they opt in
+    monkeypatch.setattr(ingest_youtube, "EMBEDDING_CACHE_PATH", "")
+    monkeypatch.setattr(ingest_youtube, "_embedding_cache", None)
+    # The shared scheduler holds the client, so tests that swap it get a new one
+    monkeypatch.setattr(ingest_youtube, "_embedding_scheduler", None)
+    # Pipeline tests use the predictable 3-cue chunker on raw caption text
+    monkeypatch.setattr(ingest_youtube, "CHUNK_STRATEGY", "entries")
+    monkeypatch.setattr(ingest_youtube, "TRANSCRIPT_NORMALIZATION", ())
+
+
+def make_chunk(text, start_seconds=0.0):
+    """Build a chunk dict shaped like chunk_vtt_transcript output."""
+    return {
+        'text': text,
+        'start_time': "00:00:00.000",
+        'end_time': "00:00:03.000",
+        'start_seconds': start_seconds,
+        'end_seconds': start_seconds + 3.0,
+        'duration': 3.0,
+        'entry_count': 1
+    }
+
+
+class FakeEmbeddings:
+    """Stand-in for openai_client.embeddings that records each request."""
+
+    def __init__(self, dimensions=2):
+        self.dimensions = dimensions
+        self.calls = []
+        self.with_raw_response = SimpleNamespace(create=self.create_raw)
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        # Return items out of order to check they are mapped back by index
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), float(i)] + [0.0] * (self.dimensions - 2))
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+    async def create_raw(self, model, input):
+        response = await self.create(model, input)
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+
+class FakeSupabase:
+    """Stand-in for the Supabase client that records upserts."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.upserts = []
+
+    def table(self, name):
+        self.table_name = name
+        return self
+
+    def upsert(self, rows, on_conflict="", returning=None):
+        self.upserts.append({"rows": rows, "on_conflict": on_conflict})
+        return self
+
+    def execute(self):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        return SimpleNamespace(data=[])
+
+
+class MemoryQuery:
+    """Minimal PostgREST query builder over an in-memory row list."""
+
+    def __init__(self, db, rows):
+        self.db = db
+        self.rows = rows
+        self.filters = []
+        self.action = "select"
+        self.payload = None
+        self.window = None
+
+    def select(self, columns, count=None):
+        return self
+
+    def value(self, row, column):
+        # Supports JSON paths like metadata->>chunker
+        if "->>" in column:
+            column, key = column.split("->>")
+            return (row.get(column) or {}).get(key)
+        return row.get(column)
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: self.value(row, column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: self.value(row, column) in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) >= value)
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    def order(self, column):
+        self.order_by = column
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end)
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def upsert(self, rows, on_conflict="", returning=None):
+        self.action = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.conflict = on_conflict.split(",")
+        return self
+
+    def execute(self):
+        if self.action == "upsert":
+            if self.rows is self.db.rows:
+                self.db.upsert_calls += 1
+            for row in self.payload:
+                key = [row[column] for column in self.conflict]
+                self.rows[:] = [r for r in self.rows if [r[column] for column in self.conflict] != key]
+                self.rows.append(row)
+            return SimpleNamespace(data=[])
+
+        matched = [row for row in self.rows if all(check(row) for check in self.filters)]
+        if self.action == "delete":
+            self.rows[:] = [row for row in self.rows if row not in matched]
+            return SimpleNamespace(data=matched)
+
+        matched.sort(key=lambda row: row.get("chunk_number", 0))
+        if self.window:
+            matched = matched[self.window[0]:self.window[1] + 1]
+        return SimpleNamespace(data=matched)
+
+
+class MemorySupabase:
+    """In-memory stand-in for youtube_transcript_pages (rows) and other tables."""
+
+    def __init__(self, rows=None, tables=None):
+        self.rows = rows or []
+        self.tables = tables or {}
+        self.upsert_calls = 0
+
+    def table(self, name):
+        if name == "youtube_transcript_pages":
+            return MemoryQuery(self, self.rows)
+        return MemoryQuery(self, self.tables.setdefault(name, []))
+
+
+class TestEmbeddingBatching:
+    """Test cases for batched embedding requests."""
+
+    @pytest.fixture(autouse=True)
+    def word_token_counter(self, monkeypatch):
+        # Count words instead of tiktoken tokens so tests stay offline
+        monkeypatch.setattr(ingest_youtube, "count_tokens", lambda text: len(text.split()))
+
+    def test_batches_respect_item_limit(self):
+        chunks = [make_chunk(f"chunk {i}") for i in range(7)]
+
+        batches = list(batch_for_embedding(chunks, max_tokens=1000, max_items=3))
+
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert [number for batch in batches for number, _ in batch] == list(range(7))
+
+    def test_batches_respect_token_limit(self):
+        chunks = [make_chunk("one two three"), make_chunk("four five"), make_chunk("six seven eight nine")]
+
+        batches = list(batch_for_embedding(chunks, max_tokens=5, max_items=100))
+
+        assert [[number for number, _ in batch] for batch in batches] == [[0, 1], [2]]
+
+    def test_reuses_token_counts_from_chunker(self, monkeypatch):
+        counted = []
+        monkeypatch.setattr(ingest_youtube, "count_tokens", lambda text: counted.append(text) or len(text.split()))
+        chunks = [dict(make_chunk("one two three"), token_count=3), dict(make_chunk("four five"), token_count=4), make_chunk("six")]
+
+        batches = list(batch_for_embedding(chunks, max_tokens=7, max_items=100))
+
+        assert [[number for number, _ in batch] for batch in batches] == [[0, 1], [2]]
+        assert counted == ["six"]
+
+    def test_oversized_chunk_gets_own_batch(self):
+        chunks = [make_chunk("a b"), make_chunk("a b c d e f g h"), make_chunk("c")]
+
+        batches = list(batch_for_embedding(chunks, max_tokens=4, max_items=100))
+
+        assert [[number for number, _ in batch] for batch in batches] == [[0], [1], [2]]
+
+    def test_process_chunk_batch_maps_results_in_order(self, monkeypatch):
+        fake = FakeEmbeddings()
+        monkeypatch.setattr(ingest_youtube, "openai_client", SimpleNamespace(embeddings=fake))
+        batch = [(5, make_chunk("a")), (6, make_chunk("bbb", 3.0)), (7, make_chunk("cc", 6.0))]
+
+        processed = asyncio.run(process_chunk_batch(batch, "vid", "https://youtu.be/vid", "Title"))
+
+        assert len(fake.calls) == 1
+        assert fake.calls[0] == ["a", "bbb", "cc"]
+        assert [chunk.chunk_number for chunk in processed] == [5, 6, 7]
+        assert [chunk.content for chunk in processed] == ["a", "bbb", "cc"]
+        assert [list(chunk.embedding) for chunk in processed] == [[1.0, 0.0], [3.0, 1.0], [2.0, 2.0]]
+        assert all(chunk.embedding.typecode == 'f' for chunk in processed)
+
+
+
+class TestBulkUpsert:
+    """Test cases for bulk chunk writes."""
+
+    @pytest.fixture(autouse=True)
+    def word_token_counter(self, monkeypatch):
+        monkeypatch.setattr(ingest_youtube, "count_tokens", lambda text: len(text.split()))
+
+    def make_processed(self, numbers):
+        return [
+            ingest_youtube.build_processed_chunk(make_chunk(f"text {n}"), n, "vid", "https://youtu.be/vid", "Title", [0.1, 0.2])
+            for n in numbers
+        ]
+
+    def test_upsert_sends_one_request_per_batch(self, monkeypatch):
+        fake = FakeSupabase()
+        monkeypatch.setattr(ingest_youtube, "supabase", fake)
+
+        report = asyncio.run(upsert_chunks(self.make_processed([3, 4, 5])))
+
+        assert report == {"success": True, "count": 3, "first_chunk": 3, "last_chunk": 5}
+        assert len(fake.upserts) == 1
+        assert fake.upserts[0]["on_conflict"] == "video_id,chunk_number"
+        assert [row["chunk_number"] for row in fake.upserts[0]["rows"]] == [3, 4, 5]
+
+    def test_upsert_reports_failure(self, monkeypatch):
+        monkeypatch.setattr(ingest_youtube, "supabase", FakeSupabase(fail=True))
+
+        report = asyncio.run(upsert_chunks(self.make_processed([0, 1])))
+
+        assert report["success"] is False
+        assert report["count"] == 0
+        assert report["first_chunk"] == 0 and report["last_chunk"] == 1
+        assert "connection reset" in report["error"]
+
+    def test_process_and_store_summary(self, monkeypatch):
+        fake = FakeSupabase()
+        monkeypatch.setattr(ingest_youtube, "supabase", fake)
+        monkeypatch.setattr(ingest_youtube, "openai_client", SimpleNamespace(embeddings=FakeEmbeddings(dimensions=1536)))
+        monkeypatch.setattr(ingest_youtube, "UPSERT_BATCH_SIZE", 2)
+        transcript_data = [
+            {"start": f"00:00:0{i}.000", "end": f"00:00:0{i + 1}.000", "text": f"line {i}", "start_seconds": float(i), "end_seconds": float(i + 1)}
+            for i in range(9)
+        ]
+
+        summary = asyncio.run(process_and_store_transcript("vid", "https://youtu.be/vid", "Title", transcript_data))
+
+        assert summary["chunks_total"] == 3
+        assert summary["chunks_stored"] == 3
+        assert summary["batches_ok"] == 2
+        assert summary["batches_failed"] == 0
+        assert summary["embedding_requests"] == 1
+        assert [len(upsert["rows"]) for upsert in fake.upserts] == [2, 1]
+        assert fake.upserts[0]["rows"][0]["embedding"].startswith("[20,0,0,")
+
+    def test_streaming_pipeline_bounds_in_flight_batches(self, monkeypatch):
+        fake = FakeSupabase()
+        embeddings = FakeEmbeddings(dimensions=1536)
+        monkeypatch.setattr(ingest_youtube, "supabase", fake)
+        monkeypatch.setattr(ingest_youtube, "openai_client", SimpleNamespace(embeddings=embeddings))
+        monkeypatch.setattr(ingest_youtube, "EMBEDDING_BATCH_MAX_ITEMS", 1)
+        monkeypatch.setattr(ingest_youtube, "INGEST_MAX_IN_FLIGHT", 1)
+        monkeypatch.setattr(ingest_youtube, "INGEST_QUEUE_SIZE", 1)
+        monkeypatch.setattr(ingest_youtube, "UPSERT_BATCH_SIZE", 1)
+        consumed = []
+
+        def transcript():
+            # Generator input: the pipeline must never pull far ahead of the writer
+            for i in range(30):
+                consumed.append(i)
+                assert len(consumed) - 3 * len(fake.upserts) <= 3 * 4
+                yield {"start": "00:00:00.000", "end": "00:00:01.000", "text": f"line {i}", "start_seconds": float(i), "end_seconds": float(i + 1)}
+
+        summary = asyncio.run(process_and_store_transcript("vid", "https://youtu.be/vid", "Title", transcript()))
+
+        assert summary["chunks_total"] == 10
+        assert summary["chunks_stored"] == 10
+        assert len(embeddings.calls) == 10
+        assert sorted(upsert["rows"][0]["chunk_number"] for upsert in fake.upserts) == list(range(10))
+
+    def test_bad_input_stops_batches_in_flight(self, monkeypatch):
+        class SlowEmbeddings(FakeEmbeddings):
+            async def create(self, model, input):
+                await asyncio.sleep(0.05)
+                return await super().create(model, input)
+
+        monkeypatch.setattr(ingest_youtube, "supabase", FakeSupabase())
+        monkeypatch.setattr(ingest_youtube, "openai_client", SimpleNamespace(embeddings=SlowEmbeddings(dimensions=1536)))
+        monkeypatch.setattr(ingest_youtube, "EMBEDDING_BATCH_MAX_ITEMS", 1)
+        monkeypatch.setattr(ingest_youtube, "INGEST_MAX_IN_FLIGHT", 2)
+
+        def transcript():
+            for i in range(6):
+                yield {"start": "00:00:00.000", "end": "00:00:01.000", "text": f"line {i}", "start_seconds": float(i), "end_seconds": float(i + 1)}
+            raise ValueError("malformed cue")
+
+        async def ingest():
+            summary = await process_and_store_transcript("vid", "https://youtu.be/vid", "Title", transcript())
+            return summary, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        summary, leftover = asyncio.run(ingest())
+
+        assert summary["error"] == "malformed cue"
+        assert leftover == []
+
+    def test_zero_vectors_are_never_written(self, monkeypatch):
+        fake = FakeSupabase()
+        monkeypatch.setattr(ingest_youtube, "supabase", fake)
+        chunks = [
+            ingest_youtube.build_processed_chunk(make_chunk("text"), 0, "vid", "https://youtu.be/vid", "Title", [0.0] * 1536)
+        ]
+
+        report = asyncio.run(upsert_chunks(chunks))
+
+        assert report["success"] is False
+        assert fake.upserts == []
+
+
+
+class TestResumableIngest:
+    """Test cases for filling only missing chunks."""
+
+    @pytest.fixture(autouse=True)
+    def fakes(self, monkeypatch):
+        monkeypatch.setattr(ingest_youtube, "count_tokens", lambda text: len(text.split()))
+        self.embeddings = FakeEmbeddings(dimensions=1536)
+        monkeypatch.setattr(ingest_youtube, "openai_client", SimpleNamespace(embeddings=self.embeddings))
+
+    def transcript(self, entries=12):
+        # 12 entries -> 4 chunks of 3
+        return [
+            {"start": "00:00:00.000", "end": "00:00:01.000", "text": f"line {i}", "start_seconds": float(i), "end_seconds": float(i + 1)}
+            for i in range(entries)
+        ]
+
+    def stored_row(self, chunk_number, embedding="[1]", chunker=None):
+        return {
+            "video_id": "vid",
+            "chunk_number": chunk_number,
+            "embedding": embedding,
+            "metadata": {"chunker": chunker or ingest_youtube.chunker_id()}
+        }
+
+    def test_embeds_only_missing_chunks(self, monkeypatch):
+        db = MemorySupabase([self.stored_row(0), self.stored_row(2)])
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+
+        summary = asyncio.run(resume_transcript_ingest("vid", "https://youtu.be/vid", "Title", self.transcript()))
+
+        assert summary["chunks_expected"] == 4
+        assert summary["chunks_existing"] == 2
+        assert summary["chunks_stored"] == 2
+        assert summary["complete"] is True
+        assert [text for call in self.embeddings.calls for text in call] == ["line 3 line 4 line 5", "line 9 line 10 line 11"]
+        assert sorted(row["chunk_number"] for row in db.rows) == [0, 1, 2, 3]
+
+    def test_complete_video_is_not_reembedded(self, monkeypatch):
+        db = MemorySupabase([self.stored_row(n) for n in range(4)])
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+
+        summary = asyncio.run(resume_transcript_ingest("vid", "https://youtu.be/vid", "Title", self.transcript()))
+
+        assert summary["chunks_missing"] == 0
+        assert summary["complete"] is True
+        assert self.embeddings.calls == []
+        assert db.upsert_calls == 0
+
+    def test_existing_chunks_are_paginated(self, monkeypatch):
+        db = MemorySupabase([self.stored_row(n) for n in range(4)])
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+        monkeypatch.setattr(ingest_youtube, "SELECT_PAGE_SIZE", 3)
+
+        assert ingest_youtube.get_existing_chunk_numbers("vid") == {0, 1, 2, 3}
+
+    def test_repair_deletes_orphans_and_reembeds_null_vectors(self, monkeypatch):
+        db = MemorySupabase([self.stored_row(0), self.stored_row(1, embedding=None), self.stored_row(2), self.stored_row(3), self.stored_row(7)])
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+
+        summary = asyncio.run(resume_transcript_ingest("vid", "https://youtu.be/vid", "Title", self.transcript(), repair=True))
+
+        assert summary["orphans_deleted"] == 1
+        assert summary["chunks_stored"] == 1
+        assert summary["complete"] is True
+        assert sorted(row["chunk_number"] for row in db.rows) == [0, 1, 2, 3]
+        assert all(row["embedding"] for row in db.rows)
+
+    def test_chunks_from_another_chunker_are_replaced(self, monkeypatch):
+        db = MemorySupabase([self.stored_row(n) for n in range(3)] + [self.stored_row(3, chunker="old")])
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+
+        summary = asyncio.run(resume_transcript_ingest("vid", "https://youtu.be/vid", "Title", self.transcript()))
+
+        assert summary["chunks_existing"] == 3
+        assert summary["chunks_stored"] == 1
+        assert all(row["metadata"]["chunker"] == ingest_youtube.chunker_id() for row in db.rows)
+
+    def test_legacy_chunks_are_deleted_without_repair(self, monkeypatch):
+        # Rows from the original per-entry ingest carry no chunker and run past the new range
+        legacy = [{"video_id": "vid", "chunk_number": n, "embedding": "[1]", "metadata": {}} for n in range(1, 10)]
+        db = MemorySupabase([self.stored_row(0)] + legacy)
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+
+        summary = asyncio.run(resume_transcript_ingest("vid", "https://youtu.be/vid", "Title", self.transcript()))
+
+        assert summary["chunks_existing"] == 1
+        assert summary["orphans_deleted"] == 9
+        assert summary["chunks_stored"] == 3
+        assert summary["complete"] is True
+        assert sorted(row["chunk_number"] for row in db.rows) == [0, 1, 2, 3]
+        assert all(row["metadata"]["chunker"] == ingest_youtube.chunker_id() for row in db.rows)
+
+    def test_records_language_and_expected_count(self, monkeypatch):
+        db = MemorySupabase()
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+
+        asyncio.run(resume_transcript_ingest("vid", "https://youtu.be/vid", "Title", self.transcript(), language_code="de"))
+
+        record = ingest_youtube.get_ingest_record("vid")
+        assert (record["language_code"], record["chunker"], record["chunks_expected"]) == ("de", ingest_youtube.chunker_id(), 4)
+
+    def test_another_language_replaces_every_chunk(self, monkeypatch):
+        db = MemorySupabase([self.stored_row(n) for n in range(4)])
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+        ingest_youtube.store_ingest_record("vid", "en", 4)
+
+        summary = asyncio.run(resume_transcript_ingest("vid", "https://youtu.be/vid", "Title", self.transcript(15), language_code="es"))
+
+        # 15 entries -> 5 chunks, none of the English ones kept
+        assert summary["chunks_existing"] == 0
+        assert summary["orphans_deleted"] == 4
+        assert summary["chunks_stored"] == 5
+        assert sorted(row["chunk_number"] for row in db.rows) == [0, 1, 2, 3, 4]
+        assert ingest_youtube.get_ingest_record("vid")["language_code"] == "es"
+
+
+
+class TestEmbeddingCacheIngest:
+    """Test cases for serving repeated chunk text from the embedding cache."""
+
+    def test_second_ingest_is_served_from_cache(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(ingest_youtube, "count_tokens", lambda text: len(text.split()))
+        monkeypatch.setattr(ingest_youtube, "EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+        embeddings = FakeEmbeddings(dimensions=1536)
+        monkeypatch.setattr(ingest_youtube, "openai_client", SimpleNamespace(embeddings=embeddings))
+        transcript_data = [
+            {"start": "00:00:00.000", "end": "00:00:01.000", "text": text, "start_seconds": float(i), "end_seconds": float(i + 1)}
+            for i, text in enumerate(["intro", "music", "outro", "intro", "music", "outro", "new", "words", "here"])
+        ]
+
+        monkeypatch.setattr(ingest_youtube, "supabase", FakeSupabase())
+        first = asyncio.run(process_and_store_transcript("vid1", "https://youtu.be/vid1", "Title", transcript_data))
+        monkeypatch.setattr(ingest_youtube, "supabase", FakeSupabase())
+        second = asyncio.run(process_and_store_transcript("vid2", "https://youtu.be/vid2", "Title", transcript_data))
+
+        # Chunks 0 and 1 share text, so only two texts are embedded the first time
+        assert (first["cache_hits"], first["cache_misses"]) == (0, 3)
+        assert embeddings.calls == [["intro music outro", "new words here"]]
+        assert (second["cache_hits"], second["cache_misses"]) == (3, 0)
+        assert second["chunks_stored"] == 3
+
+
+
+def cue(i, text, start, end):
+    return {"start": f"c{i}s", "end": f"c{i}e", "text": text, "start_seconds": start, "end_seconds": end}
+
+
+class TestTokenChunker:
+    """Test cases for the token-aware chunker."""
+
+    @pytest.fixture(autouse=True)
+    def word_token_counter(self, monkeypatch):
+        monkeypatch.setattr(ingest_youtube, "count_tokens", lambda text: len(text.split()))
+
+    def test_packs_cues_up_to_token_budget(self):
+        cues = [cue(i, "a b", i * 2.0, i * 2.0 + 2.0) for i in range(5)]
+
+        chunks = list(ingest_youtube.iter_token_chunks(cues, max_tokens=4, overlap_tokens=0, max_seconds=1000))
+
+        assert [chunk['entry_count'] for chunk in chunks] == [2, 2, 1]
+        assert [chunk['token_count'] for chunk in chunks] == [4, 4, 2]
+        assert chunks[1]['start_time'] == "c2s" and chunks[1]['end_time'] == "c3e"
+        assert (chunks[1]['start_seconds'], chunks[1]['end_seconds']) == (4.0, 8.0)
+
+    def test_never_splits_oversized_cue(self):
+        cues = [cue(0, "a", 0.0, 1.0), cue(1, "a b c d e f", 1.0, 2.0), cue(2, "a", 2.0, 3.0)]
+
+        chunks = list(ingest_youtube.iter_token_chunks(cues, max_tokens=3, overlap_tokens=0, max_seconds=1000))
+
+        assert [chunk['text'] for chunk in chunks] == ["a", "a b c d e f", "a"]
+
+    def test_time_window_closes_chunk(self):
+        cues = [cue(i, "a", i * 10.0, i * 10.0 + 10.0) for i in range(4)]
+
+        chunks = list(ingest_youtube.iter_token_chunks(cues, max_tokens=100, overlap_tokens=0, max_seconds=20))
+
+        assert [(chunk['start_seconds'], chunk['end_seconds']) for chunk in chunks] == [(0.0, 20.0), (20.0, 40.0)]
+
+    def test_overlap_repeats_whole_trailing_cues(self):
+        cues = [cue(i, f"w{i} x", float(i), float(i + 1)) for i in range(4)]
+
+        chunks = list(ingest_youtube.iter_token_chunks(cues, max_tokens=4, overlap_tokens=2, max_seconds=1000))
+
+        assert [chunk['text'] for chunk in chunks] == ["w0 x w1 x", "w1 x w2 x", "w2 x w3 x"]
+
+    def test_overlap_dropped_when_no_room(self):
+        cues = [cue(0, "a b", 0.0, 1.0), cue(1, "c d e", 1.0, 2.0)]
+
+        chunks = list(ingest_youtube.iter_token_chunks(cues, max_tokens=4, overlap_tokens=2, max_seconds=1000))
+
+        assert [chunk['text'] for chunk in chunks] == ["a b", "c d e"]
+
+    def test_fewer_chunks_than_fixed_grouping(self):
+        cues = [cue(i, "short auto caption", float(i), float(i + 1)) for i in range(60)]
+
+        token_chunks = list(ingest_youtube.iter_token_chunks(cues, max_tokens=60, overlap_tokens=0, max_seconds=1000))
+
+        assert len(token_chunks) == 3
+        assert len(chunk_vtt_transcript(cues)) == 20
+
+
+class TestTranscriptNormalization:
+    """Test cases for normalizing caption text before embedding."""
+
+    def test_embeds_normalized_text_and_reports_savings(self, monkeypatch):
+        embeddings = FakeEmbeddings(dimensions=1536)
+        db = MemorySupabase()
+        monkeypatch.setattr(ingest_youtube, "openai_client", SimpleNamespace(embeddings=embeddings))
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+        monkeypatch.setattr(ingest_youtube, "count_tokens", lambda text: len(text.split()))
+        monkeypatch.setattr(ingest_youtube, "TRANSCRIPT_NORMALIZATION", ("sounds", "fillers"))
+        transcript = [
+            cue(0, "[Music]", 0.0, 5.0),
+            cue(1, "um welcome", 5.0, 7.0),
+            cue(2, "uh to the show", 7.0, 9.0),
+            cue(3, "[Applause]", 9.0, 10.0),
+        ]
+
+        summary = asyncio.run(process_and_store_transcript("vid", "url", "Title", transcript))
+
+        assert embeddings.calls == [["welcome to the show"]]
+        assert (summary["tokens_before"], summary["tokens_after"], summary["tokens_saved"]) == (8, 4, 4)
+        assert summary["entries_dropped"] == 2
+        assert db.rows[0]["metadata"]["chunker"] == "entries:3+norm:sounds,fillers"
+        # The transcript shown to users keeps its original text
+        assert transcript[1]["text"] == "um welcome"
+
+
+class TestBatchBackfill:
+    """Test cases for offline backfills through the Batch API."""
+
+    @pytest.fixture
+    def batch_server(self, monkeypatch):
+        server = LocalBatchServer(dimensions=1536, steps_to_complete=2)
+        base_url = server.start()
+        monkeypatch.setattr(ingest_youtube, "openai_client", AsyncOpenAI(api_key="sk-test", base_url=base_url))
+        yield server
+        server.stop()
+
+    def video(self, video_id, texts):
+        return {
+            "video_id": video_id,
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "title": f"Video {video_id}",
+            "transcript_data": [cue(i, text, i * 2.0, i * 2.0 + 2.0) for i, text in enumerate(texts)]
+        }
+
+    def test_backfills_missing_chunks(self, batch_server, monkeypatch, tmp_path):
+        db = MemorySupabase([
+            {"video_id": "a", "chunk_number": 0, "embedding": "[1]", "metadata": {"chunker": ingest_youtube.chunker_id()}}
+        ])
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+        monkeypatch.setattr(ingest_youtube, "EMBEDDING_BATCH_MAX_ITEMS", 2)
+        videos = [self.video("a", ["one", "two", "three", "four", "five", "six"]), self.video("b", ["seven"])]
+
+        summary = asyncio.run(ingest_youtube.run_backfill(str(tmp_path / "job"), videos, poll_seconds=0))
+
+        assert summary["prepared"]["chunks"] == 2
+        assert summary["chunks_stored"] == 2
+        assert summary["requests"] == {"loaded": 2}
+        stored = {(row["video_id"], row["chunk_number"]): row for row in db.rows}
+        assert set(stored) == {("a", 0), ("a", 1), ("b", 0)}
+        assert stored[("a", 1)]["content"] == "four five six"
+        assert stored[("b", 0)]["embedding"].startswith("[")
+        assert len(batch_server.batches) == 1
+
+    def test_backfill_keeps_indexed_language(self, batch_server, monkeypatch, tmp_path):
+        german = dict(self.video("a", ["eins", "zwei", "drei", "vier"]), language_code="de")
+        db = MemorySupabase(tables={"youtube_transcripts_cache": [german]})
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+        ingest_youtube.store_ingest_record("a", "de", 2)
+
+        asyncio.run(ingest_youtube.run_backfill(str(tmp_path / "job"), [self.video("a", ["one", "two"])], poll_seconds=0))
+
+        assert [row["content"] for row in sorted(db.rows, key=lambda row: row["chunk_number"])] == ["eins zwei drei", "vier"]
+        assert ingest_youtube.get_ingest_record("a")["language_code"] == "de"
+
+    def test_failed_requests_are_retried_by_later_backfill(self, batch_server, monkeypatch, tmp_path):
+        db = MemorySupabase()
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+        monkeypatch.setattr(ingest_youtube, "EMBEDDING_BATCH_MAX_ITEMS", 1)
+        videos = [self.video("a", ["one", "two", "three", "FAIL four"])]
+
+        first = asyncio.run(ingest_youtube.run_backfill(str(tmp_path / "first"), videos, poll_seconds=0))
+
+        assert first["requests"] == {"loaded": 1, "failed": 1}
+        assert [row["chunk_number"] for row in db.rows] == [0]
+
+        batch_server.fail_marker = "never"
+        second = asyncio.run(ingest_youtube.run_backfill(str(tmp_path / "second"), videos, poll_seconds=0))
+
+        assert second["prepared"]["chunks"] == 1
+        assert sorted(row["chunk_number"] for row in db.rows) == [0, 1]
+
+    def test_resumes_existing_job(self, batch_server, monkeypatch, tmp_path):
+        db = MemorySupabase()
+        monkeypatch.setattr(ingest_youtube, "supabase", db)
+        job_dir = str(tmp_path / "job")
+        ingest_youtube.prepare_backfill([self.video("a", ["one", "two"])], job_dir)
+        asyncio.run(ingest_youtube.submit_backfill(job_dir))
+
+        # Another process picks the job up later, without re-preparing it
+        summary = asyncio.run(ingest_youtube.run_backfill(job_dir, videos=[], poll_seconds=0))
+
+        assert summary["prepared"] is None
+        assert summary["chunks_stored"] == 1
+        assert len(batch_server.batches) == 1
+
+
 if __name__ == "__main__":
     # Run tests if script is executed directly
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,75 @@
+import pytest
+
+from transcript_normalizer import (
+    NORMALIZATION_STEPS,
+    iter_normalized_entries,
+    normalize_caption_text,
+    parse_steps,
+)
+
+
+def entry(text, start=0.0):
+    return {"start": "s", "end": "e", "text": text, "start_seconds": start, "end_seconds": start + 2.0}
+
+
+class TestNormalizeCaptionText:
+    """Test cases for caption noise removal."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("[Music]", ""),
+        ("♪ la la ♪ [Applause] thank you", "la thank you"),
+        ("so um, we we we start here", "so we start here"),
+        ("Uh the the idea is, you know you know, simple", "the idea is, you know, simple"),
+        ("it's<00:00:01.120><c> time</c> to go", "it's time to go"),
+        (">> Welcome back &amp; hello", "Welcome back & hello"),
+        ("(audience laughter) right", "right"),
+        ("Hello, world.", "Hello, world."),
+    ])
+    def test_all_steps(self, text, expected):
+        assert normalize_caption_text(text) == expected
+
+    def test_only_selected_steps(self):
+        assert normalize_caption_text("[Music] um the the end", ("sounds",)) == "um the the end"
+        assert normalize_caption_text("[Music] um the the end", ("fillers",)) == "[Music] the the end"
+
+    def test_does_not_strip_words_containing_fillers(self):
+        assert normalize_caption_text("umbrella hummingbird error ahead") == "umbrella hummingbird error ahead"
+
+
+class TestParseSteps:
+    """Test cases for the TRANSCRIPT_NORMALIZATION setting."""
+
+    def test_disabled(self):
+        assert parse_steps("none") == ()
+        assert parse_steps("") == ()
+
+    def test_keeps_canonical_order(self):
+        assert parse_steps("repeats, tags") == ("tags", "repeats")
+        assert parse_steps("all") == NORMALIZATION_STEPS
+
+    def test_unknown_step(self):
+        with pytest.raises(ValueError):
+            parse_steps("tags,emoji")
+
+
+class TestIterNormalizedEntries:
+    """Test cases for normalizing transcript entries."""
+
+    def test_drops_empty_entries_and_counts_tokens_saved(self):
+        transcript = [entry("[Music]"), entry("um so so this is it", 2.0), entry("plain text", 4.0)]
+        stats = {}
+
+        normalized = list(iter_normalized_entries(transcript, NORMALIZATION_STEPS, stats, lambda text: len(text.split())))
+
+        assert [e["text"] for e in normalized] == ["so this is it", "plain text"]
+        assert [e["token_count"] for e in normalized] == [4, 2]
+        assert stats == {"tokens_before": 9, "tokens_after": 6, "tokens_saved": 3, "entries_dropped": 1}
+
+    def test_original_entries_are_not_modified(self):
+        transcript = [entry("[Applause] thanks")]
+
+        normalized = list(iter_normalized_entries(transcript))
+
+        assert normalized[0]["text"] == "thanks"
+        assert transcript[0]["text"] == "[Applause] thanks"
+        assert normalized[0]["start_seconds"] == 0.0
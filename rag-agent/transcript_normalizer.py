@@ -0,0 +1,120 @@
+import html
+import re
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Normalization steps, applied in this order
+NORMALIZATION_STEPS = ("tags", "sounds", "fillers", "repeats")
+
+# Leftover inline timing/class tags (<00:00:01.120>, <c>, </c>, <i>) and the
+# ">>" speaker-change marker auto-captions put in front of a new speaker
+_TAGS = re.compile(r'<[^>]*>|>>')
+
+# Non-speech annotations: [Music], [Applause], (laughter), ♪
+_SOUNDS = re.compile(
+    r'\[[^\]]*\]'
+    r'|\((?:[^)]*\b(?:music|applause|laugh\w*|inaudible|cheer\w*|silence)\b[^)]*)\)'
+    r'|[♪♫]+',
+    re.IGNORECASE
+)
+
+# Hesitation sounds, with the comma that usually follows them
+_FILLERS = re.compile(r"\b(?:u+m+|u+h+|e+r+m+|a+h+|h+m+|m+h*m+)\b,?", re.IGNORECASE)
+
+# A word or short phrase (up to 3 words) immediately repeated: "the the", "I I I",
+# "you know you know"
+_REPEATS = re.compile(r"\b([\w']+(?:\s+[\w']+){0,2})(?:\s+\1\b)+", re.IGNORECASE)
+
+_SPACE_BEFORE_PUNCTUATION = re.compile(r'\s+([,.!?;:])')
+_LEADING_PUNCTUATION = re.compile(r'^[\s,;:]+')
+
+
+def parse_steps(value: Optional[str]) -> Tuple[str, ...]:
+    """Parse a comma-separated list of normalization steps ("none" or empty disables).
+
+    Raises:
+        ValueError: If an unknown step is named
+    """
+    if not value or value.strip().lower() in ("none", "off"):
+        return ()
+
+    requested = {step.strip().lower() for step in value.split(',') if step.strip()}
+    if "all" in requested:
+        return NORMALIZATION_STEPS
+
+    unknown = requested - set(NORMALIZATION_STEPS)
+    if unknown:
+        raise ValueError(f"Unknown normalization steps: {', '.join(sorted(unknown))}")
+
+    return tuple(step for step in NORMALIZATION_STEPS if step in requested)
+
+
+def normalize_caption_text(text: str, steps: Iterable[str] = NORMALIZATION_STEPS) -> str:
+    """Strip caption noise that costs embedding tokens without adding meaning.
+
+    Args:
+        text: Caption text of one transcript entry
+        steps: Which of NORMALIZATION_STEPS to apply
+
+    Returns:
+        Normalized text, possibly empty if the entry was only noise
+    """
+    steps = set(steps)
+
+    if "tags" in steps:
+        text = _TAGS.sub(' ', html.unescape(text))
+    if "sounds" in steps:
+        text = _SOUNDS.sub(' ', text)
+    if "fillers" in steps:
+        text = _FILLERS.sub(' ', text)
+    if "repeats" in steps:
+        text = _REPEATS.sub(r'\1', text)
+
+    text = ' '.join(text.split())
+    text = _SPACE_BEFORE_PUNCTUATION.sub(r'\1', text)
+    return _LEADING_PUNCTUATION.sub('', text)
+
+
+def iter_normalized_entries(
+    transcript_data: Iterable[Dict],
+    steps: Iterable[str] = NORMALIZATION_STEPS,
+    stats: Optional[Dict] = None,
+    count_tokens: Optional[Callable[[str], int]] = None
+) -> Iterator[Dict]:
+    """Lazily normalize transcript entries for embedding.
+
+    Entries are copied, so the transcript shown to users keeps its original
+    text. Entries left empty (e.g. a cue that was only "[Music]") are dropped.
+
+    Args:
+        transcript_data: Iterable of transcript entries with start, end, text, start_seconds
+        steps: Which of NORMALIZATION_STEPS to apply
+        stats: Optional dict whose tokens_before, tokens_after, tokens_saved and
+            entries_dropped counters are incremented
+        count_tokens: Token counter used for stats; when given, normalized
+            entries carry their token_count
+
+    Yields:
+        Normalized copies of the entries
+    """
+    steps = tuple(steps)
+
+    for entry in transcript_data:
+        text = normalize_caption_text(entry['text'], steps) if steps else entry['text']
+
+        if count_tokens:
+            tokens_after = count_tokens(text) if text else 0
+            if stats is not None:
+                tokens_before = count_tokens(entry['text']) if text != entry['text'] else tokens_after
+                stats["tokens_before"] = stats.get("tokens_before", 0) + tokens_before
+                stats["tokens_after"] = stats.get("tokens_after", 0) + tokens_after
+                stats["tokens_saved"] = stats.get("tokens_saved", 0) + tokens_before - tokens_after
+
+        if not text:
+            if stats is not None:
+                stats["entries_dropped"] = stats.get("entries_dropped", 0) + 1
+            continue
+
+        normalized = dict(entry, text=text)
+        if count_tokens:
+            normalized['token_count'] = tokens_after
+        yield normalized
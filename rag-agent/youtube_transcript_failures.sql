@@ -0,0 +1,26 @@
+-- YouTube Transcript Failures (negative cache)
+-- Remembers videos whose transcript can't be extracted, so repeat requests fail fast
+-- instead of re-running a 30-40 s extraction
+
+create table youtube_transcript_failures (
+  video_id varchar primary key,
+  reason varchar not null,
+  detail text,
+  languages varchar,
+  expires_at timestamp with time zone not null,
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Create index on expires_at for cleanup queries
+create index idx_youtube_transcript_failures_expires_at on youtube_transcript_failures(expires_at);
+
+-- Add comments for documentation
+comment on table youtube_transcript_failures is 'Negative cache of failed transcript extractions, checked before extraction';
+comment on column youtube_transcript_failures.video_id is 'YouTube video ID (primary key)';
+comment on column youtube_transcript_failures.reason is 'Reason code: no_subtitles, private, age_restricted, members_only, unavailable or upcoming';
+comment on column youtube_transcript_failures.detail is 'Error message from the extraction that failed';
+comment on column youtube_transcript_failures.languages is 'Comma-separated caption languages the failed extraction looked for';
+comment on column youtube_transcript_failures.expires_at is 'When the video should be tried again; TTL depends on the reason';
+
+-- Expired rows are ignored on read; remove them periodically with:
+-- delete from youtube_transcript_failures where expires_at < now();
@@ -0,0 +1,23 @@
+-- YouTube Transcript Ingests
+-- Records which caption language and chunker a video's RAG chunks were built from,
+-- and how many chunks that produces, so availability checks compare a stored count
+-- instead of re-chunking the transcript
+
+create table youtube_transcript_ingests (
+  video_id varchar primary key,
+  language_code varchar not null,
+  chunker varchar not null,
+  chunks_expected integer not null,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Add comments for documentation
+comment on table youtube_transcript_ingests is 'One row per video indexed in youtube_transcript_pages, written before its chunks';
+comment on column youtube_transcript_ingests.video_id is 'YouTube video ID (primary key); chunks are stored per video, so only one language is indexed';
+comment on column youtube_transcript_ingests.language_code is 'Caption language the chunks were built from; resumes use the same language';
+comment on column youtube_transcript_ingests.chunker is 'Chunking configuration (metadata.chunker of the chunks)';
+comment on column youtube_transcript_ingests.chunks_expected is 'Chunks the chunker produces for the transcript; the video is complete once all are stored';
+comment on column youtube_transcript_ingests.updated_at is 'When the video was last ingested or resumed';
+
+-- Clearing a video's chunks should also remove its row:
+-- delete from youtube_transcript_ingests where video_id = '<video_id>';
@@ -2,13 +2,17 @@
 -- This table stores raw transcript data for fast lookups and prevents re-extraction
 
 create table youtube_transcripts_cache (
-  video_id varchar primary key,
+  video_id varchar not null,
   url varchar not null,
   title varchar not null,
   language varchar default 'English',
-  language_code varchar default 'en',
+  language_code varchar not null default 'en',
   transcript_data jsonb not null,
-  created_at timestamp with time zone default timezone('utc'::text, now()) not null
+  metadata jsonb not null default '{}'::jsonb,
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+
+  -- One row per caption language of a video
+  primary key (video_id, language_code)
 );
 
 -- Create index on url for debugging and alternative lookups
@@ -19,12 +23,29 @@ create index idx_youtube_transcripts_cache_created_at on youtube_transcripts_cac
 
 -- Add comments for documentation
 comment on table youtube_transcripts_cache is 'Caches YouTube transcript data to avoid re-extraction with yt-dlp';
-comment on column youtube_transcripts_cache.video_id is 'YouTube video ID (primary key)';
+comment on column youtube_transcripts_cache.video_id is 'YouTube video ID';
+comment on column youtube_transcripts_cache.language_code is 'Caption language requested (e.g. en, es); part of the primary key with video_id';
 comment on column youtube_transcripts_cache.url is 'Full YouTube URL for reference';
 comment on column youtube_transcripts_cache.title is 'Video title extracted from YouTube';
 comment on column youtube_transcripts_cache.transcript_data is 'Raw VTT transcript data as JSONB array';
+comment on column youtube_transcripts_cache.metadata is 'Title, duration, chapters and caption languages from the yt-dlp metadata call';
 comment on column youtube_transcripts_cache.created_at is 'When transcript was first extracted';
 
+-- Existing tables: add the metadata column and key rows by language in place
+-- alter table youtube_transcripts_cache add column if not exists metadata jsonb not null default '{}'::jsonb;
+-- update youtube_transcripts_cache set language_code = 'en' where language_code is null;
+-- alter table youtube_transcripts_cache alter column language_code set not null;
+-- alter table youtube_transcripts_cache drop constraint youtube_transcripts_cache_pkey;
+-- alter table youtube_transcripts_cache add primary key (video_id, language_code);
+
+-- Example of stored metadata structure:
+-- {
+--   "title": "Rick Astley - Never Gonna Give You Up",
+--   "duration": 212,
+--   "chapters": [{"title": "Intro", "start_seconds": 0.0, "end_seconds": 18.0}],
+--   "caption_languages": {"manual": ["en"], "automatic": ["de", "en", "es"]}
+-- }
+
 -- Example of stored transcript_data structure:
 -- [
 --   {